@@ -0,0 +1,92 @@
+"""
+Concurrency stress test for AppointmentStore.book_if_available.
+
+Many threads race to book a small pool of slots across a few specialties, with
+deliberately overlapping start times and different spellings of the same instant.
+Afterwards the database is checked for overlapping bookings; the run fails if any
+slot was double-booked.
+
+    python benchmarks/booking_stress.py --threads 32 --attempts 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "hospital_scheduler" / "src"))
+
+from hospital_scheduler.tools.appointment_store import AppointmentStore  # noqa: E402
+
+SPECIALTIES = ["Cardiology", "Pediatrics", "General", "Dermatology"]
+
+
+def make_requests(attempts: int, slots: int, seed: int):
+    """Random booking requests; start times fall on a 15-minute grid so 30-minute slots overlap."""
+    rng = random.Random(seed)
+    base = datetime(2030, 1, 7, 13, 0, tzinfo=timezone.utc)
+    requests = []
+    for i in range(attempts):
+        start = base + timedelta(minutes=15 * rng.randrange(slots))
+        spelling = rng.choice([
+            start.isoformat(),
+            start.astimezone(timezone(timedelta(hours=-5))).isoformat(),
+            start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        ])
+        specialty = rng.choice(SPECIALTIES)
+        requests.append((f"patient-{i}", spelling, rng.choice([specialty, specialty.upper(), f" {specialty.lower()} "])))
+    return requests
+
+
+def run(threads: int, attempts: int, slots: int, seed: int) -> int:
+    path = os.path.join(tempfile.mkdtemp(prefix="booking-stress-"), "appointments.db")
+    store = AppointmentStore(path, pool_size=threads)
+    requests = make_requests(attempts, slots, seed)
+    chunks = [requests[i::threads] for i in range(threads)]
+    booked = [0] * threads
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        for patient, when, specialty in chunks[index]:
+            if store.book_if_available(patient, when, specialty)["booked"]:
+                booked[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with store.connection() as conn:
+        overlaps = conn.execute(
+            "SELECT COUNT(*) FROM appointments a JOIN appointments b "
+            "ON a.specialty_key = b.specialty_key AND a.id < b.id "
+            "AND a.slot_start < b.slot_end AND b.slot_start < a.slot_end"
+        ).fetchone()[0]
+    total = store.count()
+    store.close()
+
+    print(f"threads={threads} attempts={attempts} elapsed={elapsed:.2f}s "
+          f"throughput={attempts / elapsed:,.0f} req/s booked={total} (reported {sum(booked)}) overlaps={overlaps}")
+    if overlaps or total != sum(booked):
+        print("FAIL: double booking detected")
+        return 1
+    print("OK: no slot was double-booked")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--slots", type=int, default=200, help="Distinct 15-minute start times to fight over")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(run(args.threads, args.attempts, args.slots, args.seed))
@@ -0,0 +1,140 @@
+"""
+End-to-end benchmark of NewsCuratorCrew and HospitalSchedulerCrew on a local fake LLM.
+
+Each of `--concurrency` workers owns a warm crew (crews serialize their own kickoffs), and
+`--requests` kickoffs are spread across them. Every LLM call costs `--latency-ms` plus
+`--per-token-ms` per output token, so results are repeatable and need no API key.
+
+    python benchmarks/crew_bench.py news --requests 200 --concurrency 8 --latency-ms 50
+    python benchmarks/crew_bench.py news --agents            # full profiling/gathering crew
+    python benchmarks/crew_bench.py hospital --requests 100 --concurrency 4
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "news_curator_project" / "src"))
+sys.path.insert(0, str(ROOT / "hospital_scheduler" / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_llm import FakeLLM  # noqa: E402
+from stats import report  # noqa: E402
+
+NEWS_QUERIES = [
+    "latest tech news", "brief finance highlights", "health news summary",
+    "tech and finance news", "what is new in health and technology", "economic impact of finance news",
+]
+SPECIALTIES = ["Cardiology", "Pediatrics", "General"]
+
+
+def news_setup(args):
+    from news_curator_project.cache import ResponseCache
+    from news_curator_project.checkpoints import CheckpointStore
+    from news_curator_project.crew import NewsCuratorCrew
+
+    checkpoints = CheckpointStore(tempfile.mkdtemp(prefix="crew-bench-checkpoints-"))
+
+    def make_crew(llm):
+        # A zero TTL disables a cache, so with --cache off every request does the full work:
+        # neither finished digests nor per-article summaries are reused
+        cache = ResponseCache(ttl_seconds=900 if args.cache else 0)
+        article_cache = None if args.cache else ResponseCache(ttl_seconds=0)
+        return NewsCuratorCrew(cache=cache, fast_path=not args.agents, verbose=False, llm=llm, checkpoints=checkpoints,
+                               article_cache=article_cache)
+
+    return make_crew, lambda crew, i: crew.kickoff(NEWS_QUERIES[i % len(NEWS_QUERIES)])
+
+
+def hospital_setup(args):
+    from hospital_scheduler.checkpoints import CheckpointStore
+    from hospital_scheduler.crew import HospitalSchedulerCrew
+    from hospital_scheduler.timeutils import localize
+    from hospital_scheduler.tools.appointment_store import AppointmentStore, set_appointment_store
+
+    set_appointment_store(AppointmentStore(os.path.join(tempfile.mkdtemp(prefix="crew-bench-"), "appointments.db")))
+    first_day = date.today() + timedelta(days=1)
+
+    def patient_input(i):
+        day = first_day + timedelta(days=(i // 16) % 60)
+        when = localize(day, f"{9 + (i % 16) // 2:02d}:{30 * (i % 2):02d}")
+        return (
+            f"Patient Name: Patient {i}\n"
+            f"Reason for Visit: Check-up\n"
+            f"Preferred Appointment Date/Time: {when}\n"
+            f"Preferred Doctor Specialty: {SPECIALTIES[i % len(SPECIALTIES)]}"
+        )
+
+    checkpoints = CheckpointStore(tempfile.mkdtemp(prefix="crew-bench-checkpoints-"))
+    make_crew = lambda llm: HospitalSchedulerCrew(verbose=False, llm=llm, checkpoints=checkpoints)  # noqa: E731
+    return make_crew, lambda crew, i: crew.kickoff(patient_input(i))
+
+
+def run(args) -> dict:
+    make_crew, kickoff = (news_setup if args.project == "news" else hospital_setup)(args)
+    llm = FakeLLM(latency_ms=args.latency_ms, tokens=args.tokens, per_token_ms=args.per_token_ms)
+
+    setup_started = time.perf_counter()
+    crews: "queue.Queue" = queue.Queue()
+    for _ in range(args.concurrency):
+        crews.put(make_crew(llm))
+    setup_ms = (time.perf_counter() - setup_started) * 1000
+
+    latencies, errors = [], []
+
+    def one(i):
+        crew = crews.get()
+        started = time.perf_counter()
+        try:
+            kickoff(crew, i)
+            latencies.append((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            errors.append(repr(e))
+        finally:
+            crews.put(crew)
+
+    for i in range(args.warmup):
+        one(i)
+    latencies.clear()
+    llm.calls = llm.output_tokens = 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    result = report(f"{args.project} c={args.concurrency}", latencies, elapsed, len(errors))
+    result.update({"setup_ms": round(setup_ms, 1), "llm_calls": llm.calls, "llm_output_tokens": llm.output_tokens,
+                   "llm_latency_ms": args.latency_ms})
+    print(f"setup={setup_ms:.1f}ms for {args.concurrency} crews, llm_calls={llm.calls} "
+          f"({llm.calls / max(1, len(latencies)):.1f}/request)")
+    if errors:
+        print(f"first error: {errors[0]}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("project", choices=["news", "hospital"])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed kickoffs before measuring")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fixed cost of every fake LLM call")
+    parser.add_argument("--per-token-ms", type=float, default=0.0, help="Extra cost per output token")
+    parser.add_argument("--tokens", type=int, default=80, help="Length of generated summaries, in tokens")
+    parser.add_argument("--agents", action="store_true", help="News: disable the fast path (full agent pipeline)")
+    parser.add_argument("--cache", action="store_true", help="News: keep the response and per-article summary caches on")
+    parser.add_argument("--json", default=None, help="Append the result as a JSON line to this file")
+    args = parser.parse_args()
+    result = run(args)
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    sys.exit(1 if result["errors"] else 0)
@@ -0,0 +1,130 @@
+"""
+Deterministic local stand-in for gpt-4o-mini, for benchmarking the crews offline.
+
+FakeLLM answers crewAI's ReAct-style prompts without a network call: it recognises each
+task of the news curator and hospital scheduler by its description, calls the right tool
+once where the task needs one, and otherwise returns a final answer. Every call sleeps
+`latency_ms` (plus `per_token_ms` per output token) and summaries are `tokens` words long,
+so timings are repeatable and LLM cost can be dialled up or down.
+"""
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Union
+
+from crewai import BaseLLM
+
+WORDS = ("markets", "growth", "policy", "research", "launch", "outlook", "results", "update")
+TOPICS = ("technology", "finance", "health")
+
+
+def _text(messages: Union[str, List[Dict[str, Any]]]) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content", "")) for message in messages)
+
+
+def _observation(messages: Union[str, List[Dict[str, Any]]]):
+    """The latest tool result, if the agent has just called a tool (crewAI appends it as the last message)."""
+    if isinstance(messages, str) or not messages:
+        return None
+    last = str(messages[-1].get("content", ""))
+    if "Observation:" in last and "Current Task:" not in last:
+        return last.rsplit("Observation:", 1)[1].strip()
+    return None
+
+
+def _field(prompt: str, label: str) -> str:
+    match = re.search(rf"{re.escape(label)}:\s*(.+)", prompt)
+    return match.group(1).strip() if match else ""
+
+
+class FakeLLM(BaseLLM):
+    def __init__(self, latency_ms: float = 50.0, tokens: int = 80, per_token_ms: float = 0.0, model: str = "fake-llm"):
+        super().__init__(model=model)
+        self.latency_ms = latency_ms
+        self.tokens = tokens
+        self.per_token_ms = per_token_ms
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.output_tokens = 0
+
+    # --- BaseLLM interface ---
+
+    def supports_function_calling(self) -> bool:
+        return False  # keep crewAI on the text ReAct protocol this class speaks
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128_000
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> str:
+        answer = self._answer(_text(messages), _observation(messages))
+        output_tokens = len(answer.split())
+        with self._lock:
+            self.calls += 1
+            self.output_tokens += output_tokens
+        time.sleep((self.latency_ms + self.per_token_ms * output_tokens) / 1000)
+        return answer
+
+    # --- Canned answers per task ---
+
+    @staticmethod
+    def _final(answer: str) -> str:
+        return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+    @staticmethod
+    def _action(tool: str, arguments: dict) -> str:
+        return f"Thought: I should use the tool\nAction: {tool}\nAction Input: {json.dumps(arguments)}"
+
+    def _answer(self, prompt: str, observation) -> str:
+        if observation is not None:
+            return self._final(self._confirmation(observation) if "DatabaseTool" in prompt else observation)
+
+        if "Analyze the user's input:" in prompt:
+            query = re.search(r"Analyze the user's input: '(.*?)'", prompt, re.DOTALL)
+            query = query.group(1).lower() if query else ""
+            topics = [topic for topic in TOPICS if topic[:4] in query] or ["technology"]
+            style = "brief" if "brief" in query else "general"
+            return self._final(json.dumps({"topic": " and ".join(topics), "summary_style": style}))
+
+        if "Utilize the 'News API Tool'" in prompt:
+            topic = re.search(r"The user is interested in: '(.*?)'", prompt)
+            return self._action("News API Tool", {"topic": topic.group(1) if topic else "technology"})
+
+        if "Extract all essential patient details" in prompt:
+            return self._final(json.dumps({
+                "patient_name": _field(prompt, "Patient Name"),
+                "reason_for_visit": _field(prompt, "Reason for Visit"),
+                "appointment_time": _field(prompt, "Preferred Appointment Date/Time"),
+                "specialty": _field(prompt, "Preferred Doctor Specialty"),
+            }))
+
+        if "book_if_available" in prompt:
+            details = re.search(r"\{[^{}]*\"patient_name\"[^{}]*\}", prompt)
+            arguments = json.loads(details.group(0)) if details else {}
+            arguments.pop("reason_for_visit", None)
+            return self._action("DatabaseTool", {"action": "book_if_available", **arguments})
+
+        if "Summarize each of these news article excerpts" in prompt:
+            ids = sorted({int(i) for i in re.findall(r'"id": (\d+)', prompt)})
+            per_article = max(1, self.tokens // max(1, len(ids)))
+            summary = " ".join(WORDS[i % len(WORDS)] for i in range(per_article)) + "."
+            return self._final(json.dumps({"summaries": [{"id": i, "summary": summary} for i in ids]}))
+
+        words = [WORDS[i % len(WORDS)] for i in range(self.tokens)]
+        return self._final(" ".join(words) + ".")
+
+    @staticmethod
+    def _confirmation(observation: str) -> str:
+        try:
+            result = json.loads(observation)
+        except ValueError:
+            return observation
+        if result.get("success"):
+            return result.get("message", "Your appointment is confirmed.")
+        alternatives = ", ".join(result.get("alternatives") or []) or "none"
+        return f"The requested slot is unavailable. The nearest free times are: {alternatives}."
@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark: how long a fresh process takes to import each app and build its crew,
+and how long the news CLI takes to show its first prompt. Every run is a new interpreter.
+
+    python benchmarks/startup_bench.py news --runs 5
+    python benchmarks/startup_bench.py hospital --runs 5 --json results.jsonl
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = Path(__file__).resolve().parent
+PATHS = [str(ROOT / "news_curator_project" / "src"), str(ROOT / "hospital_scheduler" / "src"), str(BENCH_DIR)]
+sys.path.insert(0, str(BENCH_DIR))
+
+from stats import report  # noqa: E402
+
+# Imports the app's crew module and builds one crew on the fake LLM, printing the phase times
+CHILD = """
+import json, time
+started = time.perf_counter()
+from {module} import {factory}
+imported = time.perf_counter()
+from fake_llm import FakeLLM
+llm = FakeLLM(latency_ms=0)
+built = time.perf_counter()
+{factory}(verbose=False, llm=llm)
+finished = time.perf_counter()
+print(json.dumps({{"import_ms": (imported - started) * 1000, "construct_ms": (finished - built) * 1000}}))
+"""
+APPS = {
+    "news": ("news_curator_project.crew", "NewsCuratorCrew"),
+    "hospital": ("hospital_scheduler.crew", "HospitalSchedulerCrew"),
+}
+
+
+def _env() -> dict:
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(PATHS + [os.environ.get("PYTHONPATH", "")]))
+
+
+def cold_start(app: str) -> dict:
+    module, factory = APPS[app]
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD.format(module=module, factory=factory)],
+                            capture_output=True, text=True, env=_env(), check=True)
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    phases["total_ms"] = (time.perf_counter() - started) * 1000
+    return phases
+
+
+def time_to_prompt() -> float:
+    """Milliseconds until the news CLI has printed its greeting and is waiting for input."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", "from news_curator_project.main import run; run()"],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=_env())
+    for line in process.stdout:
+        if "Type 'exit' to quit." in line:
+            break
+    elapsed = (time.perf_counter() - started) * 1000
+    process.kill()
+    process.wait()
+    return elapsed
+
+
+def run(args) -> list:
+    runs = [cold_start(args.app) for _ in range(args.runs)]
+    results = []
+    for phase in ("total_ms", "import_ms", "construct_ms"):
+        result = report(f"{args.app} cold start {phase[:-3]}", [r[phase] for r in runs], sum(r["total_ms"] for r in runs) / 1000)
+        results.append(result)
+    if args.app == "news":
+        prompts = [time_to_prompt() for _ in range(args.runs)]
+        results.append(report("news CLI time to first prompt", prompts, sum(prompts) / 1000))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("app", choices=sorted(APPS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", default=None, help="Append the results as JSON lines to this file")
+    args = parser.parse_args()
+    results = run(args)
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
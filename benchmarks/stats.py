@@ -0,0 +1,40 @@
+"""Latency percentiles, throughput and peak RSS reporting shared by the benchmarks."""
+import math
+import resource
+import sys
+from typing import List, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def report(name: str, latencies_ms: List[float], elapsed_s: float, errors: int = 0) -> dict:
+    """Print one summary line and return the same figures as a dict."""
+    ordered = sorted(latencies_ms)
+    result = {
+        "name": name,
+        "requests": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+        "throughput_per_s": round(len(ordered) / elapsed_s, 2) if elapsed_s else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    print(f"{name}: n={result['requests']} errors={errors} p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+          f"p99={result['p99_ms']:.2f}ms max={result['max_ms']:.2f}ms throughput={result['throughput_per_s']:,.1f}/s "
+          f"peak_rss={result['peak_rss_mb']:.1f}MiB")
+    return result
@@ -0,0 +1,150 @@
+"""
+Microbenchmarks for the tools the agents call: NewsAPITool._run against a large synthetic
+corpus and DatabaseTool._run against a large appointment table. No LLM is involved.
+
+    python benchmarks/tool_bench.py news --articles 100000 --iterations 2000
+    python benchmarks/tool_bench.py database --bookings 200000 --iterations 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "news_curator_project" / "src"))
+sys.path.insert(0, str(ROOT / "hospital_scheduler" / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stats import report  # noqa: E402
+
+TOPICS = ["technology", "finance", "health", "science", "sports", "politics", "energy", "travel"]
+FILLER = ("market", "growth", "policy", "research", "launch", "study", "report", "company", "global",
+          "quarter", "patients", "device", "network", "climate", "election", "team", "record", "battery")
+SPECIALTIES = ["Cardiology", "Pediatrics", "General", "Dermatology"]
+
+
+def timed(name: str, call, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        call(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return report(name, latencies, time.perf_counter() - started)
+
+
+def bench_news(args) -> list:
+    from news_curator_project.crew import NewsAPITool
+    from news_curator_project.tools.news_store import ArticleStore, set_article_store
+
+    rng = random.Random(args.seed)
+
+    def articles():
+        for i in range(args.articles):
+            topic = TOPICS[i % len(TOPICS)]
+            words = [rng.choice(FILLER) for _ in range(60)]
+            yield {"title": f"{topic.title()} {' '.join(words[:5])} {i}", "content": " ".join(words),
+                   "source": f"Source {i % 50}", "topic": topic}
+
+    started = time.perf_counter()
+    store = ArticleStore(articles())
+    store.search("warmup")  # builds the posting lists
+    print(f"indexed {len(store):,} articles in {time.perf_counter() - started:.2f}s")
+    set_article_store(store)
+
+    tool = NewsAPITool()
+    queries = TOPICS + [f"{a} and {b}" for a, b in zip(TOPICS, TOPICS[1:])] + [f"{w} news" for w in FILLER]
+    profiles = [store.profile_weights(rng.sample(TOPICS + list(FILLER), 3)) for _ in range(64)]
+    return [
+        timed("NewsAPITool._run single topic", lambda i: tool._run(TOPICS[i % len(TOPICS)]), args.iterations),
+        timed("NewsAPITool._run mixed queries", lambda i: tool._run(queries[i % len(queries)]), args.iterations),
+        timed("ArticleStore.search topic term", lambda i: store.search(TOPICS[i % len(TOPICS)]), args.iterations),
+        timed("ArticleStore.search common term", lambda i: store.search(FILLER[i % len(FILLER)]), args.iterations),
+        timed("ArticleStore.search two terms",
+              lambda i: store.search(f"{TOPICS[i % len(TOPICS)]} {FILLER[i % len(FILLER)]}"), args.iterations),
+        timed("ArticleStore.search_many (64 profiles)", lambda i: store.search_many(profiles), max(1, args.iterations // 64)),
+    ]
+
+
+def bench_database(args) -> list:
+    from hospital_scheduler.timeutils import localize
+    from hospital_scheduler.tools.appointment_store import (
+        AppointmentStore, from_epoch, patient_key, set_appointment_store, specialty_key, to_epoch
+    )
+    from hospital_scheduler.tools.database_tool import DatabaseTool
+
+    path = os.path.join(tempfile.mkdtemp(prefix="tool-bench-"), "appointments.db")
+    store = AppointmentStore(path)
+    first_day = date.today() + timedelta(days=1)
+    per_day = 16 * len(SPECIALTIES)  # 09:00-17:00 in 30-minute slots
+    days = -(-args.bookings // per_day)
+
+    # Seed directly in SQL; going through book_if_available would make setup the benchmark
+    started = time.perf_counter()
+    rows = []
+    for n in range(args.bookings):
+        day = first_day + timedelta(days=n // per_day)
+        specialty = SPECIALTIES[n % len(SPECIALTIES)]
+        start = to_epoch(localize(day, "09:00")) + 1800 * ((n // len(SPECIALTIES)) % 16)
+        rows.append((f"Patient {n}", patient_key(f"Patient {n}"), specialty, specialty_key(specialty), start, start + 1800,
+                     from_epoch(start), 0))
+    with store.connection() as conn:
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO appointments (patient_name, patient_key, specialty, specialty_key, slot_start, slot_end, appointment_time, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("COMMIT")
+    store.close()
+    store = AppointmentStore(path)  # picks up the longest stored appointment and rebuilds the day counters
+    set_appointment_store(store)
+    print(f"seeded {store.count():,} bookings over {days} days in {time.perf_counter() - started:.2f}s")
+
+    tool = DatabaseTool()
+    rng = random.Random(args.seed)
+    times = [localize(first_day + timedelta(days=rng.randrange(days + 30)), f"{rng.randrange(9, 17):02d}:{rng.choice(['00', '30'])}")
+             for _ in range(args.iterations)]
+
+    def book(i):
+        tool._run("book_if_available", f"Bench {i}", times[i], SPECIALTIES[i % len(SPECIALTIES)])
+
+    return [
+        timed("DatabaseTool._run check_availability",
+              lambda i: tool._run("check_availability", appointment_time=times[i], specialty=SPECIALTIES[i % 4]), args.iterations),
+        timed("DatabaseTool._run next_free_slots",
+              lambda i: tool._run("next_free_slots", appointment_time=times[i], specialty=SPECIALTIES[i % 4]), args.iterations),
+        timed("DatabaseTool._run free_slots (7 days)",
+              lambda i: tool._run("free_slots", appointment_time=times[i],
+                                  specialty=SPECIALTIES[i % 4], end_date=str(date.fromisoformat(times[i][:10]) + timedelta(days=6))),
+              args.iterations),
+        timed("DatabaseTool._run book_if_available", book, args.iterations),
+        timed("DatabaseTool._run find_appointments (patient)",
+              lambda i: tool._run("find_appointments", f"Patient {rng.randrange(args.bookings)}"), args.iterations),
+        timed("DatabaseTool._run find_appointments (1 day)",
+              lambda i: tool._run("find_appointments", appointment_time=times[i], specialty=SPECIALTIES[i % 4]), args.iterations),
+        timed("DatabaseTool._run utilization (30 days)",
+              lambda i: tool._run("utilization", appointment_time=times[i], specialty=SPECIALTIES[i % 4],
+                                  end_date=str(date.fromisoformat(times[i][:10]) + timedelta(days=29))), args.iterations),
+        timed("DatabaseTool._run reschedule_appointment",
+              lambda i: tool._run("reschedule_appointment", f"Patient {i}", times[-1 - i], appointment_id=i + 1), args.iterations),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("tool", choices=["news", "database"])
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", default=None, help="Append the results as JSON lines to this file")
+    args = parser.parse_args()
+    results = bench_news(args) if args.tool == "news" else bench_database(args)
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
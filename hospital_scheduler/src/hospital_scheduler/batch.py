@@ -0,0 +1,125 @@
+import csv
+import json
+from typing import Callable, Iterator, Optional
+
+import pytz
+
+from hospital_scheduler.timeutils import localize_strings
+from hospital_scheduler.tools.appointment_store import AppointmentStore, get_appointment_store, to_epoch
+from hospital_scheduler.tools.slot_engine import SlotEngine
+
+# --- Bulk referral import ---
+# Structured referrals are validated, localized and booked directly against the appointment
+# store and slot engine, with no LLM involved. Only rows that can't be booked deterministically
+# (missing fields, unparseable or DST-ambiguous times) are handed to the scheduler agent.
+
+REQUIRED_FIELDS = ("patient_name", "specialty")
+
+
+def read_referrals(path: str) -> Iterator[dict]:
+    """Yield referral rows from a .csv (with a header row) or .jsonl file."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def referral_time(row: dict) -> str:
+    """
+    ISO 8601 appointment time for a row with either 'appointment_time' (ISO) or
+    'date' (YYYY-MM-DD) + 'time' (HH:MM). Raises ValueError if it can't be determined
+    unambiguously.
+    """
+    if row.get("appointment_time"):
+        value = str(row["appointment_time"]).strip()
+        to_epoch(value)  # validates, and rejects DST-ambiguous naive times
+        return value
+    if row.get("date") and row.get("time"):
+        return localize_strings(str(row["date"]), str(row["time"]))
+    raise ValueError("missing appointment_time (or date + time)")
+
+
+def referral_to_patient_input(row: dict) -> str:
+    """Free-text patient input for the scheduler agent, in the same format as the CLI and Gradio app."""
+    when = row.get("appointment_time") or " ".join(str(row.get(k, "")) for k in ("date", "time")).strip()
+    return (
+        f"Patient Name: {row.get('patient_name', '')}\n"
+        f"Reason for Visit: {row.get('reason', '')}\n"
+        f"Preferred Appointment Date/Time: {when}\n"
+        f"Preferred Doctor Specialty: {row.get('specialty', '')}"
+    )
+
+
+class ReferralBatch:
+    """
+    Books referrals one row at a time: the requested slot if it's free and on the calendar, otherwise
+    (with `reschedule`) the nearest free slot for that specialty. Rows that fail
+    validation go to `fallback(row) -> str` (e.g. the scheduler agent) when given,
+    or are reported as 'needs_review'.
+    """
+
+    def __init__(self, store: Optional[AppointmentStore] = None, engine: Optional[SlotEngine] = None,
+                 fallback: Optional[Callable[[dict], str]] = None, reschedule: bool = True):
+        self.store = store or get_appointment_store()
+        # The import is the only writer it knows about, so it can keep day bitmaps in memory
+        self.engine = engine or SlotEngine(self.store, cache_bitmaps=True)
+        self.fallback = fallback
+        self.reschedule = reschedule
+
+    def book(self, row: dict) -> dict:
+        missing = [field for field in REQUIRED_FIELDS if not str(row.get(field) or "").strip()]
+        try:
+            if missing:
+                raise ValueError(f"missing {', '.join(missing)}")
+            when = referral_time(row)
+        except (ValueError, pytz.exceptions.InvalidTimeError) as e:
+            return self._fallback(row, str(e) or type(e).__name__)
+
+        patient, specialty = row["patient_name"].strip(), row["specialty"].strip()
+        minutes = self.engine.calendar(specialty).slot_minutes
+        # A time outside the specialty's calendar is treated like a taken slot: moved to the nearest free one
+        problem = self.engine.check_slot(specialty, when)
+        if problem is None:
+            result = self.store.book_if_available(patient, when, specialty, minutes)
+            if result["booked"]:
+                self._mark(specialty, result["appointment"])
+                return {"status": "booked", "row": row, "appointment": result["appointment"]}
+        if not self.reschedule:
+            return {"status": "unavailable", "row": row, "requested": when, **({"reason": problem} if problem else {})}
+
+        # The nearest free slot can be taken by a concurrent booking between lookup and insert, so retry a few times
+        for _ in range(3):
+            alternatives = self.engine.next_free_slots(specialty, when, count=1)
+            if not alternatives:
+                break
+            result = self.store.book_if_available(patient, alternatives[0], specialty, minutes)
+            if result["booked"]:
+                self._mark(specialty, result["appointment"])
+                return {"status": "rescheduled", "row": row, "requested": when, "appointment": result["appointment"]}
+            self._mark(specialty, result["conflict"])  # someone else got there first
+        return {"status": "unavailable", "row": row, "requested": when}
+
+    def _mark(self, specialty: str, appointment: Optional[dict]) -> None:
+        if appointment:
+            self.engine.mark_booked(specialty, to_epoch(appointment["slot_start"]), to_epoch(appointment["slot_end"]))
+
+    def _fallback(self, row: dict, reason: str) -> dict:
+        if self.fallback is None:
+            return {"status": "needs_review", "row": row, "reason": reason}
+        try:
+            return {"status": "agent", "row": row, "reason": reason, "agent_response": str(self.fallback(row))}
+        except Exception as e:
+            return {"status": "needs_review", "row": row, "reason": f"{reason}; agent failed: {e}"}
+
+    def run(self, input_path: str, output_path: str) -> dict:
+        """Book every referral in `input_path` and write one JSON result per row to `output_path`."""
+        counts = {}
+        with open(output_path, "w", encoding="utf-8") as out:
+            for row in read_referrals(input_path):
+                result = self.book(row)
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                out.write(json.dumps(result) + "\n")
+        return counts
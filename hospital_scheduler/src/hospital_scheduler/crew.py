@@ -1,68 +1,164 @@
+import json
+import re
+import threading
 import yaml
 from crewai import Crew, Process, Agent, Task
+from hospital_scheduler.checkpoints import CheckpointStore, RunCheckpoint, default_checkpoint_store, untracked_run
+from hospital_scheduler.llm_gateway import GatewayLLM, StopWordsLLM, get_gateway
+from hospital_scheduler.models import PatientDetails
+from hospital_scheduler.routing import Route, get_router
+from hospital_scheduler.streaming import stream_kickoff
+from hospital_scheduler.timing import StageTimer
+from hospital_scheduler.tracing import default_exporter, record_usage, trace_run, verbose_enabled
 from hospital_scheduler.tools.database_tool import DatabaseTool
 from pathlib import Path
-from langchain_openai import ChatOpenAI # CORRECTED: Import ChatOpenAI from langchain_openai
 
-class HospitalSchedulerCrew:
-    def __init__(self, patient_input: str):
-        self.patient_input = patient_input
-        #self.config_dir = Path(__file__).parent.parent.parent / "config"
-        self.config_dir = Path(__file__).parent / "config"
+CONFIG_DIR = Path(__file__).parent / "config"
+
+# --- Process-wide caches ---
+# YAML config is parsed once and LLM clients are shared per model name, so every crew
+# reuses the same HTTP connection pool instead of opening a new one per request. All clients go
+# through the shared LLM gateway (coalescing + global rate budget); streaming clients publish
+# each token on the event bus.
+_config_cache = {}
+_llm_clients = {}
+_cache_lock = threading.Lock()
+
+
+def load_config(config_dir: Path = CONFIG_DIR):
+    """Load and validate agents.yaml and tasks.yaml, parsing them only once per directory."""
+    with _cache_lock:
+        if config_dir in _config_cache:
+            return _config_cache[config_dir]
         try:
-            with open(self.config_dir / "agents.yaml", "r") as f:
-                self.agents_data = yaml.safe_load(f)
-            with open(self.config_dir / "tasks.yaml", "r") as f:
-                self.tasks_data = yaml.safe_load(f)
+            with open(config_dir / "agents.yaml", "r") as f:
+                agents_data = yaml.safe_load(f)
+            with open(config_dir / "tasks.yaml", "r") as f:
+                tasks_data = yaml.safe_load(f)
 
-            if not isinstance(self.agents_data, dict) or "scheduler" not in self.agents_data or not isinstance(self.agents_data["scheduler"], dict):
+            if not isinstance(agents_data, dict) or "scheduler" not in agents_data or not isinstance(agents_data["scheduler"], dict):
                 raise ValueError("agents.yaml did not load correctly or 'scheduler' is missing/invalid.")
-            if not isinstance(self.agents_data, dict) or "database_agent" not in self.agents_data or not isinstance(self.agents_data["database_agent"], dict):
+            if not isinstance(agents_data, dict) or "database_agent" not in agents_data or not isinstance(agents_data["database_agent"], dict):
                 raise ValueError("agents.yaml did not load correctly or 'database_agent' is missing/invalid.")
-            if not isinstance(self.tasks_data, dict) or "collect_details_task" not in self.tasks_data or not isinstance(self.tasks_data["collect_details_task"], dict):
+            if not isinstance(tasks_data, dict) or "collect_details_task" not in tasks_data or not isinstance(tasks_data["collect_details_task"], dict):
                 raise ValueError("tasks.yaml did not load correctly or 'collect_details_task' is missing/invalid.")
-            if not isinstance(self.tasks_data, dict) or "manage_booking_task" not in self.tasks_data or not isinstance(self.tasks_data["manage_booking_task"], dict):
+            if not isinstance(tasks_data, dict) or "manage_booking_task" not in tasks_data or not isinstance(tasks_data["manage_booking_task"], dict):
                 raise ValueError("tasks.yaml did not load correctly or 'manage_booking_task' is missing/invalid.")
 
         except FileNotFoundError as e:
-            raise FileNotFoundError(f"Configuration file not found: {e}. Looked in: {self.config_dir}")
+            raise FileNotFoundError(f"Configuration file not found: {e}. Looked in: {config_dir}")
         except yaml.YAMLError as e:
             raise yaml.YAMLError(f"Error parsing YAML file: {e}")
 
-    def setup_crew(self) -> Crew:
+        _config_cache[config_dir] = (agents_data, tasks_data)
+        return agents_data, tasks_data
+
+
+def get_llm(model_name: str = "gpt-4o-mini", stream: bool = False, max_tokens: int = None):
+    with _cache_lock:
+        if (model_name, stream, max_tokens) not in _llm_clients:
+            _llm_clients[(model_name, stream, max_tokens)] = GatewayLLM(
+                StopWordsLLM(model=model_name, stream=stream, max_tokens=max_tokens), get_gateway())
+        return _llm_clients[(model_name, stream, max_tokens)]
+
+
+def agent_route(name: str, agent_config: dict) -> Route:
+    """The agent's model route from its agents.yaml entry: 'slo_ms', 'max_tokens' and 'llm' as the first tier."""
+    return Route(name, slo_ms=float(agent_config.get("slo_ms", 4000)), max_tokens=agent_config.get("max_tokens"),
+                 tier=agent_config.get("llm"))
+
+
+def patient_details_from_output(output) -> dict:
+    """The details crew's validated PatientDetails; raises ValueError when the output doesn't validate."""
+    if output.pydantic is not None:
+        return output.pydantic.model_dump()
+    # Not validated by crewai (e.g. prose around the JSON): validate it here instead
+    match = re.search(r"\{.*\}", str(output), re.DOTALL)
+    if match is None:
+        raise ValueError(f"The scheduler returned no patient details: {output}")
+    return PatientDetails.model_validate_json(match.group(0)).model_dump()
+
+
+class HospitalSchedulerCrew:
+    """
+    Warm, reusable scheduler crew: config, LLM clients, tools and the Crew itself are built once
+    and `kickoff` can be called for any number of patients. `patient_input` may still be given
+    up front for one-shot use. With `stream` on, agents stream their tokens; use `kickoff_stream`
+    to consume them. Setup timings are kept in `setup_timings`, the latest run's in
+    `last_run_timings`. Each kickoff is traced (tasks, agents, LLM calls, DatabaseTool calls,
+    tokens); the latest trace is `last_trace`, exported as JSON lines when HOSPITAL_TRACE_PATH
+    is set. `verbose=False` (or HOSPITAL_VERBOSE=0) turns off the agents' and crew's console logs.
+    `llm` overrides the configured model for both agents; otherwise each agent's calls are routed
+    across HOSPITAL_MODEL_TIERS by its 'slo_ms' and 'max_tokens' in agents.yaml (see routing.py).
+    A kickoff runs two stages, each a one-task crew: `details_crew` extracts the patient details
+    and `booking_crew` books them. Both are checkpointed under a run ID in `checkpoints` (default:
+    HOSPITAL_CHECKPOINT_DIR when HOSPITAL_CHECKPOINTS=1); `kickoff(run_id=...)` resumes a failed
+    run from the stage that failed and `replay` re-runs chosen stages of a recorded run from their
+    recorded inputs.
+    """
+
+    def __init__(self, patient_input: str = None, stream: bool = False, verbose: bool = None, llm=None,
+                 checkpoints: CheckpointStore = None):
+        self.patient_input = patient_input
+        self.checkpoints = checkpoints if checkpoints is not None else default_checkpoint_store()
+        self.last_run_id = None
+        self.stream = stream
+        self.llm = llm
+        self.verbose = verbose_enabled() if verbose is None else verbose
+        self.trace_exporter = default_exporter()
+        self.last_trace = None
+        #self.config_dir = Path(__file__).parent.parent.parent / "config"
+        self.config_dir = CONFIG_DIR
+        timer = StageTimer()
+        self.agents_data, self.tasks_data = load_config(self.config_dir)
+        timer.lap("config")
+        self.details_crew, self.booking_crew = self.setup_crew(timer)
+        self.setup_timings = timer
+        self.last_run_timings = StageTimer()
+        self._kickoff_lock = threading.Lock()
+
+    def setup_crew(self, timer: StageTimer = None) -> tuple:
+        timer = timer or StageTimer()
         scheduler_config = self.agents_data["scheduler"]
         database_agent_config = self.agents_data["database_agent"]
         collect_details_task_config = self.tasks_data["collect_details_task"]
         manage_booking_task_config = self.tasks_data["manage_booking_task"]
 
-        # Instantiate LLMs using ChatOpenAI
-        scheduler_llm = ChatOpenAI(model_name=scheduler_config.get("llm", "gpt-4o-mini"))
-        database_agent_llm = ChatOpenAI(model_name=database_agent_config.get("llm", "gpt-4o-mini"))
+        # Shared LLM clients (one per model for the whole process), routed per agent across the model tiers
+        router = get_router()
+        make_client = lambda model, max_tokens: get_llm(model, stream=self.stream, max_tokens=max_tokens)
+        self.scheduler_llm = router.llm(agent_route("scheduler", scheduler_config), make_client, self.llm)
+        database_agent_llm = router.llm(agent_route("database_agent", database_agent_config), make_client, self.llm)
+        # The tool is stateless, so agents and tasks all share one instance
+        database_tool = DatabaseTool()
+        timer.lap("llm_and_tools")
 
         scheduler = Agent(
             role=scheduler_config["role"],
             goal=scheduler_config["goal"],
             backstory=scheduler_config["backstory"],
-            verbose=scheduler_config.get("verbose", False),
+            verbose=self.verbose and scheduler_config.get("verbose", False),
             allow_delegation=scheduler_config.get("allow_delegation", False),
-            llm=scheduler_llm,
-            tools=[DatabaseTool()]
+            llm=self.scheduler_llm,
+            tools=[database_tool]
         )
         database_agent = Agent(
             role=database_agent_config["role"],
             goal=database_agent_config["goal"],
             backstory=database_agent_config["backstory"],
-            verbose=database_agent_config.get("verbose", False),
+            verbose=self.verbose and database_agent_config.get("verbose", False),
             allow_delegation=database_agent_config.get("allow_delegation", False),
             llm=database_agent_llm,
-            tools=[DatabaseTool()]
+            tools=[database_tool]
         )
+        timer.lap("agents")
 
         collect_details_task = Task(
             description=collect_details_task_config["description"],
             expected_output=collect_details_task_config["expected_output"],
             agent=scheduler,
-            tools=[DatabaseTool()],
+            tools=[database_tool],
+            output_pydantic=PatientDetails, # The booking task gets validated JSON, not free text
             human_input=collect_details_task_config.get("human_input", False)
         )
 
@@ -70,18 +166,90 @@ class HospitalSchedulerCrew:
             description=manage_booking_task_config["description"],
             expected_output=manage_booking_task_config["expected_output"],
             agent=database_agent,
-            tools=[DatabaseTool()],
+            tools=[database_tool],
             human_input=manage_booking_task_config.get("human_input", False)
         )
+        timer.lap("tasks")
 
-        return Crew(
-            agents=[scheduler, database_agent],
-            tasks=[collect_details_task, manage_booking_task],
+        # One crew per task, so each stage's output can be checkpointed on its own
+        details_crew = Crew(
+            agents=[scheduler],
+            tasks=[collect_details_task],
+            process=Process.sequential,
+            verbose=self.verbose
+        )
+        booking_crew = Crew(
+            agents=[database_agent],
+            tasks=[manage_booking_task],
             process=Process.sequential,
-            verbose=True
+            verbose=self.verbose
         )
+        timer.lap("crew")
+        return details_crew, booking_crew
+
+    def kickoff(self, patient_input: str = None, run_id: str = None) -> str:
+        """
+        Book an appointment for `patient_input`. Passing the `run_id` of an earlier run (see
+        `last_run_id`) resumes it: a recorded details stage is reused and only booking runs.
+        """
+        patient_input = patient_input if patient_input is not None else self.patient_input
+        if not patient_input and not run_id:
+            raise ValueError("No patient input given to kickoff().")
+        # A Crew holds per-run task state, so concurrent callers take turns on the warm crews.
+        with self._kickoff_lock, trace_run("hospital.kickoff", exporter=self.trace_exporter) as trace:
+            self.last_trace = trace
+            inputs = {"patient_input": patient_input}
+            if self.checkpoints is None:
+                if not patient_input:
+                    raise ValueError(f"No recorded run {run_id} to resume (checkpoints are off).")
+                run = untracked_run("hospital", inputs)
+            else:
+                # Without new input the run must already be recorded; an unknown ID raises before anything is written
+                run = self.checkpoints.start("hospital", inputs, run_id, resume_only=not patient_input)
+            self.last_run_id = run.run_id
+            trace.set(run_id=run.run_id)
+            result = self._run(run)
+            run.finish(result)
+        return result
+
+    def replay(self, run_id: str, stages: list = None) -> dict:
+        """
+        Re-run `stages` ('details', 'booking'; default both) of a recorded run from their recorded
+        inputs and report per stage whether the output matched. Booking the same patient into the
+        same slot again returns the existing booking, so replaying 'booking' is safe.
+        """
+        if self.checkpoints is None:
+            raise RuntimeError("Checkpoints are off; set HOSPITAL_CHECKPOINTS=1 to record runs for replay.")
+        run = self.checkpoints.replay(run_id, stages)
+        with self._kickoff_lock, trace_run("hospital.replay", exporter=self.trace_exporter, run_id=run_id) as trace:
+            self.last_trace = trace
+            self._run(run)
+        return run.report()
+
+    def _run(self, run: RunCheckpoint) -> str:
+        timer = StageTimer()
+        patient_input = run.inputs["patient_input"]
+        with timer.stage("details"):
+            details = run.stage("details", {"patient_input": patient_input}, lambda: self._details(patient_input))
+        with timer.stage("booking"):
+            result = run.stage("booking", details, lambda: self._book(details))
+        self.last_run_timings = timer
+        return result
+
+    def _details(self, patient_input: str) -> dict:
+        def attempt():
+            output = self.details_crew.kickoff(inputs={"patient_input": patient_input})
+            record_usage(output)
+            return output
+
+        # Details that don't validate are extracted again by a stronger model before the stage fails
+        return self.scheduler_llm.run(attempt, patient_details_from_output)
+
+    def _book(self, details: dict) -> str:
+        output = self.booking_crew.kickoff(inputs={"patient_details": json.dumps(details)})
+        record_usage(output)
+        return str(output)
 
-    def kickoff(self):
-        crew = self.setup_crew()
-        result = crew.kickoff(inputs={"patient_input": self.patient_input})
-        return result
\ No newline at end of file
+    def kickoff_stream(self, patient_input: str = None, run_id: str = None):
+        """Like `kickoff`, but yields ('stage' | 'token' | 'result' | 'error', text) events as they arrive."""
+        return stream_kickoff(lambda: self.kickoff(patient_input, run_id))
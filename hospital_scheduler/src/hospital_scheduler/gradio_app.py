@@ -1,9 +1,14 @@
-import gradio as gr
+from contextlib import closing
 from datetime import datetime, timedelta
-import pytz # For timezone awareness
 import os
+import sys
 
-from hospital_scheduler.crew import HospitalSchedulerCrew
+from hospital_scheduler.serving import PoolBusy, PoolTimeout, create_app, get_crew_pool
+from hospital_scheduler.timeutils import LOCAL_TIMEZONE as local_timezone, localize
+from hospital_scheduler.timing import startup_report
+
+# gradio and crewai are both slow to import: gradio is only imported to build the UI, and the
+# crew module is imported (and the pool's crews built) in the background once the app is launching.
 
 # --- Configuration ---
 # Ensure your OPENAI_API_KEY is set as an environment variable
@@ -11,9 +16,6 @@ from hospital_scheduler.crew import HospitalSchedulerCrew
 # For local development, it's best to set this in your system environment
 # or use a .env file and load it (e.g., with python-dotenv)
 
-# Define the local timezone for appointment scheduling
-local_timezone = pytz.timezone('America/New_York') # Oshawa is in this timezone
-
 # --- Core Function to Run CrewAI ---
 def schedule_appointment(
     patient_name: str,
@@ -24,28 +26,20 @@ def schedule_appointment(
 ):
     """
     This function takes inputs from the Gradio UI, formats them for CrewAI,
-    and then runs the HospitalSchedulerCrew.
+    and then runs the HospitalSchedulerCrew. It is a generator, so Gradio renders
+    progress and the agents' output while the crew is still running.
     """
     if not all([patient_name, reason_for_visit, appointment_date, appointment_time_str, doctor_specialty]):
-        return "Error: Please fill in all required fields."
+        yield "Error: Please fill in all required fields."
+        return
 
     try:
-        # Combine date and time into a timezone-aware datetime object
-        time_parts = list(map(int, appointment_time_str.split(':')))
-        if len(time_parts) != 2 or not (0 <= time_parts[0] <= 23) or not (0 <= time_parts[1] <= 59):
-            return "Error: Invalid time format. Please use HH:MM (e.g., 09:00)."
-
-        combined_datetime_naive = datetime(
-            appointment_date.year,
-            appointment_date.month,
-            appointment_date.day,
-            time_parts[0],
-            time_parts[1]
-        )
-        local_dt = local_timezone.localize(combined_datetime_naive, is_dst=None) # is_dst=None lets pytz figure it out
-
-        # Convert to ISO 8601 string (with timezone offset) for the bot
-        iso_datetime_str = local_dt.isoformat()
+        # Combine date and time into a timezone-aware ISO 8601 string (with offset) for the bot
+        try:
+            iso_datetime_str = localize(appointment_date, appointment_time_str)
+        except ValueError:
+            yield "Error: Invalid time format. Please use HH:MM (e.g., 09:00)."
+            return
 
         # Construct the patient input string for the CrewAI bot
         patient_input_for_bot = (
@@ -57,43 +51,66 @@ def schedule_appointment(
 
         print(f"\n[Gradio App] Input to CrewAI:\n{patient_input_for_bot}\n") # For terminal visibility
 
-        # Initialize and run the CrewAI logic
-        crew = HospitalSchedulerCrew(patient_input_for_bot)
-        crew_output = crew.kickoff()
-
-        return crew_output
-
+        # Run the CrewAI logic on a warm crew borrowed from the pool (waiting in its bounded queue
+        # if all are busy), rendering progress messages and the current agent's tokens as they arrive.
+        # If the client disconnects, closing the stream waits for the kickoff before the crew goes back.
+        yield "Waiting for a free scheduler..."
+        with get_crew_pool().crew() as crew, closing(crew.kickoff_stream(patient_input_for_bot)) as events:
+            progress, answer = [], ""
+            for kind, payload in events:
+                if kind == "stage":
+                    progress.append(f"- {payload}")
+                    if payload.startswith("Started:"):
+                        answer = ""  # show only the agent that is currently working
+                elif kind == "token":
+                    answer += payload
+                elif kind == "result":
+                    answer = payload
+                elif kind == "error":
+                    raise RuntimeError(payload)
+                yield _render(progress, answer)
+            print(f"[Gradio App] Timings: setup ({crew.setup_timings}), run ({crew.last_run_timings}), trace ({crew.last_trace})")
+
+    except (PoolBusy, PoolTimeout) as e:
+        yield f"The scheduler is very busy right now, please try again in a minute. ({e})"
     except Exception as e:
         # Log the error for debugging
         print(f"\n[Gradio App Error] {e}")
-        return f"An error occurred: {str(e)}"
+        yield f"An error occurred: {str(e)}"
+
+def _render(progress: list, answer: str) -> str:
+    """Markdown for the output box: progress so far, then the (partial) answer."""
+    return "\n".join(progress) + ("\n\n---\n\n" + answer if answer else "")
 
 # --- Gradio Interface Setup ---
 
-# Set default date to tomorrow for convenience
-default_date = datetime.now(local_timezone).date() + timedelta(days=1)
-
-# Define Gradio Interface components
-inputs = [
-    gr.Textbox(label="Patient Name", placeholder="e.g., John Doe"),
-    gr.Textbox(label="Reason for visit / Desired Service", placeholder="e.g., General health checkup"),
-    gr.Date(label="Preferred Date", value=default_date, interactive=True), # Date picker
-    gr.Textbox(label="Preferred Time (HH:MM)", placeholder="e.g., 09:00, 14:30"), # Text for time
-    gr.Textbox(label="Preferred Doctor Specialty", placeholder="e.g., Cardiology, Pediatrics, General"),
-]
-
-outputs = gr.Markdown(label="AI Agent Response") # Use Markdown to render rich text output
-
-# Create the Gradio Interface
-iface = gr.Interface(
-    fn=schedule_appointment,
-    inputs=inputs,
-    outputs=outputs,
-    title="🏥 Hospital Appointment Scheduler (Gradio)",
-    description="Enter patient details to schedule an appointment with our AI assistant.",
-    allow_flagging="never", # Prevents user from 'flagging' outputs
-    theme=gr.themes.Soft() # A softer theme
-)
+def build_interface():
+    import gradio as gr
+
+    # Set default date to tomorrow for convenience
+    default_date = datetime.now(local_timezone).date() + timedelta(days=1)
+
+    # Define Gradio Interface components
+    inputs = [
+        gr.Textbox(label="Patient Name", placeholder="e.g., John Doe"),
+        gr.Textbox(label="Reason for visit / Desired Service", placeholder="e.g., General health checkup"),
+        gr.Date(label="Preferred Date", value=default_date, interactive=True), # Date picker
+        gr.Textbox(label="Preferred Time (HH:MM)", placeholder="e.g., 09:00, 14:30"), # Text for time
+        gr.Textbox(label="Preferred Doctor Specialty", placeholder="e.g., Cardiology, Pediatrics, General"),
+    ]
+
+    outputs = gr.Markdown(label="AI Agent Response") # Use Markdown to render rich text output
+
+    # Create the Gradio Interface
+    return gr.Interface(
+        fn=schedule_appointment,
+        inputs=inputs,
+        outputs=outputs,
+        title="🏥 Hospital Appointment Scheduler (Gradio)",
+        description="Enter patient details to schedule an appointment with our AI assistant.",
+        allow_flagging="never", # Prevents user from 'flagging' outputs
+        theme=gr.themes.Soft() # A softer theme
+    )
 
 # Launch the Gradio app
 if __name__ == "__main__":
@@ -102,8 +119,18 @@ if __name__ == "__main__":
     # os.environ["OPENAI_API_KEY"] = "YOUR_OPENAI_API_KEY"
     # It's better practice to set it outside the script (e.g., .env file or system env vars)
 
-    iface.launch(
-        server_name="0.0.0.0", # Allows access from other devices on your local network
-        server_port=7860,    # Default Gradio port, choose another if 7860 is busy
-        # share=True         # Uncomment to generate a public shareable link (temporary)
-    )
\ No newline at end of file
+    # Pass --profile-startup to print where cold-start time goes (imports by module, crew construction) and exit
+    if "--profile-startup" in sys.argv[1:]:
+        print(startup_report("hospital_scheduler.crew", get_crew_pool().factory))
+        sys.exit(0)
+
+    import uvicorn
+
+    pool = get_crew_pool()
+    pool.warm()  # crews are ready (or nearly) by the time the first form is submitted
+    app = create_app(build_interface(), pool)  # the UI at /, queue depth and latency at /metrics
+    uvicorn.run(
+        app,
+        host="0.0.0.0", # Allows access from other devices on your local network
+        port=int(os.environ.get("PORT", "7860")), # Default Gradio port, set PORT if 7860 is busy
+    )
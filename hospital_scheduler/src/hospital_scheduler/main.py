@@ -1,10 +1,25 @@
 import os
+import sys
+import time
+import argparse
 from datetime import datetime
-import pytz # Make sure you have this installed: pip install pytz
 
-from hospital_scheduler.crew import HospitalSchedulerCrew
+from hospital_scheduler.timeutils import localize, parse_time
+from hospital_scheduler.timing import build_in_background, startup_report
+
+# crewai is slow to import, so the crew module is only imported where a crew is needed
+def _build_crew(*args, **kwargs):
+    from hospital_scheduler.crew import HospitalSchedulerCrew
+    return HospitalSchedulerCrew(*args, **kwargs)
 
 def run():
+    # Pass --profile-startup to print where cold-start time goes (imports by module, crew construction) and exit
+    if "--profile-startup" in sys.argv[1:]:
+        print(startup_report("hospital_scheduler.crew", _build_crew))
+        return
+
+    # Import crewai and build the crew in the background while the patient details are typed in
+    crew_future = build_in_background(_build_crew)
     print("\n--- Hospital Appointment Scheduler (Terminal Mode) ---")
 
     # 1. Get Patient Name
@@ -32,12 +47,8 @@ def run():
     while True:
         time_str = input("Enter Preferred Time (HH:MM, e.g., 09:00 or 14:30): ")
         try:
-            time_parts = list(map(int, time_str.split(':')))
-            if len(time_parts) == 2 and 0 <= time_parts[0] <= 23 and 0 <= time_parts[1] <= 59:
-                preferred_time = datetime.strptime(time_str, "%H:%M").time()
-                break
-            else:
-                print("Invalid time format. Please use HH:MM.")
+            parse_time(time_str)
+            break
         except ValueError:
             print("Invalid time format. Please use HH:MM.")
 
@@ -47,19 +58,13 @@ def run():
         print("Doctor Specialty cannot be empty. Exiting.")
         return
 
-    # Combine date and time into an ISO format string
-    # Using current location time zone (Oshawa, Ontario, Canada is EDT currently)
-    local_timezone = pytz.timezone('America/New_York') # Oshawa is in this timezone
-
-    # Create a naive datetime object
-    combined_datetime_naive = datetime.combine(preferred_date, preferred_time)
-
-    # Make the datetime timezone-aware
-    # Using 'localize' for local time
-    local_dt = local_timezone.localize(combined_datetime_naive, is_dst=None) # is_dst=None lets pytz figure it out
-
-    # Convert to ISO 8601 string (with timezone offset)
-    iso_datetime_str = local_dt.isoformat()
+    # Combine date and time into an ISO 8601 string (with timezone offset)
+    # in the hospital's time zone (Oshawa, Ontario, Canada -> America/New_York)
+    try:
+        iso_datetime_str = localize(preferred_date, time_str)
+    except ValueError as e:
+        print(f"Could not schedule that time: {e}")
+        return
 
     # Construct the patient input string for the CrewAI bot
     patient_input_for_bot = (
@@ -73,22 +78,94 @@ def run():
     print(patient_input_for_bot)
     print("---------------------------------------")
 
+    crew = None
     try:
-        crew = HospitalSchedulerCrew(patient_input_for_bot)
-        result = crew.kickoff()
+        crew = crew_future.result()
+        result = crew.kickoff(patient_input_for_bot)
 
         print("\n\n########################")
         print("## Here is the Final Result from the AI Agent")
         print("########################\n")
         print(result)
+        # Pass --stats to print the run id, timings, trace and model-route stats
+        if "--stats" in sys.argv[1:]:
+            print(f"\n(run: {crew.last_run_id}; timings: setup {crew.setup_timings}; run {crew.last_run_timings}; trace: {crew.last_trace})")
+            from hospital_scheduler.routing import get_router
+            print(f"(model routes: {get_router().stats()})")
         print("\n--- End of Crew Execution ---")
 
     except Exception as e:
         print(f"\nERROR: An error occurred while running the crew: {e}")
+        run_id = crew.last_run_id if crew is not None else None
+        if run_id:
+            print(f"(run {run_id} is checkpointed; `replay {run_id} --resume` continues it from the failed stage)")
         # Optionally, print the full traceback for debugging:
         # import traceback
         # traceback.print_exc()
 
+def batch():
+    """
+    Bulk-book structured referrals without an LLM round trip per row.
+    Usage: batch_schedule <referrals.csv|referrals.jsonl> <results.jsonl> [--no-llm] [--no-reschedule]
+    """
+    parser = argparse.ArgumentParser(prog="batch_schedule", description="Book a CSV/JSONL file of referrals.")
+    parser.add_argument("referrals", help="CSV with a header row, or JSONL; columns: patient_name, reason, specialty, "
+                                          "and appointment_time (ISO) or date (YYYY-MM-DD) + time (HH:MM)")
+    parser.add_argument("output", help="JSONL file with one result per referral")
+    parser.add_argument("--no-llm", action="store_true", help="Mark malformed rows 'needs_review' instead of asking the scheduler agent")
+    parser.add_argument("--no-reschedule", action="store_true", help="Don't move referrals to the nearest free slot when theirs is taken")
+    args = parser.parse_args(sys.argv[1:])
+
+    from hospital_scheduler.batch import ReferralBatch, referral_to_patient_input
+
+    fallback = None
+    if not args.no_llm:
+        crew = None
+
+        def fallback(row):
+            nonlocal crew
+            crew = crew or _build_crew()
+            return crew.kickoff(referral_to_patient_input(row))
+
+    started = time.perf_counter()
+    counts = ReferralBatch(fallback=fallback, reschedule=not args.no_reschedule).run(args.referrals, args.output)
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Processed {total} referrals in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f}/s): {counts}")
+
+def replay():
+    """
+    Re-run stages of a checkpointed run from their recorded inputs and compare the outputs.
+    Usage: replay [<run_id>] [--stages details,booking] [--resume]
+    Without a run ID, lists the recorded runs. With --resume, finishes a failed run instead:
+    a recorded details stage is reused and only booking runs.
+    """
+    parser = argparse.ArgumentParser(prog="replay", description="Replay or resume a checkpointed scheduling run.")
+    parser.add_argument("run_id", nargs="?", help="Run ID (printed after each booking; default: list runs)")
+    parser.add_argument("--stages", default=None, help="Comma-separated stages to re-run (default: details,booking)")
+    parser.add_argument("--resume", action="store_true", help="Resume the run from its first unfinished stage")
+    args = parser.parse_args(sys.argv[1:])
+
+    from hospital_scheduler.checkpoints import default_checkpoint_store
+    store = default_checkpoint_store()
+    if store is None:
+        raise SystemExit("Checkpoints are off; set HOSPITAL_CHECKPOINTS=1 to record runs for replay.")
+    if not args.run_id:
+        for run_id in store.runs():
+            record = store.load(run_id) or {}
+            print(f"{run_id}  {record.get('status')}  stages: {', '.join(record.get('stages', {}))}")
+        return
+    crew = _build_crew(checkpoints=store)
+    if args.resume:
+        print(crew.kickoff(run_id=args.run_id))
+        return
+    report = crew.replay(args.run_id, args.stages.split(",") if args.stages else None)
+    for stage, result in report.items():
+        status = "same output" if result["matches"] else "CHANGED"
+        print(f"{stage}: {status}; recorded {result['recorded_seconds']}s, replayed {result['replayed_seconds']}s")
+    if not all(result["matches"] for result in report.values()):
+        sys.exit(1)
+
 if __name__ == "__main__":
     # Ensure your OPENAI_API_KEY is set as an environment variable
     # For testing, you could uncomment the line below and put your key.
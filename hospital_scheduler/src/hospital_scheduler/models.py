@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field, field_validator
+
+from hospital_scheduler.tools.appointment_store import to_epoch
+
+# --- Typed hand-off from the scheduler to the database agent ---
+
+
+class PatientDetails(BaseModel):
+    """Patient details extracted by collect_details_task."""
+    patient_name: str = Field(..., description="The patient's full name.")
+    reason_for_visit: str = Field("", description="The desired service or reason for the visit.")
+    appointment_time: str = Field(..., description="Preferred appointment date and time in ISO 8601 format.")
+    specialty: str = Field(..., description="Preferred doctor specialty.")
+
+    @field_validator("appointment_time")
+    @classmethod
+    def _check_iso(cls, value: str) -> str:
+        to_epoch(value)  # raises ValueError for anything the appointment store couldn't book
+        return value.strip()
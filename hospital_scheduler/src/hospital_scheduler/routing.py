@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from crewai import BaseLLM
+
+# --- Model routing ---
+# Each agent declares a Route: a latency SLO for one of its LLM calls (p95, milliseconds) and a
+# completion token budget. Its RoutedLLM picks among the configured model tiers (HOSPITAL_MODEL_TIERS,
+# cheapest/fastest first): the route's first tier, unless its observed p95 for this route misses
+# the SLO and another tier has been measured faster, then that one. Missing the SLO never moves
+# a route to a slower, stronger tier. Stages whose output must parse or validate run through
+# `RoutedLLM.run`, which retries on the next, stronger tier when it doesn't, so a small model
+# handles the easy cases and a larger one only the ones it gets wrong.
+
+MIN_SAMPLES = 5
+
+
+class Route:
+    """An agent's latency SLO (p95 per LLM call, ms), completion token budget and first tier to try."""
+
+    def __init__(self, name: str, slo_ms: float, max_tokens: Optional[int] = None, tier: Optional[str] = None):
+        self.name = name
+        self.slo_ms = slo_ms
+        self.max_tokens = max_tokens
+        self.tier = tier  # default: the cheapest tier
+
+
+def _p95(values) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, -(-95 * len(ordered) // 100) - 1)] if ordered else 0.0
+
+
+class ModelRouter:
+    """Model tiers in escalation order plus per-route, per-tier call latencies over the last `window` calls."""
+
+    def __init__(self, tiers: List[str], window: int = 200):
+        self.tiers = list(tiers)
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies: Dict[tuple, deque] = {}
+        self._stats: Dict[str, dict] = {}
+
+    def tiers_for(self, route: Route) -> List[str]:
+        """The tiers `route` may use, starting from its declared tier."""
+        if route.tier is None:
+            return self.tiers
+        if route.tier in self.tiers:
+            return self.tiers[self.tiers.index(route.tier):]
+        return [route.tier] + self.tiers
+
+    def llm(self, route: Route, make_client: Callable[[str, Optional[int]], BaseLLM],
+            override: Optional[BaseLLM] = None) -> "RoutedLLM":
+        """A RoutedLLM for `route` with `make_client(model, max_tokens)` per tier, or just `override` if given."""
+        if override is not None:
+            return RoutedLLM(self, route, [override], [override.model])
+        tiers = self.tiers_for(route)
+        return RoutedLLM(self, route, [make_client(model, route.max_tokens) for model in tiers], tiers)
+
+    def choose(self, route: Route, tiers: List[str]) -> int:
+        """The first tier, or the fastest measured tier when the first one's p95 misses the SLO."""
+        with self._lock:
+            p95s = {}
+            for index, model in enumerate(tiers):
+                samples = self._latencies.get((route.name, model))
+                if samples is not None and len(samples) >= MIN_SAMPLES:
+                    p95s[index] = _p95(samples)
+        if 0 not in p95s or p95s[0] <= route.slo_ms:
+            return 0
+        return min(p95s, key=p95s.__getitem__)
+
+    def _route_stats(self, route: Route) -> dict:
+        return self._stats.setdefault(route.name, {"slo_ms": route.slo_ms, "max_tokens": route.max_tokens,
+                                                   "calls": 0, "within_slo": 0, "escalations": 0, "by_tier": {}})
+
+    def observe(self, route: Route, model: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            self._latencies.setdefault((route.name, model), deque(maxlen=self.window)).append(ms)
+            stats = self._route_stats(route)
+            stats["calls"] += 1
+            stats["within_slo"] += ms <= route.slo_ms
+            stats["by_tier"][model] = stats["by_tier"].get(model, 0) + 1
+
+    def escalated(self, route: Route) -> None:
+        with self._lock:
+            self._route_stats(route)["escalations"] += 1
+
+    def stats(self) -> dict:
+        """Per route: SLO, calls, share within the SLO, p95 per tier, calls per tier and escalations."""
+        with self._lock:
+            report = {}
+            for name, stats in self._stats.items():
+                report[name] = dict(stats, by_tier=dict(stats["by_tier"]),
+                                    within_slo=round(stats["within_slo"] / max(1, stats["calls"]), 3),
+                                    p95_ms={model: round(_p95(samples), 1) for (route, model), samples in self._latencies.items()
+                                            if route == name})
+        return report
+
+
+class RoutedLLM(BaseLLM):
+    """
+    A crewai LLM that sends each call to one of `clients` (one per tier of `route`), as chosen by
+    `router`. One instance per crew: `run` pins the tier while a stage is retried on stronger tiers.
+    """
+
+    def __init__(self, router: ModelRouter, route: Route, clients: List[BaseLLM], tiers: List[str]):
+        super().__init__(model=clients[0].model)
+        self.router = router
+        self.route = route
+        self.clients = clients
+        self.tiers = tiers
+        self.stream = getattr(clients[0], "stream", False)
+        self._pinned: Optional[int] = None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, stop=None, **kwargs):
+        index = self._pinned if self._pinned is not None else self.router.choose(self.route, self.tiers)
+        stop = list(self.stop if stop is None else stop)  # agents set their stop words on the LLM they were given
+        started = time.perf_counter()
+        try:
+            return self.clients[index].call(messages, tools=tools, callbacks=callbacks,
+                                            available_functions=available_functions, stop=stop, **kwargs)
+        finally:
+            self.router.observe(self.route, self.tiers[index], time.perf_counter() - started)
+
+    def run(self, attempt: Callable[[], object], validate: Callable[[object], object],
+            fallback: Optional[Callable[[object], object]] = None):
+        """
+        `validate(attempt())` on the routed tier; while `validate` raises ValueError (pydantic's
+        ValidationError included), try again on the next tier. When the strongest tier fails too,
+        return `fallback(output)` if given, else re-raise.
+        """
+        first = self.router.choose(self.route, self.tiers)
+        try:
+            for index in range(first, len(self.clients)):
+                self._pinned = index
+                output = attempt()
+                try:
+                    return validate(output)
+                except ValueError:
+                    if index + 1 == len(self.clients):
+                        if fallback is None:
+                            raise
+                        return fallback(output)
+                    self.router.escalated(self.route)
+        finally:
+            self._pinned = None
+
+    def supports_function_calling(self) -> bool:
+        return self.clients[0].supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.clients[0].supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return min(client.get_context_window_size() for client in self.clients)
+
+
+# --- Process-wide router ---
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Router over HOSPITAL_MODEL_TIERS (comma-separated, cheapest first; default openai/gpt-4o-mini,openai/gpt-4o)."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                tiers = os.environ.get("HOSPITAL_MODEL_TIERS", "openai/gpt-4o-mini,openai/gpt-4o")
+                _router = ModelRouter([tier.strip() for tier in tiers.split(",") if tier.strip()])
+    return _router
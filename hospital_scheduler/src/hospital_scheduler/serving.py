@@ -0,0 +1,180 @@
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# --- Crew pool ---
+# A crew runs one kickoff at a time and spends almost all of it waiting on the LLM, so the app
+# keeps a pool of pre-warmed crews and gives each request one of them. Requests that find every
+# crew busy wait in a bounded queue: when HOSPITAL_MAX_QUEUE requests are already waiting a new
+# one is turned away immediately (PoolBusy), and a request that waits longer than
+# HOSPITAL_QUEUE_TIMEOUT seconds gives up (PoolTimeout), so a burst of patients queues up
+# briefly instead of piling unbounded work and memory onto one node.
+
+
+class PoolBusy(RuntimeError):
+    """Every crew is busy and the request queue is full."""
+
+
+class PoolTimeout(TimeoutError):
+    """No crew became free within the queue timeout."""
+
+
+def _percentiles(values) -> dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    # Nearest-rank percentiles
+    return {f"p{pct}": round(ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)], 1) for pct in (50, 95, 99)}
+
+
+class CrewPool:
+    """
+    `workers` crews built by `factory`; `with pool.crew() as crew:` borrows one. `warm()` builds
+    them in the background ahead of the first request, and a crew whose build failed is built
+    again on the next borrow. `metrics()` reports queue depth, outcomes and latency percentiles
+    over the last `window` requests.
+    """
+
+    def __init__(self, factory: Callable[[], object], workers: int = 4, max_queue: int = 64,
+                 queue_timeout: float = 30.0, window: int = 1000):
+        self.factory = factory
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._idle: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._building = 0
+        self._ready = 0
+        self._waiting = 0
+        self._busy = 0
+        self._counts = {"admitted": 0, "rejected": 0, "timed_out": 0, "completed": 0, "errors": 0, "warm_errors": 0}
+        self._latencies = deque(maxlen=window)
+        self._queue_waits = deque(maxlen=window)
+
+    def warm(self) -> None:
+        """Start building the crews the pool is short of, each on its own thread (safe to call more than once)."""
+        with self._lock:
+            missing = self.workers - self._ready - self._building
+            self._building += max(missing, 0)
+
+        def build():
+            try:
+                crew = self.factory()
+            except Exception:
+                with self._lock:
+                    self._building -= 1
+                    self._counts["warm_errors"] += 1
+                raise
+            with self._lock:
+                self._building -= 1
+                self._ready += 1
+            self._idle.put(crew)
+
+        for i in range(missing):
+            threading.Thread(target=build, name=f"crew-pool-warm-{i}", daemon=True).start()
+
+    @contextmanager
+    def crew(self):
+        """Borrow a crew for one request; raises PoolBusy or PoolTimeout instead of queueing forever."""
+        self.warm()  # also replaces crews whose build failed
+        arrived = time.perf_counter()
+        with self._lock:
+            if self._waiting >= self.max_queue and self._idle.empty():
+                self._counts["rejected"] += 1
+                raise PoolBusy(f"All {self.workers} schedulers are busy and {self._waiting} requests are waiting.")
+            self._waiting += 1
+            self._counts["admitted"] += 1
+        try:
+            crew = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            with self._lock:
+                self._counts["timed_out"] += 1
+            raise PoolTimeout(f"No scheduler became free within {self.queue_timeout:.0f}s.")
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        started = time.perf_counter()
+        with self._lock:
+            self._busy += 1
+            self._queue_waits.append((started - arrived) * 1000)
+        outcome = "errors"
+        try:
+            yield crew
+            outcome = "completed"
+        finally:
+            self._idle.put(crew)
+            with self._lock:
+                self._busy -= 1
+                self._counts[outcome] += 1
+                self._latencies.append((time.perf_counter() - arrived) * 1000)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "ready": self._ready,
+                "building": self._building,
+                "busy": self._busy,
+                "queue_depth": self._waiting,
+                "max_queue": self.max_queue,
+                "queue_timeout_s": self.queue_timeout,
+                **self._counts,
+                "latency_ms": _percentiles(self._latencies),
+                "queue_wait_ms": _percentiles(self._queue_waits),
+            }
+
+
+# --- Process-wide pool ---
+_pool: Optional[CrewPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool() -> CrewPool:
+    """
+    The app's pool of streaming crews, sized by HOSPITAL_WORKERS (default 4), HOSPITAL_MAX_QUEUE
+    (default 64) and HOSPITAL_QUEUE_TIMEOUT (seconds, default 30).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                def factory():
+                    from hospital_scheduler.crew import HospitalSchedulerCrew
+                    return HospitalSchedulerCrew(stream=True)
+
+                _pool = CrewPool(
+                    factory,
+                    workers=int(os.environ.get("HOSPITAL_WORKERS", "4")),
+                    max_queue=int(os.environ.get("HOSPITAL_MAX_QUEUE", "64")),
+                    queue_timeout=float(os.environ.get("HOSPITAL_QUEUE_TIMEOUT", "30")),
+                )
+    return _pool
+
+
+def create_app(interface, pool: CrewPool):
+    """A FastAPI app serving the Gradio `interface` at / plus GET /metrics (pool and model routes) and /healthz."""
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+
+    @app.get("/metrics")
+    def metrics():
+        from hospital_scheduler.routing import get_router
+        return dict(pool.metrics(), model_routes=get_router().stats())
+
+    @app.get("/healthz")
+    def healthz():
+        ready = pool.metrics()["ready"] > 0
+        return JSONResponse({"ready": ready}, status_code=200 if ready else 503)
+
+    # Gradio may run up to this many handlers at once; the pool decides which of them get a crew
+    interface.queue(default_concurrency_limit=pool.workers + pool.max_queue)
+    return gr.mount_gradio_app(app, interface, path="/")
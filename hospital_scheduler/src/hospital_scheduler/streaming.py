@@ -0,0 +1,102 @@
+import queue
+import threading
+from typing import Callable, Iterator, Tuple
+
+# --- Robust event bus import (crewai moved it between releases) ---
+try:
+    from crewai.events import (
+        crewai_event_bus, LLMStreamChunkEvent, TaskStartedEvent, TaskCompletedEvent, ToolUsageStartedEvent
+    )
+except ImportError:
+    from crewai.utilities.events import (
+        crewai_event_bus, LLMStreamChunkEvent, TaskStartedEvent, TaskCompletedEvent, ToolUsageStartedEvent
+    )
+
+# --- Streaming kickoff ---
+# crewai's event bus is process-wide, so a single set of handlers is registered once and each
+# event is routed to the queue of the run whose thread emitted it, so concurrent Gradio
+# requests never see each other's tokens.
+
+_subscribers = {}
+_subscribers_lock = threading.Lock()
+_handlers_registered = False
+_DONE = object()
+
+
+def _task_label(task) -> str:
+    name = getattr(task, "name", None)
+    if name:
+        return name
+    description = str(getattr(task, "description", "task"))
+    return description[:60] + ("..." if len(description) > 60 else "")
+
+
+def _publish(kind: str, payload: str) -> None:
+    events = _subscribers.get(threading.get_ident())
+    if events is not None:
+        events.put((kind, payload))
+
+
+def emit_stage(message: str) -> None:
+    """Report a progress message to the stream running on this thread, if any."""
+    _publish("stage", message)
+
+
+def _register_handlers() -> None:
+    global _handlers_registered
+    with _subscribers_lock:
+        if _handlers_registered:
+            return
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_chunk(source, event):
+            _publish("token", event.chunk)
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def _on_task_started(source, event):
+            _publish("stage", f"Started: {_task_label(getattr(event, 'task', None) or source)}")
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def _on_task_completed(source, event):
+            _publish("stage", f"Finished: {_task_label(getattr(event, 'task', None) or source)}")
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def _on_tool_started(source, event):
+            _publish("stage", f"Using tool: {getattr(event, 'tool_name', 'tool')}")
+
+        _handlers_registered = True
+
+
+def stream_kickoff(kickoff: Callable[[], str]) -> Iterator[Tuple[str, str]]:
+    """
+    Run `kickoff` on a background thread and yield (kind, payload) events as they happen:
+    'stage' progress messages, 'token' chunks from streaming LLMs, then a final 'result'
+    (or 'error') carrying the complete output. Closing the generator early (e.g. when a web
+    client disconnects) waits for `kickoff` to finish, so the crew is idle once it returns.
+    """
+    _register_handlers()
+    events: "queue.Queue" = queue.Queue()
+
+    def worker():
+        ident = threading.get_ident()
+        with _subscribers_lock:
+            _subscribers[ident] = events
+        try:
+            events.put(("result", str(kickoff())))
+        except Exception as e:
+            events.put(("error", str(e)))
+        finally:
+            with _subscribers_lock:
+                _subscribers.pop(ident, None)
+            events.put(_DONE)
+
+    thread = threading.Thread(target=worker, name="crew-stream", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = events.get()
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        thread.join()
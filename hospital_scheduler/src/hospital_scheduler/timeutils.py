@@ -0,0 +1,34 @@
+import os
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Tuple
+
+import pytz # Make sure you have this installed: pip install pytz
+
+# Define the local timezone for appointment scheduling
+LOCAL_TIMEZONE = pytz.timezone(os.environ.get("HOSPITAL_TIMEZONE", "America/New_York")) # Oshawa is in this timezone
+
+
+def parse_time(time_str: str) -> Tuple[int, int]:
+    """Parse 'HH:MM' into (hour, minute); raises ValueError on anything else."""
+    time_parts = list(map(int, time_str.strip().split(':')))
+    if len(time_parts) != 2 or not (0 <= time_parts[0] <= 23) or not (0 <= time_parts[1] <= 59):
+        raise ValueError("Invalid time format. Please use HH:MM (e.g., 09:00).")
+    return time_parts[0], time_parts[1]
+
+
+def localize(appointment_date: date, time_str: str) -> str:
+    """
+    Combine a date and an 'HH:MM' time in the hospital's timezone and return an
+    ISO 8601 string with the UTC offset. Raises ValueError for bad times and
+    pytz's AmbiguousTimeError / NonExistentTimeError around DST changes.
+    """
+    hour, minute = parse_time(time_str)
+    naive = datetime(appointment_date.year, appointment_date.month, appointment_date.day, hour, minute)
+    return LOCAL_TIMEZONE.localize(naive, is_dst=None).isoformat() # is_dst=None refuses to guess on DST edges
+
+
+@lru_cache(maxsize=16384)
+def localize_strings(date_str: str, time_str: str) -> str:
+    """`localize` for 'YYYY-MM-DD' + 'HH:MM' strings, memoized since bulk imports repeat the same slots."""
+    return localize(datetime.strptime(date_str.strip(), "%Y-%m-%d").date(), time_str)
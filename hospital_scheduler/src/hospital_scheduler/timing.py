@@ -0,0 +1,104 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+
+class StageTimer:
+    """Records wall-clock time in milliseconds for named setup/run stages."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> float:
+        """Record the time elapsed since the previous lap (or construction) under `name`."""
+        now = time.perf_counter()
+        elapsed = (now - self._last) * 1000
+        self.timings[name] = round(elapsed, 3)
+        self._last = now
+        return elapsed
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+            self._last = time.perf_counter()
+
+    def __str__(self) -> str:
+        return ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.timings.items())
+
+
+# --- Startup ---
+# crewai (and the LLM client libraries it pulls in) takes seconds to import, so the apps
+# import it lazily and build their crews off the main thread while the user is still typing.
+
+def build_in_background(build: Callable[[], object]) -> Future:
+    """Run `build()` on a daemon thread; the returned future holds its result (or exception)."""
+    future: Future = Future()
+
+    def worker():
+        try:
+            future.set_result(build())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=worker, name="hospital-startup", daemon=True).start()
+    return future
+
+
+def import_times(module: str) -> List[Tuple[str, float, float]]:
+    """
+    (module, self ms, cumulative ms) for every module a fresh interpreter loads to
+    `import module`, as reported by `python -X importtime`.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))  # same search path as this process
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip()[-500:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def startup_report(module: str, construct: Callable[[], object], top: int = 10) -> str:
+    """
+    Break cold-start time down into imports (by top-level package and slowest modules, measured
+    in a fresh interpreter) and construction (`construct()` in this process, by setup stage).
+    """
+    rows = import_times(module)
+    by_package: Dict[str, float] = {}
+    for name, self_ms, _ in rows:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0.0) + self_ms
+    lines = [f"Startup profile for {module}",
+             f"  imports: {sum(by_package.values()):.1f}ms for {len(rows)} modules (fresh interpreter)"]
+    for package, ms in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"    {package:<32} {ms:8.1f}ms")
+    lines.append("  slowest modules (self time):")
+    for name, self_ms, _ in sorted(rows, key=lambda row: -row[1])[:top]:
+        lines.append(f"    {name:<48} {self_ms:8.1f}ms")
+
+    started = time.perf_counter()
+    importlib.import_module(module)
+    imported = time.perf_counter()
+    built = construct()
+    finished = time.perf_counter()
+    lines.append(f"  import (this process): {(imported - started) * 1000:.1f}ms")
+    setup = getattr(built, "setup_timings", None)
+    lines.append(f"  construct: {(finished - imported) * 1000:.1f}ms" + (f" ({setup})" if setup is not None else ""))
+    return "\n".join(lines)
+
@@ -0,0 +1,399 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+import pytz
+
+from hospital_scheduler.timeutils import LOCAL_TIMEZONE
+
+# Naive timestamps (no UTC offset) are interpreted in the hospital's local timezone.
+# Callers that book for a specialty pass its calendar's slot length; this is only the fallback.
+DEFAULT_SLOT_MINUTES = int(os.environ.get("HOSPITAL_SLOT_MINUTES", "30"))
+LOCK_STRIPES = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY,
+    patient_name TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    specialty_key TEXT NOT NULL,
+    slot_start INTEGER NOT NULL,
+    slot_end INTEGER NOT NULL,
+    appointment_time TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS appointments_specialty_slot ON appointments (specialty_key, slot_start);
+CREATE INDEX IF NOT EXISTS appointments_specialty_range ON appointments (specialty_key, slot_start, slot_end);
+CREATE INDEX IF NOT EXISTS appointments_start ON appointments (slot_start);
+CREATE TABLE IF NOT EXISTS daily_occupancy (
+    specialty_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bookings INTEGER NOT NULL,
+    booked_minutes INTEGER NOT NULL,
+    PRIMARY KEY (specialty_key, day)
+) WITHOUT ROWID;
+"""
+# Added after the first release; created (and backfilled) on open for older databases.
+LATER_INDEXES = """
+CREATE INDEX IF NOT EXISTS appointments_patient ON appointments (patient_key, slot_start);
+CREATE INDEX IF NOT EXISTS appointments_duration ON appointments ((slot_end - slot_start));
+"""
+
+
+def to_epoch(value: str) -> int:
+    """
+    Parse an ISO 8601 timestamp into UTC epoch seconds, so different spellings of one instant compare equal.
+    Raises ValueError, with a message fit to show the user, for missing or malformed times and for naive
+    local times that are ambiguous or skipped at a daylight-saving change.
+    """
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("An appointment time is required (ISO 8601, e.g. 2025-06-23T10:00:00).")
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid appointment time '{value}'; use ISO 8601 (e.g. 2025-06-23T10:00:00).") from None
+    if dt.tzinfo is None:
+        try:
+            dt = LOCAL_TIMEZONE.localize(dt, is_dst=None)
+        except pytz.exceptions.AmbiguousTimeError:
+            first, second = (LOCAL_TIMEZONE.localize(dt, is_dst=dst).isoformat() for dst in (True, False))
+            raise ValueError(f"{value} happens twice when the clocks go back; "
+                             f"give it with its UTC offset ({first} or {second}).") from None
+        except pytz.exceptions.NonExistentTimeError:
+            raise ValueError(f"{value} does not exist locally because the clocks go forward; pick another time.") from None
+    return int(dt.timestamp())
+
+
+def from_epoch(epoch: int) -> str:
+    """Epoch seconds to an ISO 8601 string in the hospital's local timezone."""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).astimezone(LOCAL_TIMEZONE).isoformat()
+
+
+def specialty_key(specialty: str) -> str:
+    return " ".join((specialty or "").split()).casefold()
+
+
+def patient_key(patient_name: str) -> str:
+    return " ".join((patient_name or "").split()).casefold()
+
+
+def local_day(epoch: int) -> str:
+    """The hospital-local date (YYYY-MM-DD) an epoch falls on: the day bucket for occupancy counts."""
+    return datetime.fromtimestamp(epoch, tz=LOCAL_TIMEZONE).date().isoformat()
+
+
+class AppointmentStore:
+    """
+    Durable appointment store on SQLite (WAL mode) with a small connection pool.
+
+    Slots are stored as UTC epoch [slot_start, slot_end) per specialty. A unique index on
+    (specialty, slot_start) stops exact duplicates, and overlap checks are range scans on
+    (specialty, slot_start) bounded by the longest stored appointment, so they stay O(log n).
+    That bound is read from an index on the duration each time, so bookings made by other
+    processes count as soon as they commit.
+
+    Bookings go through `book_if_available`, which checks and inserts in one transaction while
+    holding a lock striped by specialty: requests for the same specialty are serialized inside
+    the process, unrelated specialties take different locks, and BEGIN IMMEDIATE plus the unique
+    index keep other processes from slipping in between the check and the insert.
+
+    Secondary indexes on (patient, slot_start) and slot_start serve lookups by patient and by
+    date range, and `daily_occupancy` keeps bookings and booked minutes per (specialty, local
+    day). It is updated in the same transaction as every insert, cancellation and reschedule,
+    so utilization over a date range is a primary-key range scan instead of a count over bookings.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Bring databases written by older versions (or raw SQL) up to date with the indexes and counters."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(appointments)")}
+        if "patient_key" not in columns:
+            try:
+                conn.execute("ALTER TABLE appointments ADD COLUMN patient_key TEXT NOT NULL DEFAULT ''")
+            except sqlite3.OperationalError:
+                pass  # another process added it first
+        conn.executescript(LATER_INDEXES)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT id, patient_name FROM appointments WHERE patient_key = ''").fetchall()
+            conn.executemany("UPDATE appointments SET patient_key = ? WHERE id = ?",
+                             [(patient_key(row["patient_name"]), row["id"]) for row in rows if patient_key(row["patient_name"])])
+            counted = conn.execute("SELECT COALESCE(SUM(bookings), 0) FROM daily_occupancy").fetchone()[0]
+            if counted != conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]:
+                self._rebuild_occupancy(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _rebuild_occupancy(conn: sqlite3.Connection) -> None:
+        totals = {}
+        for key, start, end in conn.execute("SELECT specialty_key, slot_start, slot_end FROM appointments"):
+            counts = totals.setdefault((key, local_day(start)), [0, 0])
+            counts[0] += 1
+            counts[1] += (end - start) // 60
+        conn.execute("DELETE FROM daily_occupancy")
+        conn.executemany("INSERT INTO daily_occupancy (specialty_key, day, bookings, booked_minutes) VALUES (?, ?, ?, ?)",
+                         [(key, day, bookings, minutes) for (key, day), (bookings, minutes) in totals.items()])
+
+    @staticmethod
+    def _count_occupancy(conn: sqlite3.Connection, key: str, start: int, end: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one booking of [start, end) in its day's counters."""
+        conn.execute(
+            "INSERT INTO daily_occupancy (specialty_key, day, bookings, booked_minutes) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (specialty_key, day) DO UPDATE SET bookings = bookings + excluded.bookings, "
+            "booked_minutes = booked_minutes + excluded.booked_minutes",
+            (key, local_day(start), sign, sign * ((end - start) // 60)),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # --- Queries ---
+
+    @staticmethod
+    def _max_duration(conn: sqlite3.Connection) -> int:
+        """Length of the longest stored appointment in seconds (an index lookup)."""
+        return conn.execute("SELECT COALESCE(MAX(slot_end - slot_start), 0) FROM appointments").fetchone()[0]
+
+    def find_conflict(self, conn: sqlite3.Connection, key: str, start: int, end: int,
+                      exclude_id: Optional[int] = None) -> Optional[dict]:
+        """The first booking in `key` overlapping [start, end), if any (ignoring booking `exclude_id`)."""
+        row = conn.execute(
+            "SELECT * FROM appointments WHERE specialty_key = ? AND slot_start > ? AND slot_start < ? "
+            "AND slot_end > ? AND id != ? ORDER BY slot_start LIMIT 1",
+            (key, start - max(self._max_duration(conn), end - start), end, start, -1 if exclude_id is None else exclude_id),
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def bookings_between(self, specialty: str, start: int, end: int) -> list:
+        """(slot_start, slot_end) epoch pairs of bookings in `specialty` overlapping [start, end), in start order."""
+        key = specialty_key(specialty)
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT slot_start, slot_end FROM appointments WHERE specialty_key = ? AND slot_start > ? "
+                "AND slot_start < ? AND slot_end > ? ORDER BY slot_start",
+                (key, start - max(self._max_duration(conn), 1), end, start),
+            ).fetchall()
+
+    def appointments_for_patient(self, patient_name: str, start: Optional[int] = None, end: Optional[int] = None) -> List[dict]:
+        """The patient's bookings starting in [start, end) (epoch seconds; open-ended if None), in time order."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM appointments WHERE patient_key = ? AND slot_start >= ? AND slot_start < ? ORDER BY slot_start",
+                (patient_key(patient_name), start if start is not None else -2 ** 62, end if end is not None else 2 ** 62),
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def appointments_between(self, start: int, end: int, specialty: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Bookings starting in [start, end), optionally for one specialty, in time order (at most `limit`)."""
+        with self.connection() as conn:
+            if specialty:
+                rows = conn.execute(
+                    "SELECT * FROM appointments WHERE specialty_key = ? AND slot_start >= ? AND slot_start < ? "
+                    "ORDER BY slot_start LIMIT ?", (specialty_key(specialty), start, end, limit)).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM appointments WHERE slot_start >= ? AND slot_start < ? ORDER BY slot_start LIMIT ?",
+                    (start, end, limit)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def daily_occupancy(self, specialty: str, first_day: date, last_day: date) -> dict:
+        """{'YYYY-MM-DD': (bookings, booked minutes)} for the days in [first_day, last_day] with any bookings."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT day, bookings, booked_minutes FROM daily_occupancy WHERE specialty_key = ? AND day >= ? AND day <= ? "
+                "AND bookings > 0", (specialty_key(specialty), first_day.isoformat(), last_day.isoformat())).fetchall()
+        return {row["day"]: (row["bookings"], row["booked_minutes"]) for row in rows}
+
+    def check_availability(self, specialty: str, appointment_time: str, duration_minutes: int = DEFAULT_SLOT_MINUTES) -> Optional[dict]:
+        """Return the conflicting booking, or None if the slot is free."""
+        start = to_epoch(appointment_time)
+        with self.connection() as conn:
+            return self.find_conflict(conn, specialty_key(specialty), start, start + duration_minutes * 60)
+
+    def book_if_available(self, patient_name: str, appointment_time: str, specialty: str,
+                          duration_minutes: int = DEFAULT_SLOT_MINUTES) -> dict:
+        """
+        Atomically book the slot if nothing overlaps it.
+        Returns {'booked': True, 'appointment': {...}} or {'booked': False, 'conflict': {...}}.
+        Booking a slot the same patient already holds returns that booking, so a retried or
+        resumed request doesn't collide with its own earlier attempt.
+        Raises ValueError if the patient name, specialty or time is missing or invalid.
+        """
+        if not patient_key(patient_name):
+            raise ValueError("A patient name is required to book an appointment.")
+        if not specialty_key(specialty):
+            raise ValueError("A specialty is required to book an appointment.")
+        start = to_epoch(appointment_time)
+        end = start + duration_minutes * 60
+        key = specialty_key(specialty)
+        with self._stripes[hash(key) % LOCK_STRIPES], self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conflict = self.find_conflict(conn, key, start, end)
+                if conflict:
+                    conn.execute("ROLLBACK")
+                    if self._same_booking(conflict, patient_name, start, end):
+                        return {"booked": True, "appointment": conflict}
+                    return {"booked": False, "conflict": conflict}
+                appointment = self._insert(conn, patient_name, appointment_time, specialty, start, end)
+                conn.execute("COMMIT")
+                return {"booked": True, "appointment": appointment}
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK")
+                return {"booked": False, "conflict": self.find_conflict(conn, key, start, end)}
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _same_booking(booking: dict, patient_name: str, start: int, end: int) -> bool:
+        return (patient_key(booking["patient_name"]) == patient_key(patient_name)
+                and to_epoch(booking["slot_start"]) == start and to_epoch(booking["slot_end"]) == end)
+
+    def _get(self, conn: sqlite3.Connection, appointment_id: int, patient_name: Optional[str]) -> Optional[sqlite3.Row]:
+        row = conn.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,)).fetchone()
+        # When a patient name is given, only that patient's own booking can be changed
+        if row is None or (patient_name and row["patient_key"] != patient_key(patient_name)):
+            return None
+        return row
+
+    def cancel(self, appointment_id: int, patient_name: Optional[str] = None) -> Optional[dict]:
+        """Delete the booking and return it, or None if there is no such booking (for that patient)."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._get(conn, appointment_id, patient_name)
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return None
+                conn.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
+                self._count_occupancy(conn, row["specialty_key"], row["slot_start"], row["slot_end"], -1)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(row)
+
+    def reschedule(self, appointment_id: int, appointment_time: str, patient_name: Optional[str] = None) -> dict:
+        """
+        Atomically move a booking to `appointment_time` (same specialty and duration) if nothing else overlaps it.
+        Returns {'rescheduled': True, 'appointment': {...}}, {'rescheduled': False, 'conflict': {...}}, or
+        {'rescheduled': False, 'not_found': True}.
+        """
+        start = to_epoch(appointment_time)
+        with self.connection() as conn:
+            row = self._get(conn, appointment_id, patient_name)
+        if row is None:
+            return {"rescheduled": False, "not_found": True}
+        key = row["specialty_key"]
+        with self._stripes[hash(key) % LOCK_STRIPES], self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._get(conn, appointment_id, patient_name)
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return {"rescheduled": False, "not_found": True}
+                end = start + row["slot_end"] - row["slot_start"]
+                conflict = self.find_conflict(conn, key, start, end, exclude_id=appointment_id)
+                if conflict:
+                    conn.execute("ROLLBACK")
+                    return {"rescheduled": False, "conflict": conflict}
+                conn.execute("UPDATE appointments SET slot_start = ?, slot_end = ?, appointment_time = ? WHERE id = ?",
+                             (start, end, appointment_time, appointment_id))
+                self._count_occupancy(conn, key, row["slot_start"], row["slot_end"], -1)
+                self._count_occupancy(conn, key, start, end, 1)
+                conn.execute("COMMIT")
+            except sqlite3.IntegrityError:
+                conn.execute("ROLLBACK")
+                return {"rescheduled": False, "conflict": self.find_conflict(conn, key, start, end, exclude_id=appointment_id)}
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        appointment = dict(self._to_dict(row), appointment_time=appointment_time, slot_start=from_epoch(start), slot_end=from_epoch(end))
+        return {"rescheduled": True, "appointment": appointment}
+
+    def save_appointment(self, patient_name: str, appointment_time: str, specialty: str,
+                         duration_minutes: int = DEFAULT_SLOT_MINUTES) -> dict:
+        """Book the slot; raises sqlite3.IntegrityError if it overlaps an existing booking."""
+        result = self.book_if_available(patient_name, appointment_time, specialty, duration_minutes)
+        if not result["booked"]:
+            raise sqlite3.IntegrityError("Slot is already booked.")
+        return result["appointment"]
+
+    def _insert(self, conn: sqlite3.Connection, patient_name: str, appointment_time: str, specialty: str,
+                start: int, end: int) -> dict:
+        cursor = conn.execute(
+            "INSERT INTO appointments (patient_name, patient_key, specialty, specialty_key, slot_start, slot_end, appointment_time, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (patient_name, patient_key(patient_name), specialty, specialty_key(specialty), start, end, appointment_time, int(time.time())),
+        )
+        self._count_occupancy(conn, specialty_key(specialty), start, end, 1)
+        return {"id": cursor.lastrowid, "patient_name": patient_name, "specialty": specialty,
+                "appointment_time": appointment_time, "slot_start": from_epoch(start), "slot_end": from_epoch(end)}
+
+    def count(self) -> int:
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        return {"id": row["id"], "patient_name": row["patient_name"], "specialty": row["specialty"],
+                "appointment_time": row["appointment_time"], "slot_start": from_epoch(row["slot_start"]),
+                "slot_end": from_epoch(row["slot_end"])}
+
+
+# --- Shared store ---
+_store: Optional[AppointmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_appointment_store() -> AppointmentStore:
+    """Process-wide store at HOSPITAL_DB_PATH (default: appointments.db in the working directory)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AppointmentStore(os.environ.get("HOSPITAL_DB_PATH", "appointments.db"))
+    return _store
+
+
+def set_appointment_store(store: AppointmentStore) -> None:
+    global _store
+    _store = store
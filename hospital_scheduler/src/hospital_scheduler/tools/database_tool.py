@@ -1,46 +1,173 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
-from datetime import datetime
 import json
+import sqlite3
+from datetime import date, timedelta
 
-# Mock in-memory database
-appointments_db = []
+from hospital_scheduler.tools.appointment_store import get_appointment_store, to_epoch
+from hospital_scheduler.tools.slot_engine import get_slot_engine
+from hospital_scheduler.tracing import traced
 
 class DatabaseInput(BaseModel):
     """Input schema for DatabaseTool."""
-    action: str = Field(..., description="Action to perform: 'check_availability' or 'save_appointment'")
+    action: str = Field(..., description=(
+        "Action to perform: 'book_if_available' (check and book in one step), 'next_free_slots' (earliest free slots "
+        "at or after appointment_time), 'free_slots' (free slots per day from appointment_time to end_date), "
+        "'check_availability', 'save_appointment', 'find_appointments' (a patient's bookings, or every booking from "
+        "appointment_time to end_date), 'cancel_appointment', 'reschedule_appointment' (move appointment_id to "
+        "appointment_time) or 'utilization' (booked share of a specialty's hours from appointment_time to end_date)"
+    ))
     patient_name: str = Field(None, description="Name of the patient")
     appointment_time: str = Field(None, description="Preferred appointment time in ISO format (e.g., '2025-06-23T10:00:00')")
     specialty: str = Field(None, description="Doctor specialty (e.g., 'Cardiology')")
+    count: int = Field(3, description="How many slots 'next_free_slots' should return")
+    end_date: str = Field(None, description="Last day (YYYY-MM-DD) for 'free_slots', 'find_appointments' and 'utilization'")
+    appointment_id: int = Field(None, description="Booking id for 'cancel_appointment' and 'reschedule_appointment'")
+
+def _day_range(first: str, last: str = None) -> tuple:
+    """Epoch bounds [start of first day, end of last day) for ISO dates or datetimes."""
+    first_day = date.fromisoformat(first[:10])
+    last_day = date.fromisoformat(last[:10]) if last else first_day
+    return to_epoch(first_day.isoformat()), to_epoch((last_day + timedelta(days=1)).isoformat())
+
+def _public_slot(appointment: dict) -> dict:
+    """A booking without the other patient's details, safe to show to the current patient."""
+    if not appointment:
+        return None
+    return {key: appointment[key] for key in ("specialty", "slot_start", "slot_end")}
 
 class DatabaseTool(BaseTool):
     name: str = "DatabaseTool"
-    description: str = "Tool to check appointment availability or save an appointment in the hospital database."
+    description: str = (
+        "Tool to book appointments in the hospital database. Use 'book_if_available' to check a slot and book it "
+        "in one atomic step; it returns either the confirmed appointment or, when the slot is taken or outside the "
+        "specialty's hours, the reason plus the nearest free alternatives. Use 'next_free_slots' or 'free_slots' to look up open times directly, "
+        "'find_appointments', 'cancel_appointment' and 'reschedule_appointment' to manage a patient's bookings, "
+        "and 'utilization' for how full a specialty is over a range of days."
+    )
     args_schema: type[BaseModel] = DatabaseInput
 
-    def _run(self, action: str, patient_name: str = None, appointment_time: str = None, specialty: str = None) -> str:
-        if action == "check_availability":
+    def _run(self, action: str, patient_name: str = None, appointment_time: str = None, specialty: str = None,
+             count: int = 3, end_date: str = None, appointment_id: int = None) -> str:
+        with traced(f"tool:{self.name}", action=action):
+            return self._dispatch(action, patient_name, appointment_time, specialty, count, end_date, appointment_id)
+
+    def _dispatch(self, action: str, patient_name: str, appointment_time: str, specialty: str,
+                  count: int, end_date: str, appointment_id: int = None) -> str:
+        store = get_appointment_store()
+        engine = get_slot_engine()
+
+        if action == "book_if_available":
             try:
-                requested_time = datetime.fromisoformat(appointment_time)
-                # Check if the slot is taken
-                for appt in appointments_db:
-                    if appt["appointment_time"] == appointment_time and appt["specialty"] == specialty:
-                        return json.dumps({"available": False, "message": "Slot is already booked."})
+                # Off-calendar requests (closed days, outside hours, between slots) get the nearest real slots instead
+                problem = engine.check_slot(specialty, appointment_time) if specialty else None
+                if problem:
+                    return json.dumps({"success": False, "message": problem,
+                                       "alternatives": engine.next_free_slots(specialty, appointment_time, count)})
+                result = store.book_if_available(patient_name, appointment_time, specialty,
+                                                 engine.calendar(specialty).slot_minutes)
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": str(e)})
+            if result["booked"]:
+                return json.dumps({"success": True, "message": f"Appointment confirmed for {patient_name} at {appointment_time} with {specialty}.",
+                                   "appointment": result["appointment"]})
+            # Offer the nearest free slots right away so rescheduling doesn't need another round trip
+            alternatives = engine.next_free_slots(specialty, appointment_time, count)
+            return json.dumps({"success": False, "message": "Slot is already booked.", "conflict": _public_slot(result["conflict"]),
+                               "alternatives": alternatives})
+
+        elif action == "next_free_slots":
+            try:
+                slots = engine.next_free_slots(specialty, appointment_time, count)
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": str(e)})
+            return json.dumps({"success": True, "specialty": specialty, "free_slots": slots})
+
+        elif action == "free_slots":
+            try:
+                slots = engine.free_slots(specialty, appointment_time, end_date)
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": f"Invalid date range: {e}"})
+            return json.dumps({"success": True, "specialty": specialty, "free_slots": slots})
+
+        elif action == "check_availability":
+            try:
+                problem = engine.check_slot(specialty, appointment_time) if specialty else None
+                if problem:
+                    return json.dumps({"available": False, "message": problem})
+                # Check if the slot (or an overlapping booking) is taken
+                conflict = store.check_availability(specialty, appointment_time, engine.calendar(specialty).slot_minutes)
+                if conflict:
+                    return json.dumps({"available": False, "message": "Slot is already booked."})
                 return json.dumps({"available": True, "message": "Slot is available."})
-            except ValueError:
-                return json.dumps({"available": False, "message": "Invalid date format."})
+            except (TypeError, ValueError) as e:
+                return json.dumps({"available": False, "message": str(e)})
 
         elif action == "save_appointment":
             try:
-                appointment = {
-                    "patient_name": patient_name,
-                    "appointment_time": appointment_time,
-                    "specialty": specialty
-                }
-                appointments_db.append(appointment)
+                problem = engine.check_slot(specialty, appointment_time) if specialty else None
+                if problem:
+                    return json.dumps({"success": False, "message": problem})
+                store.save_appointment(patient_name, appointment_time, specialty, engine.calendar(specialty).slot_minutes)
                 return json.dumps({"success": True, "message": f"Appointment saved for {patient_name} at {appointment_time} with {specialty}."})
+            except sqlite3.IntegrityError:
+                return json.dumps({"success": False, "message": "Slot is already booked."})
             except Exception as e:
                 return json.dumps({"success": False, "message": f"Error saving appointment: {str(e)}"})
 
+        elif action == "find_appointments":
+            try:
+                start, end = _day_range(appointment_time, end_date) if appointment_time else (None, None)
+                if patient_name:
+                    appointments = store.appointments_for_patient(patient_name, start, end)
+                elif start is not None:
+                    # Without a patient only the slots are shown, not who booked them
+                    appointments = [_public_slot(a) for a in store.appointments_between(start, end, specialty)]
+                else:
+                    return json.dumps({"success": False, "message": "Give a patient_name or a date range."})
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": f"Invalid date range: {e}"})
+            return json.dumps({"success": True, "appointments": appointments})
+
+        elif action == "cancel_appointment":
+            if appointment_id is None or not patient_name:
+                return json.dumps({"success": False, "message": "Give the patient_name and appointment_id to cancel."})
+            cancelled = store.cancel(appointment_id, patient_name)
+            if cancelled is None:
+                return json.dumps({"success": False, "message": f"No appointment {appointment_id} found for {patient_name}."})
+            return json.dumps({"success": True, "message": f"Appointment {appointment_id} for {patient_name} cancelled.",
+                               "appointment": cancelled})
+
+        elif action == "reschedule_appointment":
+            if appointment_id is None or not patient_name:
+                return json.dumps({"success": False, "message": "Give the patient_name and appointment_id to reschedule."})
+            booking = next((a for a in store.appointments_for_patient(patient_name) if a["id"] == appointment_id), None)
+            if booking is None:
+                return json.dumps({"success": False, "message": f"No appointment {appointment_id} found for {patient_name}."})
+            try:
+                problem = engine.check_slot(booking["specialty"], appointment_time)
+                if problem:
+                    return json.dumps({"success": False, "message": problem,
+                                       "alternatives": engine.next_free_slots(booking["specialty"], appointment_time, count)})
+                result = store.reschedule(appointment_id, appointment_time, patient_name)
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": str(e)})
+            if result["rescheduled"]:
+                return json.dumps({"success": True, "message": f"Appointment {appointment_id} moved to {appointment_time}.",
+                                   "appointment": result["appointment"]})
+            if result.get("not_found"):
+                return json.dumps({"success": False, "message": f"No appointment {appointment_id} found for {patient_name}."})
+            conflict = result["conflict"]
+            alternatives = engine.next_free_slots(conflict["specialty"], appointment_time, count) if conflict else []
+            return json.dumps({"success": False, "message": "Slot is already booked.", "conflict": _public_slot(conflict),
+                               "alternatives": alternatives})
+
+        elif action == "utilization":
+            try:
+                report = engine.utilization(specialty, appointment_time, end_date)
+            except (TypeError, ValueError) as e:
+                return json.dumps({"success": False, "message": f"Invalid date range: {e}"})
+            return json.dumps({"success": True, "specialty": specialty, **report})
+
         else:
-            return json.dumps({"success": False, "message": "Invalid action."})
\ No newline at end of file
+            return json.dumps({"success": False, "message": "Invalid action."})
@@ -0,0 +1,239 @@
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from hospital_scheduler.tools.appointment_store import (
+    LOCAL_TIMEZONE, AppointmentStore, get_appointment_store, specialty_key, to_epoch
+)
+
+CALENDARS_PATH = Path(__file__).parent.parent / "config" / "calendars.yaml"
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MAX_SEARCH_DAYS = 60
+# next_free_slots widens its window in these steps (days), so the common case reads one day of bookings
+SEARCH_WINDOWS = (1, 7, MAX_SEARCH_DAYS)
+
+
+class SpecialtyCalendar:
+    """Working hours per weekday and slot length for one specialty."""
+
+    def __init__(self, slot_minutes: int, hours: Dict[str, list]):
+        self.slot_minutes = slot_minutes
+        self._slot_cache: Dict[date, tuple] = {}
+        # weekday index -> (opening time, number of slots that day)
+        self.days = {}
+        for name, span in (hours or {}).items():
+            if not span:
+                continue
+            opens, closes = (datetime.strptime(t, "%H:%M") for t in span)
+            slots = int((closes - opens).total_seconds() // (slot_minutes * 60))
+            if slots > 0:
+                self.days[WEEKDAYS.index(name.lower())] = (opens.time(), slots)
+
+    def slot_starts(self, day: date) -> tuple:
+        """Epoch start of every slot on `day` (local time), empty if the specialty is closed."""
+        starts = self._slot_cache.get(day)
+        if starts is None:
+            starts = ()
+            if day.weekday() in self.days:
+                opens, slots = self.days[day.weekday()]
+                first = datetime.combine(day, opens)
+                step = timedelta(minutes=self.slot_minutes)
+                starts = tuple(int(LOCAL_TIMEZONE.localize(first + i * step).timestamp()) for i in range(slots))
+            self._slot_cache[day] = starts
+        return starts
+
+
+class SlotEngine:
+    """
+    Answers "next N free slots at or after T" and "free slots between two days" in one call.
+
+    Each day is a bitmap (a Python int) with one bit per slot in the specialty's calendar.
+    Bookings for a search window come from one indexed range query on the store and are
+    folded into the day bitmaps, so a search never re-queries per slot.
+
+    With `cache_bitmaps`, day bitmaps are kept in memory and updated through `mark_booked`.
+    This is meant for a single writer such as a bulk import: bookings made elsewhere are not
+    seen until the cache is cleared, and `book_if_available` remains the authority.
+    """
+
+    def __init__(self, store: Optional[AppointmentStore] = None, calendars_path: Path = CALENDARS_PATH,
+                 cache_bitmaps: bool = False):
+        self._store = store
+        self._bitmaps: Optional[Dict[tuple, int]] = {} if cache_bitmaps else None
+        with open(calendars_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+        default = config.pop("default", {"slot_minutes": 30, "hours": {}})
+        self.default_calendar = SpecialtyCalendar(default.get("slot_minutes", 30), default.get("hours"))
+        self.calendars = {
+            specialty_key(name): SpecialtyCalendar(cfg.get("slot_minutes", default.get("slot_minutes", 30)), cfg.get("hours"))
+            for name, cfg in config.items()
+        }
+
+    @property
+    def store(self) -> AppointmentStore:
+        return self._store or get_appointment_store()
+
+    def calendar(self, specialty: str) -> SpecialtyCalendar:
+        return self.calendars.get(specialty_key(specialty), self.default_calendar)
+
+    def _day_bitmaps(self, specialty: str, first_day: date, last_day: date):
+        """Yield (day, slot starts, booked bitmap) for each day in [first_day, last_day]."""
+        calendar = self.calendar(specialty)
+        key = specialty_key(specialty)
+        if self._bitmaps is not None:
+            days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+            if all((key, day) in self._bitmaps for day in days):
+                for day in days:
+                    yield day, calendar.slot_starts(day), self._bitmaps[(key, day)]
+                return
+        slot_seconds = calendar.slot_minutes * 60
+        window_start = int(LOCAL_TIMEZONE.localize(datetime.combine(first_day, dtime.min)).timestamp())
+        window_end = int(LOCAL_TIMEZONE.localize(datetime.combine(last_day + timedelta(days=1), dtime.min)).timestamp())
+        bookings = self.store.bookings_between(specialty, window_start, window_end)
+        cursor = 0
+
+        day = first_day
+        while day <= last_day:
+            starts = calendar.slot_starts(day)
+            booked = 0
+            if starts:
+                day_start, day_end = starts[0], starts[-1] + slot_seconds
+                # Bookings are sorted by start; skip the ones that end before this day's first slot.
+                while cursor < len(bookings) and bookings[cursor][1] <= day_start:
+                    cursor += 1
+                i = cursor
+                while i < len(bookings) and bookings[i][0] < day_end:
+                    b_start, b_end = bookings[i]
+                    first = max(0, (b_start - day_start) // slot_seconds)
+                    last = min(len(starts) - 1, (b_end - 1 - day_start) // slot_seconds)
+                    for bit in range(first, last + 1):
+                        # Only mark slots the booking really overlaps (DST days can shift slot times).
+                        if b_start < starts[bit] + slot_seconds and starts[bit] < b_end:
+                            booked |= 1 << bit
+                    i += 1
+            if self._bitmaps is not None:
+                self._bitmaps[(key, day)] = booked
+            yield day, starts, booked
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _local_iso(epoch: int) -> str:
+        return datetime.fromtimestamp(epoch, tz=LOCAL_TIMEZONE).isoformat()
+
+    def next_free_slots(self, specialty: str, after: str, count: int = 3, max_days: int = MAX_SEARCH_DAYS) -> List[str]:
+        """The first `count` free slot start times at or after `after`, as local ISO strings."""
+        threshold = to_epoch(after)
+        first_day = datetime.fromtimestamp(threshold, tz=LOCAL_TIMEZONE).date()
+        found = []
+        window_start = first_day
+        for window in SEARCH_WINDOWS:
+            window_end = first_day + timedelta(days=min(window, max_days) - 1)
+            if window_end < window_start:
+                continue
+            for _, starts, booked in self._day_bitmaps(specialty, window_start, window_end):
+                if booked == (1 << len(starts)) - 1:
+                    continue  # fully booked (or closed) day
+                for bit, start in enumerate(starts):
+                    if start >= threshold and not booked >> bit & 1:
+                        found.append(self._local_iso(start))
+                        if len(found) >= count:
+                            return found
+            window_start = window_end + timedelta(days=1)
+        return found
+
+    def check_slot(self, specialty: str, appointment_time: str) -> Optional[str]:
+        """None if `appointment_time` starts a slot in the specialty's calendar, otherwise why it doesn't."""
+        start = to_epoch(appointment_time)
+        calendar = self.calendar(specialty)
+        day = datetime.fromtimestamp(start, tz=LOCAL_TIMEZONE).date()
+        starts = calendar.slot_starts(day)
+        if start in starts:
+            return None
+        if not starts:
+            return f"{specialty} is closed on {WEEKDAYS[day.weekday()].title()}s."
+        opens, closes = self._local_iso(starts[0])[11:16], self._local_iso(starts[-1] + calendar.slot_minutes * 60)[11:16]
+        if not starts[0] <= start < starts[-1] + calendar.slot_minutes * 60:
+            return f"{specialty} sees patients from {opens} to {closes} on {WEEKDAYS[day.weekday()].title()}s."
+        return f"{specialty} appointments start every {calendar.slot_minutes} minutes from {opens}."
+
+    def mark_booked(self, specialty: str, start: int, end: int) -> None:
+        """Record a booking of [start, end) (epoch seconds) in the cached day bitmaps."""
+        if self._bitmaps is None:
+            return
+        calendar = self.calendar(specialty)
+        key = specialty_key(specialty)
+        slot_seconds = calendar.slot_minutes * 60
+        day = datetime.fromtimestamp(start, tz=LOCAL_TIMEZONE).date()
+        last_day = datetime.fromtimestamp(end - 1, tz=LOCAL_TIMEZONE).date()
+        while day <= last_day:
+            if (key, day) in self._bitmaps:
+                for bit, slot_start in enumerate(calendar.slot_starts(day)):
+                    if start < slot_start + slot_seconds and slot_start < end:
+                        self._bitmaps[(key, day)] |= 1 << bit
+            day += timedelta(days=1)
+
+    def clear_cache(self) -> None:
+        if self._bitmaps is not None:
+            self._bitmaps.clear()
+
+    def free_slots(self, specialty: str, first_day: str, last_day: Optional[str] = None) -> Dict[str, List[str]]:
+        """Free slot start times per day for every day in [first_day, last_day] (ISO dates)."""
+        start_day = date.fromisoformat(first_day[:10])
+        end_day = date.fromisoformat(last_day[:10]) if last_day else start_day
+        if (end_day - start_day).days > MAX_SEARCH_DAYS:
+            raise ValueError(f"Date range is limited to {MAX_SEARCH_DAYS} days.")
+        result = {}
+        for day, starts, booked in self._day_bitmaps(specialty, start_day, end_day):
+            if starts:
+                result[day.isoformat()] = [
+                    self._local_iso(start)[11:16] for bit, start in enumerate(starts) if not booked >> bit & 1
+                ]
+        return result
+
+    def utilization(self, specialty: str, first_day: str, last_day: Optional[str] = None) -> dict:
+        """
+        Booked vs. open minutes per day and in total for [first_day, last_day] (ISO dates), from the
+        store's per-day occupancy counters rather than a scan of the bookings.
+        """
+        start_day = date.fromisoformat(first_day[:10])
+        end_day = date.fromisoformat(last_day[:10]) if last_day else start_day
+        if end_day < start_day or (end_day - start_day).days > 366:
+            raise ValueError("Date range must run forwards and span at most 366 days.")
+        calendar = self.calendar(specialty)
+        occupancy = self.store.daily_occupancy(specialty, start_day, end_day)
+        days = {}
+        total_booked = total_capacity = total_bookings = 0
+        day = start_day
+        while day <= end_day:
+            bookings, booked_minutes = occupancy.get(day.isoformat(), (0, 0))
+            capacity = len(calendar.slot_starts(day)) * calendar.slot_minutes
+            if capacity or bookings:
+                days[day.isoformat()] = {
+                    "bookings": bookings, "booked_minutes": booked_minutes, "capacity_minutes": capacity,
+                    "utilization": round(booked_minutes / capacity, 3) if capacity else None,
+                }
+            total_bookings += bookings
+            total_booked += booked_minutes
+            total_capacity += capacity
+            day += timedelta(days=1)
+        return {
+            "days": days, "bookings": total_bookings, "booked_minutes": total_booked, "capacity_minutes": total_capacity,
+            "utilization": round(total_booked / total_capacity, 3) if total_capacity else None,
+        }
+
+
+# --- Shared engine ---
+_engine: Optional[SlotEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_slot_engine() -> SlotEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SlotEngine()
+    return _engine
@@ -0,0 +1,86 @@
+import pytest
+
+from hospital_scheduler.tools.appointment_store import AppointmentStore, to_epoch
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AppointmentStore(str(tmp_path / "appointments.db"), pool_size=2)
+    yield store
+    store.close()
+
+
+def test_book_if_available_books_free_slot(store):
+    result = store.book_if_available("Ada Lovelace", "2025-06-23T10:00:00", "Cardiology")
+    assert result["booked"]
+    assert result["appointment"]["slot_start"] == "2025-06-23T10:00:00-04:00"
+    assert result["appointment"]["slot_end"] == "2025-06-23T10:30:00-04:00"
+    assert store.count() == 1
+
+
+def test_overlapping_booking_is_a_conflict(store):
+    store.book_if_available("Ada Lovelace", "2025-06-23T10:00:00", "Cardiology")
+    result = store.book_if_available("Alan Turing", "2025-06-23T14:15:00Z", "cardiology", duration_minutes=30)
+    assert not result["booked"]
+    assert result["conflict"]["patient_name"] == "Ada Lovelace"
+    # Other specialties and adjacent slots stay free
+    assert store.book_if_available("Alan Turing", "2025-06-23T10:00:00", "Pediatrics")["booked"]
+    assert store.book_if_available("Alan Turing", "2025-06-23T10:30:00", "Cardiology")["booked"]
+
+
+def test_rebooking_own_slot_returns_existing_booking(store):
+    first = store.book_if_available("Ada Lovelace", "2025-06-23T10:00:00", "Cardiology")
+    again = store.book_if_available("ada  lovelace", "2025-06-23T10:00:00-04:00", "Cardiology")
+    assert again == first
+    assert store.count() == 1
+
+
+
+def test_longer_booking_from_another_store_is_a_conflict(store, tmp_path):
+    # A second store on the same file stands in for another process
+    other = AppointmentStore(str(tmp_path / "appointments.db"), pool_size=1)
+    try:
+        assert other.book_if_available("Ada Lovelace", "2025-06-23T09:00:00", "Cardiology", duration_minutes=120)["booked"]
+    finally:
+        other.close()
+    result = store.book_if_available("Alan Turing", "2025-06-23T10:30:00", "Cardiology")
+    assert not result["booked"]
+    assert result["conflict"]["patient_name"] == "Ada Lovelace"
+    assert len(store.bookings_between("Cardiology", to_epoch("2025-06-23T10:30:00"), to_epoch("2025-06-23T11:00:00"))) == 1
+
+def test_reschedule_moves_booking_and_detects_conflicts(store):
+    ada = store.book_if_available("Ada Lovelace", "2025-06-23T10:00:00", "Cardiology")["appointment"]
+    store.book_if_available("Alan Turing", "2025-06-23T11:00:00", "Cardiology")
+    assert store.reschedule(ada["id"], "2025-06-23T11:15:00", "Ada Lovelace")["conflict"]["patient_name"] == "Alan Turing"
+    moved = store.reschedule(ada["id"], "2025-06-23T12:00:00", "Ada Lovelace")
+    assert moved["rescheduled"]
+    assert moved["appointment"]["slot_end"] == "2025-06-23T12:30:00-04:00"
+    assert store.reschedule(ada["id"], "2025-06-23T13:00:00", "Alan Turing") == {"rescheduled": False, "not_found": True}
+    assert store.book_if_available("Grace Hopper", "2025-06-23T10:00:00", "Cardiology")["booked"]
+
+
+def test_missing_fields_are_rejected(store):
+    with pytest.raises(ValueError, match="patient name"):
+        store.book_if_available(None, "2025-06-23T10:00:00", "Cardiology")
+    with pytest.raises(ValueError, match="specialty"):
+        store.book_if_available("Ada Lovelace", "2025-06-23T10:00:00", " ")
+    with pytest.raises(ValueError, match="required"):
+        store.book_if_available("Ada Lovelace", None, "Cardiology")
+    assert store.count() == 0
+
+
+@pytest.mark.parametrize("value, message", [
+    (None, "required"),
+    ("", "required"),
+    ("next tuesday", "Invalid appointment time"),
+    ("2025-11-02T01:30:00", "happens twice"),  # clocks go back at 02:00 EDT
+    ("2025-03-09T02:30:00", "does not exist"),  # clocks go forward at 02:00 EST
+])
+def test_to_epoch_raises_value_error(value, message):
+    with pytest.raises(ValueError, match=message):
+        to_epoch(value)
+
+
+def test_to_epoch_accepts_offsets_on_dst_edges():
+    assert to_epoch("2025-11-02T01:30:00-04:00") + 3600 == to_epoch("2025-11-02T01:30:00-05:00")
+    assert to_epoch("2025-06-23T14:00:00Z") == to_epoch("2025-06-23T10:00:00")
@@ -0,0 +1,45 @@
+import pytest
+
+from hospital_scheduler.batch import ReferralBatch
+from hospital_scheduler.tools.appointment_store import AppointmentStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AppointmentStore(str(tmp_path / "appointments.db"), pool_size=2)
+    yield store
+    store.close()
+
+
+def test_referral_books_with_calendar_slot_length(store):
+    result = ReferralBatch(store).book({"patient_name": "Ada Lovelace", "specialty": "Pediatrics",
+                                        "date": "2025-06-23", "time": "09:20"})
+    assert result["status"] == "booked"
+    assert result["appointment"]["slot_end"] == "2025-06-23T09:40:00-04:00"
+
+
+def test_off_calendar_referral_moves_to_next_free_slot(store):
+    batch = ReferralBatch(store)
+    row = {"patient_name": "Ada Lovelace", "specialty": "Cardiology", "appointment_time": "2025-06-28T10:00:00"}
+    result = batch.book(row)
+    assert result["status"] == "rescheduled"
+    assert result["appointment"]["slot_start"] == "2025-06-30T08:00:00-04:00"
+    result = ReferralBatch(store, reschedule=False).book(row)
+    assert result["status"] == "unavailable"
+    assert result["reason"] == "Cardiology is closed on Saturdays."
+
+
+def test_taken_slot_moves_to_next_free_slot(store):
+    batch = ReferralBatch(store)
+    row = {"patient_name": "Ada Lovelace", "specialty": "General", "appointment_time": "2025-06-23T08:00:00"}
+    assert batch.book(row)["status"] == "booked"
+    moved = batch.book(dict(row, patient_name="Alan Turing"))
+    assert moved["status"] == "rescheduled"
+    assert moved["appointment"]["slot_start"] == "2025-06-23T08:15:00-04:00"
+
+
+def test_invalid_rows_need_review(store):
+    batch = ReferralBatch(store)
+    assert batch.book({"specialty": "General", "appointment_time": "2025-06-23T08:00:00"})["reason"] == "missing patient_name"
+    assert "happens twice" in batch.book({"patient_name": "Ada Lovelace", "specialty": "General",
+                                          "appointment_time": "2025-11-02T01:30:00"})["reason"]
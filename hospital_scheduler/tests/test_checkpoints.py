@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+
+from hospital_scheduler import checkpoints
+from hospital_scheduler.checkpoints import CheckpointStore, default_checkpoint_store
+
+
+DETAILS = {"patient_name": "Ada Lovelace", "appointment_time": "2025-06-23T10:00:00", "specialty": "Cardiology"}
+
+
+def _fail():
+    raise TimeoutError("booking agent timed out")
+
+
+def test_resume_reuses_recorded_stages(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run = store.start("hospital", {"patient_input": "Patient Name: Ada Lovelace"})
+    assert run.stage("details", {"patient_input": "Patient Name: Ada Lovelace"}, lambda: DETAILS) == DETAILS
+    with pytest.raises(TimeoutError):
+        run.stage("booking", DETAILS, _fail)
+    assert store.load(run.run_id)["failed_stage"] == "booking"
+
+    resumed = store.start("hospital", {"patient_input": None}, run.run_id, resume_only=True)
+    calls = []
+    assert resumed.inputs == {"patient_input": "Patient Name: Ada Lovelace"}
+    assert resumed.stage("details", {"patient_input": "Patient Name: Ada Lovelace"}, lambda: calls.append(1)) == DETAILS
+    assert resumed.stage("booking", DETAILS, lambda: "Booked") == "Booked"
+    resumed.finish("Booked")
+    assert calls == []
+    assert store.load(run.run_id)["status"] == "done"
+
+
+def test_resuming_an_unknown_run_writes_nothing(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    with pytest.raises(KeyError):
+        store.start("hospital", {"patient_input": None}, "20250101-000000-deadbeef", resume_only=True)
+    assert store.runs() == []
+
+
+def test_replay_reports_changed_stages_without_recording(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run = store.start("hospital", {"patient_input": "Patient Name: Ada Lovelace"})
+    run.stage("details", {"patient_input": "Patient Name: Ada Lovelace"}, lambda: DETAILS)
+    run.stage("booking", DETAILS, lambda: "Booked")
+    run.finish("Booked")
+
+    replay = store.replay(run.run_id, ["booking"])
+    assert replay.stage("details", {"patient_input": "Patient Name: Ada Lovelace"}, _fail) == DETAILS
+    assert replay.stage("booking", DETAILS, lambda: "Slot is already booked.") == "Slot is already booked."
+    assert replay.report()["booking"]["matches"] is False
+    assert store.load(run.run_id)["stages"]["booking"]["output"] == "Booked"
+    with pytest.raises(KeyError):
+        store.replay("missing")
+
+
+def test_prune_keeps_newest_runs(tmp_path):
+    store = CheckpointStore(str(tmp_path), keep=2)
+    run_ids = []
+    for i in range(4):
+        run_ids.append(store.start("hospital", {"patient_input": str(i)}).run_id)
+        os.utime(tmp_path / f"{run_ids[-1]}.json", (time.time() + i, time.time() + i))
+    store.prune()
+    assert store.runs() == run_ids[:1:-1]
+
+
+class _InlineThread:
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+def test_starting_runs_prunes_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoints.threading, "Thread", _InlineThread)
+    store = CheckpointStore(str(tmp_path), keep=1)
+    for i in range(3):
+        store.start("hospital", {"patient_input": str(i)})
+    assert len(store.runs()) == 3  # only the first start pruned, when there was nothing to delete
+    monkeypatch.setattr(checkpoints, "PRUNE_INTERVAL_SECONDS", 0.0)
+    store.start("hospital", {"patient_input": "3"})
+    assert len(store.runs()) == 1
+
+
+def test_checkpoints_are_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOSPITAL_CHECKPOINT_DIR", str(tmp_path / "runs"))
+    monkeypatch.delenv("HOSPITAL_CHECKPOINTS", raising=False)
+    assert default_checkpoint_store() is None
+    monkeypatch.setenv("HOSPITAL_CHECKPOINTS", "1")
+    assert default_checkpoint_store().directory == str(tmp_path / "runs")
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from hospital_scheduler.tools import appointment_store
+from hospital_scheduler.tools.appointment_store import AppointmentStore
+from hospital_scheduler.tools.database_tool import DatabaseTool
+
+
+@pytest.fixture
+def tool(tmp_path, monkeypatch):
+    store = AppointmentStore(str(tmp_path / "appointments.db"), pool_size=2)
+    monkeypatch.setattr(appointment_store, "_store", store)
+    yield DatabaseTool()
+    store.close()
+
+
+def test_missing_patient_name_is_not_reported_as_a_conflict(tool):
+    result = json.loads(tool._run("book_if_available", appointment_time="2025-06-23T10:00:00", specialty="Cardiology"))
+    assert result == {"success": False, "message": "A patient name is required to book an appointment."}
+
+
+def test_dst_gap_is_reported_to_the_user(tool):
+    result = json.loads(tool._run("book_if_available", patient_name="Ada Lovelace",
+                                  appointment_time="2025-03-09T02:30:00", specialty="Cardiology"))
+    assert not result["success"]
+    assert "does not exist" in result["message"]
+
+
+def test_booking_uses_the_specialty_slot_length(tool):
+    result = json.loads(tool._run("book_if_available", patient_name="Ada Lovelace",
+                                  appointment_time="2025-06-23T08:15:00", specialty="General"))
+    assert result["success"]
+    assert result["appointment"]["slot_end"] == "2025-06-23T08:30:00-04:00"
+
+
+def test_off_calendar_request_is_redirected(tool):
+    result = json.loads(tool._run("book_if_available", patient_name="Ada Lovelace",
+                                  appointment_time="2025-06-22T03:07:00", specialty="Cardiology", count=1))
+    assert result == {"success": False, "message": "Cardiology is closed on Sundays.",
+                      "alternatives": ["2025-06-23T08:00:00-04:00"]}
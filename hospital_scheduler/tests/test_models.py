@@ -0,0 +1,15 @@
+import pytest
+from pydantic import ValidationError
+
+from hospital_scheduler.models import PatientDetails
+
+
+def test_patient_details_strip_appointment_time():
+    details = PatientDetails(patient_name="Ada Lovelace", appointment_time=" 2025-06-23T10:00:00 ", specialty="Cardiology")
+    assert details.appointment_time == "2025-06-23T10:00:00"
+
+
+@pytest.mark.parametrize("value", ["2025-11-02T01:30:00", "2025-03-09T02:30:00", "soon"])
+def test_patient_details_reject_times_the_store_cannot_book(value):
+    with pytest.raises(ValidationError):
+        PatientDetails(patient_name="Ada Lovelace", appointment_time=value, specialty="Cardiology")
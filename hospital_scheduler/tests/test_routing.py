@@ -0,0 +1,93 @@
+import threading
+from pathlib import Path
+
+from crewai import BaseLLM
+
+from hospital_scheduler.llm_gateway import GatewayLLM, LLMGateway
+from hospital_scheduler.routing import MIN_SAMPLES, ModelRouter, Route
+
+BENCHMARKS = Path(__file__).resolve().parents[2] / "benchmarks"
+
+
+class RecordingLLM(BaseLLM):
+    """Returns its model name and records the stop words each call was made with."""
+
+    def __init__(self, model: str):
+        super().__init__(model=model)
+        self.calls = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, stop=None, **kwargs):
+        self.calls.append(list(stop or []))
+        return self.model
+
+
+def _observe(router, route, model, ms, times=MIN_SAMPLES):
+    for _ in range(times):
+        router.observe(route, model, ms / 1000)
+
+
+def test_choose_starts_on_the_first_tier():
+    router = ModelRouter(["small", "large"])
+    route = Route("summarizer", slo_ms=1000)
+    assert router.choose(route, router.tiers) == 0
+    _observe(router, route, "small", 500)
+    assert router.choose(route, router.tiers) == 0
+
+
+def test_slo_miss_never_moves_to_a_slower_tier():
+    router = ModelRouter(["small", "large"])
+    route = Route("summarizer", slo_ms=1000)
+    _observe(router, route, "small", 2000)
+    assert router.choose(route, router.tiers) == 0  # "large" isn't measured, so it isn't assumed faster
+    _observe(router, route, "large", 3000)
+    assert router.choose(route, router.tiers) == 0
+    _observe(router, route, "large", 1500, times=200)
+    assert router.choose(route, router.tiers) == 1  # measured faster than "small"
+
+
+def test_run_escalates_until_the_output_validates():
+    router = ModelRouter(["small", "large"])
+    route = Route("profiler", slo_ms=1000)
+    llm = router.llm(route, lambda model, max_tokens: RecordingLLM(model))
+
+    def validate(output):
+        if output != "large":
+            raise ValueError(output)
+        return output
+
+    assert llm.run(lambda: llm.call("hi"), validate) == "large"
+    assert router.stats()["profiler"]["escalations"] == 1
+
+
+def test_stop_words_are_per_call_not_shared():
+    router = ModelRouter(["small"])
+    client = GatewayLLM(RecordingLLM("small"), LLMGateway(requests_per_minute=100_000, tokens_per_minute=100_000_000))
+    crews = [router.llm(Route(f"agent{i}", slo_ms=1000), lambda model, max_tokens: client) for i in range(2)]
+    crews[0].stop = ["Observation:"]
+    # Distinct messages, so the gateway doesn't coalesce any of the calls
+    threads = [threading.Thread(target=crew.call, args=(f"hi {n}",)) for crew in crews for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(map(tuple, client.llm.calls)) == [()] * 20 + [("Observation:",)] * 20
+    assert client.stop == [] and client.llm.stop == []
+
+
+def test_bench_crew_calls_its_llm_through_router_and_gateway(monkeypatch, tmp_path):
+    monkeypatch.syspath_prepend(str(BENCHMARKS))
+    from fake_llm import FakeLLM
+    from hospital_scheduler.crew import HospitalSchedulerCrew
+    from hospital_scheduler.tools import appointment_store
+
+    monkeypatch.setattr(appointment_store, "_store", appointment_store.AppointmentStore(str(tmp_path / "appointments.db")))
+    fake = FakeLLM(latency_ms=0)
+    llm = GatewayLLM(fake, LLMGateway(requests_per_minute=100_000, tokens_per_minute=100_000_000))
+    crew = HospitalSchedulerCrew(verbose=False, llm=llm)
+    crew.kickoff(
+        "Patient Name: Jane Doe\n"
+        "Reason for Visit: Check-up\n"
+        "Preferred Appointment Date/Time: 2030-03-04 10:00\n"
+        "Preferred Doctor Specialty: Cardiology"
+    )
+    assert fake.calls > 0
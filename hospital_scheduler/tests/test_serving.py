@@ -0,0 +1,24 @@
+import threading
+import time
+
+from hospital_scheduler.serving import CrewPool
+
+
+def test_failed_build_is_retried_on_the_next_borrow(monkeypatch):
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)  # the failed build's thread re-raises
+    builds = []
+
+    def factory():
+        builds.append(len(builds))
+        if len(builds) == 1:
+            raise RuntimeError("model endpoint unreachable")
+        return f"crew {len(builds)}"
+
+    pool = CrewPool(factory, workers=1, queue_timeout=5)
+    pool.warm()
+    while pool.metrics()["building"]:
+        time.sleep(0.01)
+    assert pool.metrics()["warm_errors"] == 1
+    with pool.crew() as crew:
+        assert crew == "crew 2"
+    assert pool.metrics()["ready"] == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from hospital_scheduler.tools.appointment_store import AppointmentStore
+from hospital_scheduler.tools.slot_engine import SlotEngine
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AppointmentStore(str(tmp_path / "appointments.db"), pool_size=2)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def engine(store):
+    return SlotEngine(store)
+
+
+def test_calendars_come_from_config(engine):
+    assert engine.calendar("General").slot_minutes == 15
+    assert engine.calendar(" pediatrics ").slot_minutes == 20
+    assert engine.calendar("Dermatology") is engine.default_calendar
+
+
+def test_next_free_slots_skips_bookings_and_closed_days(store, engine):
+    # Friday 2025-06-27: Cardiology closes at 12:00 and is shut over the weekend
+    store.book_if_available("Ada Lovelace", "2025-06-27T11:00:00", "Cardiology", 30)
+    assert engine.next_free_slots("Cardiology", "2025-06-27T10:45:00", 3) == [
+        "2025-06-27T11:30:00-04:00", "2025-06-30T08:00:00-04:00", "2025-06-30T08:30:00-04:00",
+    ]
+
+
+def test_next_free_slots_follow_slot_length(engine):
+    assert engine.next_free_slots("General", "2025-06-23T08:05:00", 2) == [
+        "2025-06-23T08:15:00-04:00", "2025-06-23T08:30:00-04:00",
+    ]
+
+
+def test_check_slot(engine):
+    assert engine.check_slot("Cardiology", "2025-06-23T08:30:00") is None
+    assert "closed on Sundays" in engine.check_slot("Cardiology", "2025-06-22T03:07:00")
+    assert "from 08:00 to 12:00 on Fridays" in engine.check_slot("Cardiology", "2025-06-27T13:00:00")
+    assert "every 20 minutes" in engine.check_slot("Pediatrics", "2025-06-23T09:30:00")
+
+
+def test_utilization_counts_calendar_minutes(store, engine):
+    for time in ("08:00", "08:15", "08:30"):
+        store.book_if_available("Ada Lovelace", f"2025-06-23T{time}:00", "General", 15)
+    report = engine.utilization("General", "2025-06-23", "2025-06-24")
+    assert report["bookings"] == 3
+    assert report["booked_minutes"] == 45
+    assert report["capacity_minutes"] == 2 * 600
+    assert report["days"]["2025-06-23"]["utilization"] == round(45 / 600, 3)
@@ -0,0 +1,27 @@
+import threading
+import time
+
+from hospital_scheduler.streaming import emit_stage, stream_kickoff
+
+
+def test_stream_yields_stages_then_result():
+    def kickoff():
+        emit_stage("Looking up slots")
+        return "Booked"
+
+    assert list(stream_kickoff(kickoff)) == [("stage", "Looking up slots"), ("result", "Booked")]
+
+
+def test_closing_the_stream_waits_for_the_kickoff():
+    finished = threading.Event()
+
+    def kickoff():
+        emit_stage("Started")
+        time.sleep(0.2)
+        finished.set()
+        return "Booked"
+
+    events = stream_kickoff(kickoff)
+    assert next(events) == ("stage", "Started")
+    events.close()  # what a client disconnect does to the Gradio handler's stream
+    assert finished.is_set()
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from news_curator_project.cache import normalize_style, normalize_topic
+from news_curator_project.profiles import load_profiles
+from news_curator_project.tools.news_store import get_article_store
+
+# --- Batch digest mode ---
+# Curates digests for many subscribers in one run. Users are grouped by topic so each topic
+# is fetched once and each (topic, summary style) pair is summarized once, however many
+# users share it. Finished pairs are checkpointed, so an interrupted run picks up where it
+# stopped, and each user's digest is streamed to the output as soon as all of its topics are done.
+# A pair whose summary fails is reported in the digests of the users who asked for it and isn't
+# checkpointed, so rerunning retries just those users and pairs; the rest of the batch carries on.
+
+
+class BatchDigestRunner:
+    """
+    Runs one batch: `summarize(topic, summary_style, articles)` is called once per
+    distinct (topic, style) pair on a bounded pool of `workers` threads.
+    """
+
+    def __init__(self, summarize: Callable[[str, str, list], str], workers: int = 4, checkpoint_path: Optional[str] = None):
+        self.summarize = summarize
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self._checkpoint_lock = threading.Lock()
+
+    def _load_checkpoint(self) -> Dict[tuple, dict]:
+        done = {}
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        done[(record["topic"], record["summary_style"])] = record
+        return done
+
+    @staticmethod
+    def _written_users(output_path: str) -> set:
+        written = set()
+        if os.path.exists(output_path):
+            with open(output_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break  # a partial last line from an interrupted run
+                        if "user_id" in record and not record.get("errors"):
+                            written.add(record["user_id"])
+        return written
+
+    def run(self, profiles_path: str, output_path: str) -> dict:
+        written = self._written_users(output_path)
+        done = self._load_checkpoint()
+        failed: Dict[tuple, str] = {}
+
+        # --- Group users by (topic, style) ---
+        users: Dict[str, dict] = {}
+        pairs: Dict[tuple, List[str]] = {}
+        # The normalized key only groups and checkpoints topics; searching and summarizing use
+        # the topic as a subscriber wrote it (the first spelling seen for each key).
+        queries: Dict[str, str] = {}
+        for profile in load_profiles(profiles_path):
+            if profile["user_id"] in written or not profile["topics"]:
+                continue
+            style = normalize_style(profile["summary_style"])
+            keys = []
+            for topic in profile["topics"]:
+                key = (normalize_topic(topic) or topic.lower(), style)
+                queries.setdefault(key[0], topic)
+                if key not in keys:
+                    keys.append(key)
+                    pairs.setdefault(key, []).append(profile["user_id"])
+            users[profile["user_id"]] = {"keys": keys, "remaining": {k for k in keys if k not in done}}
+
+        stats = {"users": len(users), "skipped_users": len(written), "pairs": len(pairs),
+                 "resumed_pairs": sum(1 for k in pairs if k in done), "summarized_pairs": 0, "failed_pairs": 0}
+
+        # --- Fetch once per topic ---
+        # Every topic is scored against the corpus in one batch
+        topics = sorted({topic for topic, _ in pairs})
+        articles_by_topic = dict(zip(topics, get_article_store().search_many([queries[t] for t in topics])))
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            def emit_ready(user_ids):
+                for user_id in user_ids:
+                    user = users[user_id]
+                    if user["remaining"] or user.get("written"):
+                        continue
+                    digests = [{"topic": t, "summary_style": s, "summary": done[(t, s)]["summary"],
+                                "articles": done[(t, s)]["articles"]} for t, s in user["keys"] if (t, s) in done]
+                    record = {"user_id": user_id, "digests": digests}
+                    errors = [{"topic": t, "summary_style": s, "error": failed[(t, s)]} for t, s in user["keys"] if (t, s) in failed]
+                    if errors:
+                        record["errors"] = errors
+                    out.write(json.dumps(record) + "\n")
+                    user["written"] = True
+                out.flush()
+
+            emit_ready(list(users))  # users whose pairs were all checkpointed already
+
+            todo = [key for key in pairs if key not in done]
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="news-batch") as pool:
+                in_flight = {}
+                while todo or in_flight:
+                    # Keep at most 2x workers pairs queued so memory stays bounded on huge runs.
+                    while todo and len(in_flight) < self.workers * 2:
+                        key = todo.pop()
+                        in_flight[pool.submit(self.summarize, queries[key[0]], key[1], articles_by_topic[key[0]])] = key
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        key = in_flight.pop(future)
+                        try:
+                            summary = future.result()
+                        except Exception as e:
+                            failed[key] = f"{type(e).__name__}: {e}"
+                            stats["failed_pairs"] += 1
+                        else:
+                            record = {"topic": key[0], "summary_style": key[1], "summary": summary,
+                                      "articles": [a.get("title") for a in articles_by_topic[key[0]]]}
+                            self._checkpoint(record)
+                            done[key] = record
+                            stats["summarized_pairs"] += 1
+                        for user_id in pairs[key]:
+                            users[user_id]["remaining"].discard(key)
+                        emit_ready(pairs[key])
+        return stats
+
+    def _checkpoint(self, record: dict) -> None:
+        if not self.checkpoint_path:
+            return
+        with self._checkpoint_lock, open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
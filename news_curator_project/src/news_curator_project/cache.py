@@ -0,0 +1,150 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from news_curator_project.tools.news_store import tokenize
+
+# --- Profile normalization ---
+# Different phrasings of the same interest ("tech", "Technology news", "technology headlines")
+# should land on the same cache entry.
+TOPIC_ALIASES = {
+    "tech": "technology",
+    "technologies": "technology",
+    "ai": "technology",
+    "finances": "finance",
+    "financial": "finance",
+    "markets": "finance",
+    "stocks": "finance",
+    "economy": "finance",
+    "medical": "health",
+    "medicine": "health",
+    "healthcare": "health",
+}
+DEFAULT_SUMMARY_STYLE = "general"
+
+
+def normalize_topic(topic: str) -> str:
+    tokens = {TOPIC_ALIASES.get(token, token) for token in tokenize(topic or "")}
+    return " ".join(sorted(tokens))
+
+
+def normalize_style(style: str) -> str:
+    return " ".join(tokenize(style or "")) or DEFAULT_SUMMARY_STYLE
+
+
+def hash_articles(articles: Iterable[dict]) -> str:
+    """Stable digest of an article set, independent of ranking order."""
+    digest = hashlib.sha256()
+    for line in sorted(json.dumps(a, sort_keys=True) for a in articles):
+        digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def make_cache_key(topic: str, summary_style: str, articles: Iterable[dict]) -> str:
+    return f"{normalize_topic(topic)}|{normalize_style(summary_style)}|{hash_articles(articles)}"
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for finished summaries, with an optional SQLite file behind the
+    in-memory entries so results survive restarts and can be shared between processes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 900.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = row
+                    self._store_in_memory(key, entry)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                self._delete(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if self._conn is not None:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        entry = (value, now + self.ttl_seconds)
+        with self._lock:
+            self._store_in_memory(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, entry[1], now),
+                )
+                # Keep the file bounded too: drop expired rows, then the least recently used ones.
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self._conn.commit()
+
+    def _store_in_memory(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+        }
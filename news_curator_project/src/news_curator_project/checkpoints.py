@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+
+# --- Stage checkpoints ---
+# Every kickoff gets a run ID, and each stage's inputs and output are written to
+# <NEWS_CHECKPOINT_DIR>/<run_id>.json as soon as the stage finishes. Kicking off again with the
+# same run ID resumes it: stages already recorded with the same inputs are read back instead of
+# re-run, so a summarizer timeout doesn't cost the profiling and gathering calls a second time.
+# Replaying re-runs chosen stages from their recorded inputs and compares the outputs, which turns
+# any recorded run into a regression and benchmark fixture that only pays for the stages re-run.
+
+
+# Pruning old runs scans the whole directory, so it runs on a background thread at most this often
+PRUNE_INTERVAL_SECONDS = 60.0
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def _jsonable(value):
+    """`value` as it reads back from a checkpoint file, so fresh and resumed runs see the same types."""
+    return json.loads(json.dumps(value, default=str))
+
+
+class RunCheckpoint:
+    """
+    One run's record. `stage(name, inputs, compute)` returns the recorded output when the stage
+    already finished with these inputs, otherwise calls `compute()` and records its output.
+    Stages named in `rerun` are always computed; their new outputs go to `replayed`, not the record.
+    """
+
+    def __init__(self, record: dict, store: Optional["CheckpointStore"] = None, rerun: Iterable[str] = ()):
+        self.record = record
+        self.store = store
+        self.rerun = set(rerun)
+        self.replayed: Dict[str, dict] = {}
+
+    @property
+    def run_id(self) -> str:
+        return self.record["run_id"]
+
+    @property
+    def inputs(self) -> dict:
+        return self.record["inputs"]
+
+    def _save(self) -> None:
+        if self.store is not None:
+            self.store.save(self.record)
+
+    def stage(self, name: str, inputs, compute: Callable[[], object]):
+        inputs = _jsonable(inputs)
+        recorded = self.record["stages"].get(name)
+        if recorded is not None and recorded["inputs"] == inputs and name not in self.rerun:
+            return recorded["output"]
+        started = time.perf_counter()
+        try:
+            output = _jsonable(compute())
+        except Exception as e:
+            if name not in self.rerun:
+                self.record.update(status="failed", failed_stage=name, error=f"{type(e).__name__}: {e}")
+                self._save()
+            raise
+        seconds = round(time.perf_counter() - started, 4)
+        if name in self.rerun:
+            self.replayed[name] = {"output": output, "seconds": seconds,
+                                   "matches": recorded is not None and recorded["output"] == output}
+        else:
+            self.record["stages"][name] = {"inputs": inputs, "output": output, "seconds": seconds}
+            self.record.update(status="running", failed_stage=None, error=None)
+            self._save()
+        return output
+
+    def finish(self, result) -> None:
+        if not self.rerun:
+            self.record.update(status="done", result=_jsonable(result), failed_stage=None, error=None)
+            self._save()
+
+    def report(self) -> dict:
+        """Per re-run stage: recorded vs. replayed seconds and whether the output matched the recording."""
+        return {
+            name: {"recorded_seconds": (self.record["stages"].get(name) or {}).get("seconds"),
+                   "replayed_seconds": replay["seconds"], "matches": replay["matches"], "output": replay["output"]}
+            for name, replay in self.replayed.items()
+        }
+
+
+class CheckpointStore:
+    """
+    JSON checkpoint files in `directory`, one per run. Only the newest `keep` runs are kept: starting
+    a run prunes the rest in the background, at most once every PRUNE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, directory: str, keep: int = 500):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._pruning = False
+        self._last_prune = float("-inf")
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        if not run_id or os.sep in run_id or run_id.startswith("."):
+            raise ValueError(f"Invalid run ID: {run_id!r}")
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def load(self, run_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(run_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, record: dict) -> None:
+        path = self._path(record["run_id"])
+        tmp_path = f"{path}.tmp-{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def runs(self) -> List[str]:
+        """Run IDs, newest first."""
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        return [entry.name[:-5] for entry in entries]
+
+    def start(self, kind: str, inputs: dict, run_id: Optional[str] = None, resume_only: bool = False) -> RunCheckpoint:
+        """
+        Resume run `run_id` if it was recorded, otherwise start a new run (under `run_id` if given).
+        With `resume_only`, an unrecorded `run_id` raises KeyError and nothing is written.
+        """
+        record = self.load(run_id) if run_id else None
+        if record is None:
+            if resume_only:
+                raise KeyError(f"No recorded run {run_id} to resume.")
+            record = {"run_id": run_id or new_run_id(), "kind": kind, "inputs": _jsonable(inputs),
+                      "created_at": time.time(), "status": "running", "stages": {}}
+            self.save(record)
+            self._prune_soon()
+        return RunCheckpoint(record, store=self)
+
+    def replay(self, run_id: str, stages: Optional[Iterable[str]] = None) -> RunCheckpoint:
+        """A read-only copy of run `run_id` that re-runs `stages` (default: every recorded stage)."""
+        record = self.load(run_id)
+        if record is None:
+            raise KeyError(f"No checkpoint for run {run_id} in {self.directory}")
+        return RunCheckpoint(record, rerun=stages if stages else list(record["stages"]))
+
+    def _prune_soon(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._pruning or now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+                return
+            self._pruning, self._last_prune = True, now
+        threading.Thread(target=self.prune, name="checkpoint-prune", daemon=True).start()
+
+    def prune(self) -> int:
+        """Delete all but the newest `keep` runs; returns how many were deleted."""
+        removed = 0
+        try:
+            for run_id in self.runs()[self.keep:]:
+                try:
+                    os.remove(self._path(run_id))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        finally:
+            with self._lock:
+                self._pruning = False
+        return removed
+
+
+def untracked_run(kind: str, inputs: dict) -> RunCheckpoint:
+    """A run that computes every stage and records nothing, for when checkpoints are off."""
+    return RunCheckpoint({"run_id": None, "kind": kind, "inputs": _jsonable(inputs), "status": "running", "stages": {}})
+
+
+def default_checkpoint_store() -> Optional[CheckpointStore]:
+    """
+    Checkpoints under NEWS_CHECKPOINT_DIR (default .checkpoints/news), keeping the newest
+    NEWS_CHECKPOINT_KEEP runs (default 500). Records hold the full request, so they are opt-in:
+    None unless NEWS_CHECKPOINTS=1.
+    """
+    if os.environ.get("NEWS_CHECKPOINTS", "0") != "1":
+        return None
+    return CheckpointStore(
+        os.environ.get("NEWS_CHECKPOINT_DIR") or os.path.join(".checkpoints", "news"),
+        keep=int(os.environ.get("NEWS_CHECKPOINT_KEEP", "500")),
+    )
@@ -1,72 +1,244 @@
 import os
+import ast
 import json
+import re
 from crewai import Agent, Task, Crew, Process
+# BaseTool has lived in crewai.tools since the crewai versions this project supports (>=0.130)
+from crewai.tools import BaseTool
 
-# --- Robust BaseTool Import (Try multiple common paths) ---
-try:
-    from crewai.tools import BaseTool
-except ImportError:
-    try:
-        from crewai_tools.tool_base import BaseTool
-    except ImportError:
-        try:
-            from crewai_tools.tools import BaseTool
-        except ImportError:
-            try:
-                from crewai_tools.tools.base import BaseTool
-            except ImportError:
-                raise ImportError("Could not import BaseTool from 'crewai_tools' or its known submodules. "
-                                  "Please ensure 'crewai_tools' is installed correctly and is up-to-date.")
+from pydantic import BaseModel, Field
+from typing import Type
+
+import threading
+
+from news_curator_project.cache import DEFAULT_SUMMARY_STYLE, ResponseCache, make_cache_key
+from news_curator_project.checkpoints import CheckpointStore, RunCheckpoint, default_checkpoint_store, untracked_run
+from news_curator_project.digest import DigestBuilder
+from news_curator_project.intent import extract_intent
+from news_curator_project.llm_gateway import GatewayLLM, StopWordsLLM, get_gateway
+from news_curator_project.models import ARTICLE_TOKEN_BUDGET, ArticleSummaries, InterestProfile, to_excerpts
+from news_curator_project.profiles import ProfileStore, get_profile_store, personalize, prefer_sources
+from news_curator_project.routing import Route, get_router
+from news_curator_project.streaming import emit_stage, stream_kickoff
+from news_curator_project.timing import StageTimer
+from news_curator_project.tracing import (
+    current_trace, default_exporter, record_usage, timed_stage, trace_run, traced, verbose_enabled
+)
+from news_curator_project.tools.news_store import DEFAULT_TOP_K, afetch_topics, fetch_topics, split_topics
 
-from langchain_openai import ChatOpenAI
+# --- Define the News API Tool ---
+# Articles come from a shared, pre-indexed ArticleStore that is loaded once per process.
+# The tool returns compact excerpts (about `max_tokens_per_article` tokens each) rather than
+# full article bodies, so that's all that ever reaches the summarizer's prompt.
+class NewsAPIToolInput(BaseModel):
+    """Input schema for NewsAPITool."""
+    topic: str = Field(..., description="Topic or keywords to search for (e.g., 'AI', 'finance'). Separate several topics with 'and' or commas (e.g., 'tech and finance').")
+    top_k: int = Field(DEFAULT_TOP_K, description="Maximum number of articles to return per topic, best matches first.")
 
-# --- Define a Mock News API Tool ---
-# This tool simulates fetching news articles.
 class NewsAPITool(BaseTool):
     name: str = "News API Tool"
-    description: str = "Fetches mock news articles based on a given topic. Returns a JSON string of articles."
+    description: str = (
+        "Fetches the most relevant news articles for a topic, or for several topics at once when they are "
+        "separated by 'and' or commas. Returns a JSON string of article excerpts."
+    )
+    args_schema: Type[BaseModel] = NewsAPIToolInput
+    max_tokens_per_article: int = ARTICLE_TOKEN_BUDGET
 
-    def _run(self, topic: str) -> str:
+    def _run(self, topic: str, top_k: int = DEFAULT_TOP_K) -> str:
         """
-        Simulates fetching news articles for a given topic.
-        In a real scenario, this would make an API call to a news service.
+        Returns the top-k articles per topic from the shared article store.
+        Multiple topics are fetched concurrently and merged without duplicates.
         """
-        mock_news_data = {
-            "technology": [
-                {"title": "New AI Breakthrough in Robotics", "content": "Researchers at TechLab announce a significant advancement in AI-driven robotic navigation, promising more autonomous systems.", "source": "Tech Daily"},
-                {"title": "Quantum Computing Market Update", "content": "The market for quantum computing solutions is expected to grow by 25% this year, driven by investments in national research programs.", "source": "Quantum Insights"},
-                {"title": "Cybersecurity Threats on the Rise", "content": "A recent report indicates a sharp increase in sophisticated phishing attacks targeting remote workers.", "source": "Security Weekly"}
-            ],
-            "finance": [
-                {"title": "Global Stock Markets Show Resilience", "content": "Despite inflationary pressures, major global stock indices have shown unexpected resilience in the last quarter.", "source": "Financial Times"},
-                {"title": "Interest Rate Hikes Expected Soon", "content": "Central banks are signaling further interest rate increases to combat persistent inflation, impacting borrowing costs.", "source": "Bloomberg"},
-                {"title": "Cryptocurrency Volatility Continues", "content": "Bitcoin and Ethereum experience further price swings as regulatory uncertainty impacts investor confidence.", "source": "CoinDesk"}
-            ],
-            "health": [
-                {"title": "New Cancer Drug Shows Promising Results", "content": "Clinical trials for a novel cancer therapy have yielded positive early results, offering new hope for patients.", "source": "Health Journal"},
-                {"title": "Mental Health Awareness Campaign Launches", "content": "A nationwide campaign aims to destigmatize mental health issues and provide resources for support.", "source": "Public Health News"},
-                {"title": "Vaccine Development Progress Update", "content": "Scientists are making steady progress on new vaccines for emerging infectious diseases.", "source": "Medical Gazette"}
-            ]
-        }
-
-        topic_lower = topic.lower()
-        found_articles = []
-        for key, articles in mock_news_data.items():
-            if topic_lower in key or any(topic_lower in article['title'].lower() for article in articles):
-                found_articles.extend(articles)
+        with traced(f"tool:{self.name}", topic=topic) as span:
+            articles = fetch_topics(split_topics(topic), top_k=top_k)
+            if span is not None:
+                span.attributes["articles"] = len(articles)
+            return self._format(topic, articles)
 
+    async def _arun(self, topic: str, top_k: int = DEFAULT_TOP_K) -> str:
+        with traced(f"tool:{self.name}", topic=topic):
+            return self._format(topic, await afetch_topics(split_topics(topic), top_k=top_k))
+
+    def _format(self, topic: str, found_articles: list) -> str:
         if not found_articles:
             return json.dumps({"status": "error", "message": f"No specific news found for '{topic}'. Showing general news."})
 
-        return json.dumps({"status": "success", "articles": found_articles, "topic": topic})
+        articles = to_excerpts(found_articles, self.max_tokens_per_article)
+        return json.dumps({"status": "success", "articles": articles, "topic": topic})
+
+# --- Shared News API Tool ---
+# Created on first use rather than at import. result_as_answer hands the tool's JSON straight
+# to the next task as the gathering task's output, instead of having the gatherer LLM re-read
+# and re-emit every article.
+_news_api_tool = None
+_tool_lock = threading.Lock()
+
+def get_news_api_tool() -> NewsAPITool:
+    global _news_api_tool
+    with _tool_lock:
+        if _news_api_tool is None:
+            _news_api_tool = NewsAPITool(result_as_answer=True)
+        return _news_api_tool
+
+# --- Shared LLM clients ---
+# One client per model name for the whole process, so every crew reuses the same HTTP connection pool.
+# All of them go through the shared LLM gateway (coalescing + global rate budget). Streaming
+# clients publish each token on the event bus.
+_llm_clients = {}
+_llm_lock = threading.Lock()
+
+def get_llm(model_name: str = "gpt-4o-mini", stream: bool = False, max_tokens: int = None):
+    with _llm_lock:
+        if (model_name, stream, max_tokens) not in _llm_clients:
+            _llm_clients[(model_name, stream, max_tokens)] = GatewayLLM(
+                StopWordsLLM(model=model_name, stream=stream, max_tokens=max_tokens), get_gateway())
+        return _llm_clients[(model_name, stream, max_tokens)]
+
+# --- Model routes ---
+# Latency SLO (p95 per LLM call, ms) and completion token budget per agent. Profiling and
+# gathering are short structured answers; summaries are longer. See routing.py for how tiers are picked.
+ROUTES = {
+    "profiler": Route("profiler", slo_ms=float(os.environ.get("NEWS_PROFILER_SLO_MS", "1500")), max_tokens=150),
+    "gatherer": Route("gatherer", slo_ms=float(os.environ.get("NEWS_GATHERER_SLO_MS", "1500")), max_tokens=300),
+    "summarizer": Route("summarizer", slo_ms=float(os.environ.get("NEWS_SUMMARIZER_SLO_MS", "6000")), max_tokens=800),
+}
+
+def parse_interest_profile(raw: str) -> dict:
+    """
+    Turn the profiler's output (JSON or a Python-style dict, possibly wrapped in prose
+    or a code fence) into {'topic': ..., 'summary_style': ...}.
+    """
+    match = re.search(r"\{.*\}", raw, re.DOTALL)
+    profile = {}
+    if match:
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                profile = parse(match.group(0))
+                break
+            except (ValueError, SyntaxError):
+                continue
+    if not isinstance(profile, dict) or not profile.get("topic"):
+        # Fall back to treating the whole answer as the topic.
+        profile = {"topic": raw.strip()}
+    return {
+        "topic": str(profile["topic"]),
+        "summary_style": str(profile.get("summary_style") or DEFAULT_SUMMARY_STYLE),
+    }
+
+def profile_from_output(output) -> dict:
+    """The profiling crew's typed InterestProfile, falling back to parsing its raw text."""
+    typed = getattr(output, "pydantic", None)
+    if isinstance(typed, InterestProfile) and typed.topic:
+        return {"topic": typed.topic, "summary_style": typed.summary_style or DEFAULT_SUMMARY_STYLE}
+    return parse_interest_profile(str(output))
+
+def strict_profile_from_output(output) -> dict:
+    """Like `profile_from_output`, but raises ValueError unless the output is a valid profile."""
+    typed = getattr(output, "pydantic", None)
+    if isinstance(typed, InterestProfile) and typed.topic:
+        return profile_from_output(output)
+    match = re.search(r"\{.*\}", str(output), re.DOTALL)
+    if match is None:
+        raise ValueError("The profiler's answer has no JSON profile.")
+    return profile_from_output(InterestProfile.model_validate_json(match.group(0)))
+
+def article_summaries_from_output(output, count: int, strict: bool = False) -> list:
+    """
+    `count` per-article summaries (by 'id') from the typed output, or parsed from its raw JSON.
+    Missing ones are left empty, or with `strict` raise ValueError.
+    """
+    typed = getattr(output, "pydantic", None)
+    if not isinstance(typed, ArticleSummaries):
+        match = re.search(r"\{.*\}", str(output), re.DOTALL)
+        try:
+            typed = ArticleSummaries.model_validate_json(match.group(0)) if match else None
+        except ValueError:
+            if strict:
+                raise
+            typed = None
+    if strict and (typed is None or {item.id for item in typed.summaries if item.summary} < set(range(count))):
+        raise ValueError("The summarizer didn't summarize every article.")
+    summaries = [""] * count
+    for item in typed.summaries if typed is not None else []:
+        if 0 <= item.id < count:
+            summaries[item.id] = item.summary
+    return summaries
 
-# --- Initialize the News API Tool ---
-news_api_tool = NewsAPITool()
+def default_response_cache() -> ResponseCache:
+    """Response cache configured from NEWS_CACHE_TTL, NEWS_CACHE_SIZE and NEWS_CACHE_PATH (optional on-disk file)."""
+    return ResponseCache(
+        max_entries=int(os.environ.get("NEWS_CACHE_SIZE", "256")),
+        ttl_seconds=float(os.environ.get("NEWS_CACHE_TTL", "900")),
+        path=os.environ.get("NEWS_CACHE_PATH") or None,
+    )
 
 class NewsCuratorCrew:
-    def __init__(self):
+    """
+    Builds the agents, tasks and crews once; `kickoff` reuses them for every query.
+
+    A query runs in two stages: the profiling crew extracts topic + summary style, then the
+    curation crew gathers and summarizes. Summaries are cached on the normalized profile plus
+    a hash of the matching articles, so a repeat query skips the curation crew entirely.
+    With `fast_path` on, queries the rule-based intent extractor understands skip both the
+    profiling and gathering agents: articles come straight from the store and only the
+    summarizer is called. `last_path` records which route the latest query took.
+    With `stream` on, the summarizer streams its tokens; use `kickoff_stream` to consume them.
+    Articles reach the summarizer as excerpts of at most `max_tokens_per_article` tokens
+    (NEWS_ARTICLE_TOKEN_BUDGET).
+    With `incremental` on (NEWS_INCREMENTAL_DIGEST, default on unless streaming), the fast path and `summarize`
+    summarize each article separately, cache those summaries by content hash in `article_cache`
+    and assemble the digest from them, so a repeat digest only pays for new articles.
+    Per-stage setup timings are kept in `setup_timings`, and the latest run's in `last_run_timings`.
+    Each kickoff is also traced (tasks, agents, LLM calls, tool calls, tokens, cache hits); the
+    latest trace is `last_trace`, and traces are exported as JSON lines when NEWS_TRACE_PATH is set.
+    `verbose` (default: NEWS_VERBOSE, on) controls crewai's console logging, and `llm` overrides
+    the model for every agent.
+    `profiles` (default: the compiled store at NEWS_PROFILE_STORE) holds known users' interests:
+    `kickoff(..., user_id=...)` for a user in it never calls the profiling agent, filling in the
+    topics and summary style the query leaves out from the stored profile, and puts articles
+    from the user's preferred sources first.
+    Each stage's inputs and output are checkpointed under a run ID in `checkpoints` (default:
+    NEWS_CHECKPOINT_DIR when NEWS_CHECKPOINTS=1); `kickoff(run_id=...)` resumes a failed run from
+    its first unfinished stage and `replay` re-runs chosen stages of a recorded run from their
+    recorded inputs.
+    """
+
+    def __init__(self, cache: ResponseCache = None, fast_path: bool = None, stream: bool = False,
+                 max_tokens_per_article: int = ARTICLE_TOKEN_BUDGET, verbose: bool = None, llm=None,
+                 incremental: bool = None, article_cache: ResponseCache = None, profiles: ProfileStore = None,
+                 checkpoints: CheckpointStore = None):
+        timer = StageTimer()
+        self.checkpoints = checkpoints if checkpoints is not None else default_checkpoint_store()
+        self.last_run_id = None
+        self.profiles = profiles if profiles is not None else get_profile_store()
+        self.verbose = verbose_enabled() if verbose is None else verbose
+        self.trace_exporter = default_exporter()
+        self.last_trace = None
+        self.max_tokens_per_article = max_tokens_per_article
+        self.cache = cache if cache is not None else default_response_cache()
+        if fast_path is None:
+            fast_path = os.environ.get("NEWS_FAST_PATH", "1") != "0"
+        self.fast_path = fast_path
+        if incremental is None:
+            # Streamed summaries are read as they're written, so they stay one prose answer
+            incremental = os.environ.get("NEWS_INCREMENTAL_DIGEST", "1") != "0" and not stream
+        self.digest_builder = DigestBuilder(self._summarize_each, article_cache) if incremental else None
+        self.last_cache_hit = False
+        self.last_path = None
+
         # --- Define the LLM (Large Language Model) ---
-        self.news_curator_llm = ChatOpenAI(model_name="gpt-4o-mini")
+        # Each agent routes among the model tiers by its own SLO and token budget.
+        # `llm` replaces every tier, e.g. with a local stand-in for offline benchmarks
+        router = get_router()
+        self.profiler_llm = router.llm(ROUTES["profiler"], get_llm, llm)
+        self.news_curator_llm = router.llm(ROUTES["gatherer"], get_llm, llm)
+        self.summarizer_llm = router.llm(ROUTES["summarizer"], lambda model, max_tokens: get_llm(model, stream, max_tokens), llm)
+        timer.lap("llm")
+
+        # The shared tool unless this crew uses a different excerpt budget
+        self.news_tool = get_news_api_tool()
+        if max_tokens_per_article != self.news_tool.max_tokens_per_article:
+            self.news_tool = NewsAPITool(result_as_answer=True, max_tokens_per_article=max_tokens_per_article)
 
         # --- 1. Define Agents ---
 
@@ -78,9 +250,9 @@ class NewsCuratorCrew:
                 "You are an attentive AI assistant specializing in understanding user preferences. "
                 "Your primary goal is to extract clear, actionable news interests from user input to ensure relevant content delivery."
             ),
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
-            llm=self.news_curator_llm
+            llm=self.profiler_llm
         )
 
         # Agent 2: News Gatherer
@@ -91,10 +263,10 @@ class NewsCuratorCrew:
                 "You are a diligent news librarian, skilled at querying news databases and APIs. "
                 "Your mission is to find the most pertinent articles that match the specified topics, ensuring a rich data source for summarization."
             ),
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
             llm=self.news_curator_llm,
-            tools=[news_api_tool] # Provide the news API tool to this agent
+            tools=[self.news_tool] # Provide the news API tool to this agent
         )
 
         # Agent 3: Summarizer/Synthesizer
@@ -105,11 +277,13 @@ class NewsCuratorCrew:
                 "You are an expert journalist, capable of distilling complex information into easily digestible summaries. "
                 "You prioritize clarity, conciseness, and accuracy, adapting your output style based on the user's specific needs (e.g., economic impact, key takeaways)."
             ),
-            verbose=True,
+            verbose=self.verbose,
             allow_delegation=False,
-            llm=self.news_curator_llm
+            llm=self.summarizer_llm
         )
 
+        timer.lap("agents")
+
         # --- 2. Define Tasks ---
 
         # Task 1: Profile User Interests
@@ -117,39 +291,41 @@ class NewsCuratorCrew:
             description=(
                 "Analyze the user's input: '{user_input}'. "
                 "Identify the primary news topics, any mentioned preferred sources (if any), and desired summary style (e.g., 'brief', 'detailed', 'economic impact only'). "
+                "If the user mentions several topics, list all of them in 'topic' separated by ' and ' (e.g., 'technology and finance'). "
                 "Output a clear, structured summary of the user's interest for the news gathering agent. "
-                "Example output: {{'topic': 'Technology', 'summary_style': 'brief'}}"
+                "Example output: {{\"topic\": \"Technology\", \"summary_style\": \"brief\"}}"
             ),
             expected_output=(
-                "A JSON string containing the extracted 'topic' (str) and 'summary_style' (str, default to 'general'). "
-                "Example: {{'topic': 'AI development', 'summary_style': 'brief'}}"
+                "A JSON object with the extracted 'topic' (str) and 'summary_style' (str, default to 'general'). "
+                "Example: {{\"topic\": \"AI development\", \"summary_style\": \"brief\"}}"
             ),
             agent=self.interest_profiler,
+            output_pydantic=InterestProfile, # Validated into a typed profile, no re-parsing of free text
             human_input=False
         )
 
         # Task 2: Gather News Articles
+        # Topic and summary style are passed in as inputs once profiling is done, so these
+        # tasks can run (or be skipped on a cache hit) independently of the profiling crew.
         self.gather_news_task = Task(
             description=(
-                "Using the identified 'topic' from the previous task's context, utilize the 'News API Tool' to fetch relevant news articles. "
-                "Parse the JSON output from the tool and extract the 'articles' list. "
-                "Pass the list of article dictionaries to the next task for summarization."
-                "The tool requires a 'topic' parameter. For example: `news_api_tool.run(topic='AI')`"
+                "The user is interested in: '{topic}'. Utilize the 'News API Tool' once to fetch relevant news articles for this topic. "
+                "The tool requires a 'topic' parameter. For example: `news_api_tool.run(topic='AI')`. "
+                "If the user is interested in several topics, pass them all in a single call (e.g., topic='technology and finance'); "
+                "the tool fetches them concurrently and merges the results. Its output is passed to the next task as is."
             ),
             expected_output=(
-                "A list of dictionaries, where each dictionary represents a news article with 'title', 'content', and 'source' keys. "
-                "Example: `[{'title': 'Article 1', 'content': '...', 'source': '...'}]`"
+                "The tool's JSON output: a 'status' and an 'articles' list, where each article has 'title', 'source' and 'excerpt' keys."
             ),
             agent=self.news_gatherer,
-            tools=[news_api_tool], # Explicitly pass the tool to the task
-            context=[self.profile_interests_task] # This passes the output of the profiling task
+            tools=[self.news_tool] # Explicitly pass the tool to the task
         )
 
         # Task 3: Summarize News
         self.summarize_news_task = Task(
             description=(
                 "Given the list of news articles from the previous task's context, read through them. "
-                "Based on the original 'summary_style' identified in the first task (available in context), "
+                "The user asked for this summary style: '{summary_style}'. "
                 "generate a concise and informative summary of the key takeaways from ALL provided articles. "
                 "If a specific summary style was requested (e.g., 'economic impact'), focus on that aspect. "
                 "Ensure the summary is easy to read and no longer than 3-5 sentences."
@@ -159,20 +335,222 @@ class NewsCuratorCrew:
                 "not exceeding 5 sentences. If no articles were found, state that clearly."
             ),
             agent=self.summarizer,
-            context=[self.gather_news_task, self.profile_interests_task] # Pass both contexts: articles AND original preferences
+            context=[self.gather_news_task] # Articles come from the gathering task; preferences come from the inputs
+        )
+
+        # Task 3b: Summarize pre-fetched articles (fast path, no profiling/gathering agents)
+        self.summarize_articles_task = Task(
+            description=(
+                "The user is interested in: '{topic}'. Here are the news article excerpts as JSON: {articles}. "
+                "The user asked for this summary style: '{summary_style}'. "
+                "Generate a concise and informative summary of the key takeaways from ALL provided articles. "
+                "If a specific summary style was requested (e.g., 'economic impact'), focus on that aspect. "
+                "Ensure the summary is easy to read and no longer than 3-5 sentences."
+            ),
+            expected_output=(
+                "A concise, well-written summary of the news articles, tailored to the requested summary style, "
+                "not exceeding 5 sentences."
+            ),
+            agent=self.summarizer
         )
 
-    def setup_crew(self) -> Crew:
-        return Crew(
-            agents=[self.interest_profiler, self.news_gatherer, self.summarizer],
-            tasks=[self.profile_interests_task, self.gather_news_task, self.summarize_news_task],
+        # Task 3c: Summarize each new article on its own (incremental digests)
+        self.summarize_each_task = Task(
+            description=(
+                "The user is interested in: '{topic}'. Summarize each of these news article excerpts separately, "
+                "in one or two sentences, in this summary style: '{summary_style}'. "
+                "The articles as JSON, each with an 'id': {articles}."
+            ),
+            expected_output=(
+                "A JSON object with a 'summaries' list holding one {{\"id\": <article id>, \"summary\": \"...\"}} "
+                "entry per article."
+            ),
+            agent=self.summarizer,
+            output_pydantic=ArticleSummaries
+        )
+
+        timer.lap("tasks")
+
+        self.profile_crew, self.curation_crew, self.summary_crew, self.article_crew = self.setup_crews()
+        timer.lap("crews")
+        self.setup_timings = timer
+        self.last_run_timings = StageTimer()
+        self._kickoff_lock = threading.RLock()
+
+    def setup_crews(self) -> tuple:
+        profile_crew = Crew(
+            agents=[self.interest_profiler],
+            tasks=[self.profile_interests_task],
+            process=Process.sequential,
+            verbose=self.verbose # See detailed execution logs
+        )
+        curation_crew = Crew(
+            agents=[self.news_gatherer, self.summarizer],
+            tasks=[self.gather_news_task, self.summarize_news_task],
             process=Process.sequential, # Tasks run in sequence
-            verbose=True # See detailed execution logs
+            verbose=self.verbose
         )
+        summary_crew = Crew(
+            agents=[self.summarizer],
+            tasks=[self.summarize_articles_task],
+            process=Process.sequential,
+            verbose=self.verbose
+        )
+        article_crew = Crew(
+            agents=[self.summarizer],
+            tasks=[self.summarize_each_task],
+            process=Process.sequential,
+            verbose=self.verbose
+        )
+        return profile_crew, curation_crew, summary_crew, article_crew
 
-    def kickoff(self, user_input: str) -> str:
-        crew = self.setup_crew()
-        # The user_input is passed to the first task using the 'inputs' dictionary
-        result = crew.kickoff(inputs={'user_input': user_input})
+    def kickoff(self, user_input: str = None, user_id: str = None, run_id: str = None) -> str:
+        """
+        Curate news for `user_input`. Passing the `run_id` of an earlier run (see `last_run_id`)
+        resumes it: its recorded stages are reused and only the rest are run.
+        """
+        # A Crew holds per-run task state, so concurrent callers take turns on the warm crews.
+        with self._kickoff_lock, trace_run("news.kickoff", exporter=self.trace_exporter) as trace:
+            self.last_trace = trace
+            if not user_input and not run_id:
+                raise ValueError("No user input given to kickoff().")
+            inputs = {"user_input": user_input, "user_id": user_id}
+            if self.checkpoints is None:
+                if not user_input:
+                    raise ValueError(f"No recorded run {run_id} to resume (checkpoints are off).")
+                run = untracked_run("news", inputs)
+            else:
+                # Without new input the run must already be recorded; an unknown ID raises before anything is written
+                run = self.checkpoints.start("news", inputs, run_id, resume_only=not user_input)
+            self.last_run_id = run.run_id
+            trace.set(run_id=run.run_id)
+            result = self._run(run, trace)
+            run.finish(result)
         return result
 
+    def replay(self, run_id: str, stages: list = None) -> dict:
+        """
+        Re-run `stages` of a recorded run (default: all of them) from their recorded inputs, reading
+        the other stages back from the checkpoint, and report per stage whether the output matched.
+        Response and article summary caches are bypassed so the re-run stages really call the LLM.
+        """
+        if self.checkpoints is None:
+            raise RuntimeError("Checkpoints are off; set NEWS_CHECKPOINTS=1 to record runs for replay.")
+        run = self.checkpoints.replay(run_id, stages)
+        with self._kickoff_lock, trace_run("news.replay", exporter=self.trace_exporter, run_id=run_id) as trace:
+            self.last_trace = trace
+            self._run(run, trace, fresh=True)
+        return run.report()
+
+    def _run(self, run: RunCheckpoint, trace, fresh: bool = False) -> str:
+        """The kickoff stages (profile, fetch, summarize or curate), each checkpointed in `run`."""
+        user_input, user_id = run.inputs["user_input"], run.inputs["user_id"]
+        timer = StageTimer()
+        with timed_stage(timer, "intent"):
+            intent = extract_intent(user_input) if self.fast_path else None
+            known = self.profiles.get(user_id) if self.profiles is not None and user_id else None
+            profile = personalize(intent, known)
+        self.last_path = "fast" if intent is not None else "profile" if profile is not None else "agents"
+        trace.set(path=self.last_path, known_user=known is not None)
+        if profile is None:
+            emit_stage("Profiling your interests...")
+            with timed_stage(timer, "profile"):
+                profile = run.stage("profile", {"user_input": user_input}, lambda: self._profile(user_input))
+        trace.set(topic=profile["topic"], summary_style=profile["summary_style"])
+
+        with timed_stage(timer, "cache_lookup"):
+            sources = known["sources"] if known is not None else []
+            articles = run.stage("fetch", {"topic": profile["topic"], "sources": sources},
+                                 lambda: prefer_sources(fetch_topics(split_topics(profile["topic"])), sources))
+            cache_key = make_cache_key(profile["topic"], profile["summary_style"], articles)
+            cached = None if fresh else self.cache.get(cache_key)
+
+        self.last_cache_hit = cached is not None
+        trace.set(cache_hit=self.last_cache_hit, articles=len(articles))
+        if cached is not None:
+            emit_stage(f"Found a cached summary for '{profile['topic']}'.")
+            self.last_run_timings = timer
+            return cached
+
+        if self.last_path in ("fast", "profile"):
+            if not articles:
+                self.last_run_timings = timer
+                return f"No specific news found for '{profile['topic']}'."
+            emit_stage(f"Summarizing {len(articles)} articles on '{profile['topic']}'...")
+            with timed_stage(timer, "summarize"):
+                result = run.stage("summarize", {"topic": profile["topic"], "summary_style": profile["summary_style"], "articles": articles},
+                                   lambda: self._summarize(profile["topic"], profile["summary_style"], articles, fresh=fresh))
+        else:
+            emit_stage(f"Gathering and summarizing news on '{profile['topic']}'...")
+            with timed_stage(timer, "curate"):
+                result = run.stage("curate", profile, lambda: self._curate(profile))
+        if not fresh:
+            self.cache.set(cache_key, result)
+        self.last_run_timings = timer
+        return result
+
+    def _profile(self, user_input: str) -> dict:
+        def attempt():
+            # The user_input is passed to the first task using the 'inputs' dictionary
+            profile_output = self.profile_crew.kickoff(inputs={'user_input': user_input})
+            record_usage(profile_output)
+            return profile_output
+
+        # An answer that isn't a valid profile is retried on a stronger model; the last one is parsed leniently
+        return self.profiler_llm.run(attempt, strict_profile_from_output, fallback=profile_from_output)
+
+    def _curate(self, profile: dict) -> str:
+        output = self.curation_crew.kickoff(inputs=profile)
+        record_usage(output)
+        return str(output)
+
+    def kickoff_stream(self, user_input: str = None, user_id: str = None, run_id: str = None):
+        """Like `kickoff`, but yields ('stage' | 'token' | 'result' | 'error', text) events as they arrive."""
+        return stream_kickoff(lambda: self.kickoff(user_input, user_id, run_id))
+
+    def summarize(self, topic: str, summary_style: str, articles: list) -> str:
+        """
+        Summarize an already-fetched article set with the summarizer agent alone,
+        going through the same response cache as `kickoff`.
+        """
+        if not articles:
+            return f"No specific news found for '{topic}'."
+        with trace_run("news.summarize", exporter=self.trace_exporter, topic=topic, summary_style=summary_style) as trace:
+            cache_key = make_cache_key(topic, summary_style, articles)
+            cached = self.cache.get(cache_key)
+            trace.set(cache_hit=cached is not None, articles=len(articles))
+            if cached is not None:
+                return cached
+            with self._kickoff_lock:
+                result = self._summarize(topic, summary_style, articles)
+            self.cache.set(cache_key, result)
+        return result
+
+    def _summarize(self, topic: str, summary_style: str, articles: list, fresh: bool = False) -> str:
+        if self.digest_builder is not None:
+            # `fresh` summarizes every article again instead of reading the shared article cache
+            builder = DigestBuilder(self._summarize_each, ResponseCache(max_entries=len(articles))) if fresh else self.digest_builder
+            digest, stats = builder.build(topic, summary_style, articles)
+            trace = current_trace()
+            if trace is not None:
+                trace.set(cached_articles=stats["cached"], summarized_articles=stats["summarized"])
+            return digest
+        excerpts = to_excerpts(articles, self.max_tokens_per_article)
+        inputs = {"topic": topic, "summary_style": summary_style, "articles": json.dumps(excerpts)}
+        output = self.summary_crew.kickoff(inputs=inputs)
+        record_usage(output)
+        return str(output)
+
+    def _summarize_each(self, topic: str, summary_style: str, articles: list) -> list:
+        """One summary per article, from a single summarizer call over all of them."""
+        excerpts = [dict(e, id=i) for i, e in enumerate(to_excerpts(articles, self.max_tokens_per_article))]
+        inputs = {"topic": topic, "summary_style": summary_style, "articles": json.dumps(excerpts)}
+
+        def attempt():
+            output = self.article_crew.kickoff(inputs=inputs)
+            record_usage(output)
+            return output
+
+        # Missing or malformed summaries are retried on a stronger model; the last answer is kept as far as it goes
+        return self.summarizer_llm.run(attempt, lambda output: article_summaries_from_output(output, len(articles), strict=True),
+                                       fallback=lambda output: article_summaries_from_output(output, len(articles)))
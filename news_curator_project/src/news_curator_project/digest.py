@@ -0,0 +1,73 @@
+import hashlib
+import os
+from typing import Callable, List, Optional, Tuple
+
+from news_curator_project.cache import ResponseCache, normalize_style
+from news_curator_project.models import excerpt
+
+# --- Incremental digests ---
+# A returning user's digest usually differs from the last one by a few new articles. Each
+# article is summarized on its own and cached by a hash of its content (plus the summary
+# style), so a digest only sends the articles that have no cached summary to the LLM, and
+# the digest itself is assembled from the per-article summaries without another LLM call.
+
+
+def article_hash(article: dict) -> str:
+    """Content hash of an article: the same story re-fetched or re-ranked gets the same key."""
+    text = f"{article.get('title') or ''}\n{article.get('content') or ''}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def article_summary_key(article: dict, summary_style: str) -> str:
+    return f"article|{normalize_style(summary_style)}|{article_hash(article)}"
+
+
+def default_article_cache() -> ResponseCache:
+    """
+    Per-article summary cache configured from NEWS_ARTICLE_CACHE_SIZE (default 4096 entries),
+    NEWS_ARTICLE_CACHE_TTL (seconds, default 7 days) and NEWS_ARTICLE_CACHE_PATH (optional SQLite file).
+    """
+    return ResponseCache(
+        max_entries=int(os.environ.get("NEWS_ARTICLE_CACHE_SIZE", "4096")),
+        ttl_seconds=float(os.environ.get("NEWS_ARTICLE_CACHE_TTL", str(7 * 24 * 3600))),
+        path=os.environ.get("NEWS_ARTICLE_CACHE_PATH") or None,
+    )
+
+
+def merge_digest(articles: List[dict], summaries: List[str]) -> str:
+    """One line per article, in ranking order."""
+    lines = []
+    for article, summary in zip(articles, summaries):
+        source = f" ({article['source']})" if article.get("source") else ""
+        lines.append(f"- {article.get('title', '')}{source}: {summary}")
+    return "\n".join(lines)
+
+
+class DigestBuilder:
+    """
+    Builds digests from cached per-article summaries. `summarize_new(topic, summary_style, articles)`
+    is called once per digest with only the uncached articles and returns one summary per article
+    (an empty string where it has none; those fall back to an excerpt and aren't cached).
+    """
+
+    def __init__(self, summarize_new: Callable[[str, str, List[dict]], List[str]], cache: Optional[ResponseCache] = None):
+        self.summarize_new = summarize_new
+        self.cache = cache if cache is not None else default_article_cache()
+
+    def build(self, topic: str, summary_style: str, articles: List[dict]) -> Tuple[str, dict]:
+        """The digest for `articles` and counts of 'cached' and newly 'summarized' articles."""
+        keys = [article_summary_key(article, summary_style) for article in articles]
+        summaries = [self.cache.get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            fresh = self.summarize_new(topic, summary_style, [articles[i] for i in missing])
+            for i, summary in zip(missing, fresh):
+                summary = (summary or "").strip()
+                if summary:
+                    self.cache.set(keys[i], summary)
+                    summaries[i] = summary
+        for i, summary in enumerate(summaries):
+            if summary is None:
+                summaries[i] = excerpt(articles[i].get("content", ""), 40)
+        stats = {"articles": len(articles), "cached": len(articles) - len(missing), "summarized": len(missing)}
+        return merge_digest(articles, summaries), stats
@@ -0,0 +1,75 @@
+import re
+from typing import Optional
+
+# --- Rule-based intent extraction ---
+# Handles the common "latest tech news" / "finance highlights, brief" style of query locally.
+# Anything it doesn't fully understand is left to the LLM interest profiler.
+
+TOPIC_KEYWORDS = {
+    "technology": {"tech", "technology", "technologies", "ai", "robotics", "robots", "quantum", "computing",
+                   "cybersecurity", "security", "software", "gadgets", "startups"},
+    "finance": {"finance", "financial", "markets", "market", "stocks", "stock", "crypto", "cryptocurrency",
+                "bitcoin", "economy", "economic", "business", "inflation", "rates"},
+    "health": {"health", "healthcare", "medical", "medicine", "vaccine", "vaccines", "cancer", "mental",
+               "wellness", "clinical"},
+}
+
+# Words that just name the category; any other keyword is specific enough to search on directly.
+GENERIC_TOPIC_WORDS = {"tech", "technology", "technologies", "finance", "financial", "health", "healthcare", "medical"}
+
+# Multi-word styles are matched first, then single words.
+STYLE_PHRASES = [
+    ("economic impact", "economic impact"),
+    ("key takeaways", "key takeaways"),
+    ("in depth", "detailed"),
+    ("in-depth", "detailed"),
+    ("tl;dr", "brief"),
+]
+STYLE_WORDS = {
+    "brief": "brief", "short": "brief", "quick": "brief", "tldr": "brief", "concise": "brief",
+    "detailed": "detailed", "deep": "detailed", "thorough": "detailed", "long": "detailed",
+}
+
+# Words that carry no topic or style information.
+FILLER_WORDS = {
+    "a", "an", "the", "and", "or", "of", "on", "in", "for", "about", "to", "me", "my", "i", "i'd", "i'm",
+    "want", "would", "like", "please", "give", "show", "tell", "get", "what", "whats", "what's", "is", "are",
+    "any", "some", "latest", "recent", "today", "todays", "today's", "this", "week", "news", "headlines",
+    "highlights", "summary", "summaries", "summarize", "update", "updates", "stories", "articles", "top",
+    "new", "current", "happening", "can", "you", "with", "focus", "only", "just", "style", "digest",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9'&;-]+")
+
+
+def extract_intent(user_input: str) -> Optional[dict]:
+    """
+    Return {'topic': ..., 'summary_style': ...} when every word of the query is a known
+    topic keyword, style word or filler word; otherwise None (ambiguous, use the LLM).
+    """
+    text = user_input.lower()
+    summary_style = "general"
+    for phrase, style in STYLE_PHRASES:
+        if phrase in text:
+            summary_style = style
+            text = text.replace(phrase, " ")
+            break
+
+    topics = []
+    for word in _WORD_RE.findall(text):
+        word = word.strip("-;'")
+        if not word or word in FILLER_WORDS or word == "&":
+            continue
+        if word in STYLE_WORDS:
+            summary_style = STYLE_WORDS[word]
+            continue
+        category = next((t for t, keywords in TOPIC_KEYWORDS.items() if word in keywords), None)
+        if category is None:
+            return None
+        topic = category if word in GENERIC_TOPIC_WORDS else word
+        if topic not in topics:
+            topics.append(topic)
+
+    if not topics:
+        return None
+    return {"topic": " and ".join(topics), "summary_style": summary_style}
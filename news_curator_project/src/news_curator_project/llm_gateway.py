@@ -0,0 +1,237 @@
+import contextvars
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from crewai import LLM, BaseLLM
+
+# --- Shared LLM gateway ---
+# Every agent's LLM calls go through one process-wide gateway that
+#   * coalesces identical in-flight prompts (single-flight): concurrent callers with the same
+#     model + messages share one provider request and its answer,
+#   * keeps requests and estimated tokens under a global per-minute budget (NEWS_LLM_RPM,
+#     NEWS_LLM_TPM), making callers queue in arrival order instead of all firing at once,
+#   * on a 429, pauses the whole queue for the provider's Retry-After (or an exponential
+#     backoff with jitter) before retrying, so one rate limit doesn't turn into a retry storm.
+# Chat completions have no multi-prompt request, so coalescing is the only batching done here.
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages, expected_completion_tokens: int) -> int:
+    """Rough prompt + completion token count for budgeting (~4 characters per token)."""
+    if isinstance(messages, str):
+        chars = len(messages)
+    else:
+        chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return chars // CHARS_PER_TOKEN + expected_completion_tokens
+
+
+def is_rate_limit(error: Exception) -> bool:
+    return "RateLimit" in type(error).__name__ or getattr(error, "status_code", None) == 429
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """The provider's Retry-After hint in seconds, if the error carries one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute. `acquire` blocks until both budgets allow
+    the call; waiters are served one at a time in roughly arrival order.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._turnstile = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._updated = now
+
+    def acquire(self, tokens: int) -> float:
+        """Wait for budget for one request of `tokens` tokens; return the seconds spent waiting."""
+        tokens = min(tokens, self.tpm)  # a single oversized prompt must still get through eventually
+        started = time.monotonic()
+        with self._turnstile:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._paused_until - now
+                    if wait <= 0:
+                        if self._requests >= 1 and self._tokens >= tokens:
+                            self._requests -= 1
+                            self._tokens -= tokens
+                            return time.monotonic() - started
+                        wait = max((1 - self._requests) * 60 / self.rpm, (tokens - self._tokens) * 60 / self.tpm)
+                time.sleep(max(wait, 0.001))
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds` (after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMGateway:
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200_000,
+                 max_retries: int = 5, base_backoff: float = 1.0, expected_completion_tokens: int = 256):
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.expected_completion_tokens = expected_completion_tokens
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "coalesced": 0, "retries": 0, "rate_limited": 0, "queued_seconds": 0.0}
+
+    def _count(self, key: str, value: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued_seconds"] = round(stats["queued_seconds"], 3)
+        return stats
+
+    def call(self, key: str, messages, send: Callable[[], Any]) -> Any:
+        """Run `send()` under the budget, sharing the result with concurrent calls for the same `key`."""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            self._count("coalesced")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._send(messages, send)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+    def _send(self, messages, send: Callable[[], Any]) -> Any:
+        tokens = estimate_tokens(messages, self.expected_completion_tokens)
+        for attempt in range(self.max_retries + 1):
+            self._count("queued_seconds", self.limiter.acquire(tokens))
+            self._count("requests")
+            try:
+                return send()
+            except Exception as e:
+                if not is_rate_limit(e) or attempt == self.max_retries:
+                    raise
+                self._count("rate_limited")
+                self._count("retries")
+                delay = retry_after(e) or self.base_backoff * 2 ** attempt
+                self.limiter.pause(delay * random.uniform(1.0, 1.25))
+
+
+# Stop words of the StopWordsLLM call running in this context
+_call_stop: contextvars.ContextVar = contextvars.ContextVar("call_stop", default=None)
+
+
+class StopWordsLLM(LLM):
+    """
+    crewai's LLM taking its stop words as a per-call `stop` argument. crewai reads them from the
+    client, and clients are shared by every crew, so setting them there would race.
+    """
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, stop=None, **kwargs):
+        token = _call_stop.set(stop)
+        try:
+            return super().call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions, **kwargs)
+        finally:
+            _call_stop.reset(token)
+
+    def _prepare_completion_params(self, messages, tools=None):
+        params = super()._prepare_completion_params(messages, tools)
+        stop = _call_stop.get()
+        if stop is not None:
+            params["stop"] = list(stop)
+        return params
+
+
+class GatewayLLM(BaseLLM):
+    """
+    A crewai LLM whose calls go through an LLMGateway; everything else is delegated to `llm`, which
+    must accept a per-call `stop` (StopWordsLLM does).
+    """
+
+    def __init__(self, llm, gateway: LLMGateway):
+        super().__init__(model=llm.model)
+        self.llm = llm
+        self.gateway = gateway
+        self.stream = getattr(llm, "stream", False)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, stop=None, **kwargs):
+        stop = list(self.stop if stop is None else stop)
+        key = hashlib.sha256(json.dumps(
+            [self.model, messages, [getattr(tool, "name", str(tool)) for tool in tools or []], stop],
+            sort_keys=True, default=str,
+        ).encode("utf-8")).hexdigest()
+        return self.gateway.call(
+            key, messages, lambda: self.llm.call(messages, tools=tools, callbacks=callbacks,
+                                                 available_functions=available_functions, stop=stop, **kwargs)
+        )
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+
+# --- Process-wide gateway ---
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """Gateway budgeted by NEWS_LLM_RPM (default 500) and NEWS_LLM_TPM (default 200000)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    requests_per_minute=float(os.environ.get("NEWS_LLM_RPM", "500")),
+                    tokens_per_minute=float(os.environ.get("NEWS_LLM_TPM", "200000")),
+                    max_retries=int(os.environ.get("NEWS_LLM_MAX_RETRIES", "5")),
+                )
+    return _gateway
@@ -1,15 +1,67 @@
 import os
-# Import your Crew class from within the project package
-from news_curator_project.crew import NewsCuratorCrew
+import sys
+import argparse
+import threading
+# crewai is slow to import, so the crew module is only imported where a crew is needed
+from news_curator_project.timing import build_in_background, startup_report
+
+# Sample inputs for training/testing the gather + summarize crew
+SAMPLE_INPUTS = {"topic": "technology", "summary_style": "brief"}
+
+def _print_stream(events):
+    """Print stage messages and summarizer tokens as they arrive; return the final result."""
+    streamed_tokens = False
+    for kind, payload in events:
+        if kind == "stage":
+            print(f"\n[{payload}]", flush=True)
+        elif kind == "token":
+            if not streamed_tokens:
+                print("\nNews Curator: ", end="", flush=True)
+                streamed_tokens = True
+            print(payload, end="", flush=True)
+        elif kind == "error":
+            raise RuntimeError(payload)
+        elif kind == "result":
+            if not streamed_tokens:
+                print(f"\nNews Curator: {payload}")
+            else:
+                print()
+            return payload
+
+def _build_crew(**kwargs):
+    from news_curator_project.crew import NewsCuratorCrew
+    return NewsCuratorCrew(**kwargs)
+
+def _option(name: str):
+    """The value after `name` on the command line, if given."""
+    args = sys.argv[1:]
+    return args[args.index(name) + 1] if name in args[:-1] else None
 
 def run():
+    # Pass --stream to print summarizer tokens and progress as they arrive
+    stream = "--stream" in sys.argv[1:]
+    # Pass --stats to print run ids, stage timings, cache, trace, gateway and model-route stats after each query
+    stats = "--stats" in sys.argv[1:]
+    # Pass --user NAME (or set NEWS_USER) to use that user's compiled profile from NEWS_PROFILE_STORE
+    user_id = _option("--user") or os.environ.get("NEWS_USER")
+    # Pass --profile-startup to print where cold-start time goes (imports by module, crew construction) and exit
+    if "--profile-startup" in sys.argv[1:]:
+        print(startup_report("news_curator_project.crew", lambda: _build_crew(stream=stream)))
+        return
+
+    # Import crewai, build the crew and index the corpus in the background while the user types the first query
+    def build():
+        from news_curator_project.tools.news_store import get_article_store
+        get_article_store()
+        return _build_crew(stream=stream)
+
+    crew_future = build_in_background(build)
+    news_curator_app = None
+
     print("--- Personalized News Curator Chatbot ---")
     print("Tell me what news you're interested in (e.g., 'latest tech news', 'finance highlights', 'health news summary').")
     print("Type 'exit' to quit.")
-
-    # Initialize your Crew
-    # Corrected: Directly instantiate NewsCuratorCrew, not NewsCuratorProject()
-    news_curator_app = NewsCuratorCrew()
+    failed_run = None
 
     while True:
         user_query = input("\nYou: ")
@@ -17,19 +69,136 @@ def run():
             print("News Curator: Goodbye! Stay informed!")
             break
 
+        # 'retry' resumes the last failed run from the stage that failed
+        resume = failed_run if user_query.strip().lower() == "retry" else None
+        query = None if resume else user_query
         try:
+            if news_curator_app is None:
+                news_curator_app = crew_future.result()
+                if stats:
+                    print(f"(crew ready: {news_curator_app.setup_timings})")
             # Kick off the crew with the user's query
             print("\n--- Processing your request... ---")
             # Corrected: Call kickoff on the news_curator_app instance
-            result = news_curator_app.kickoff(user_input=user_query)
-            print("\n--- Here is your personalized news summary ---")
-            print(f"News Curator: {result}")
+            if stream:
+                print("\n--- Here is your personalized news summary ---")
+                _print_stream(news_curator_app.kickoff_stream(query, user_id, resume))
+            else:
+                result = news_curator_app.kickoff(user_input=query, user_id=user_id, run_id=resume)
+                print("\n--- Here is your personalized news summary ---")
+                print(f"News Curator: {result}")
+            failed_run = None
+            if stats:
+                print(f"(run: {news_curator_app.last_run_id}; path: {news_curator_app.last_path}; timings: {news_curator_app.last_run_timings}; cache: {news_curator_app.cache.stats()})")
+                from news_curator_project.llm_gateway import get_gateway
+                from news_curator_project.routing import get_router
+                print(f"(trace: {news_curator_app.last_trace}; llm gateway: {get_gateway().stats()})")
+                print(f"(model routes: {get_router().stats()})")
         except Exception as e:
             print(f"\nNews Curator Error: An error occurred during news curation. {e}")
+            failed_run = news_curator_app.last_run_id if news_curator_app is not None else None
+            if failed_run:
+                print(f"(run {failed_run} is checkpointed; type 'retry' to resume it from the failed stage)")
             # For detailed debugging during development, you might uncomment:
             # import traceback
             # traceback.print_exc()
 
+def batch():
+    """
+    Curate digests for a whole file of user profiles in one run.
+    Usage: batch_digest <profiles.jsonl|profiles.txt> <digests.jsonl> [--workers N] [--checkpoint PATH]
+    """
+    parser = argparse.ArgumentParser(prog="batch_digest", description="Batch news digests for many user profiles.")
+    parser.add_argument("profiles", help="JSONL file of {user_id, topics, summary_style} or a text preference file")
+    parser.add_argument("output", help="JSONL file to append per-user digests to")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent summarization workers (default: 4)")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <output>.checkpoint)")
+    args = parser.parse_args(sys.argv[1:])
+
+    from news_curator_project.batch import BatchDigestRunner
+    from news_curator_project.crew import NewsCuratorCrew, default_response_cache
+    from news_curator_project.digest import default_article_cache
+
+    # One warm crew per worker thread, all sharing the same response and article summary caches
+    cache = default_response_cache()
+    article_cache = default_article_cache()
+    local = threading.local()
+
+    def summarize(topic, summary_style, articles):
+        if not hasattr(local, "crew"):
+            local.crew = NewsCuratorCrew(cache=cache, article_cache=article_cache)
+        return local.crew.summarize(topic, summary_style, articles)
+
+    runner = BatchDigestRunner(summarize, workers=args.workers, checkpoint_path=args.checkpoint or f"{args.output}.checkpoint")
+    stats = runner.run(args.profiles, args.output)
+    print(f"Batch complete: {stats}")
+
+def compile_profiles():
+    """
+    Compile preference files into the binary profile store read through NEWS_PROFILE_STORE.
+    Usage: compile_profiles <preferences.txt|profiles.jsonl>... [--output PATH]
+    """
+    parser = argparse.ArgumentParser(prog="compile_profiles", description="Compile user preference files into a profile store.")
+    parser.add_argument("inputs", nargs="+", help="Text preference files (like knowledge/user_preference.txt) or profiles JSONL")
+    parser.add_argument("--output", default=os.environ.get("NEWS_PROFILE_STORE") or "profiles.bin",
+                        help="Store to write (default: NEWS_PROFILE_STORE or profiles.bin)")
+    args = parser.parse_args(sys.argv[1:])
+
+    from news_curator_project.profiles import compile_profiles as compile_store
+    stats = compile_store(args.inputs, args.output)
+    print(f"Compiled {stats['users']:,} profiles into {args.output} ({stats['bytes']:,} bytes)")
+
+def train():
+    """
+    Train the gather + summarize crew for a given number of iterations.
+    """
+    try:
+        _build_crew().curation_crew.train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=SAMPLE_INPUTS)
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+def replay():
+    """
+    Re-run stages of a checkpointed run from their recorded inputs and compare the outputs.
+    Usage: replay [<run_id>] [--stages profile,fetch,summarize,curate] [--resume]
+    Without a run ID, lists the recorded runs. With --resume, finishes a failed run instead:
+    recorded stages are reused and only the remaining ones run.
+    """
+    parser = argparse.ArgumentParser(prog="replay", description="Replay or resume a checkpointed news run.")
+    parser.add_argument("run_id", nargs="?", help="Run ID (printed with each kickoff's trace; default: list runs)")
+    parser.add_argument("--stages", default=None, help="Comma-separated stages to re-run (default: every recorded stage)")
+    parser.add_argument("--resume", action="store_true", help="Resume the run from its first unfinished stage")
+    args = parser.parse_args(sys.argv[1:])
+
+    from news_curator_project.checkpoints import default_checkpoint_store
+    store = default_checkpoint_store()
+    if store is None:
+        raise SystemExit("Checkpoints are off; set NEWS_CHECKPOINTS=1 to record runs for replay.")
+    if not args.run_id:
+        for run_id in store.runs():
+            record = store.load(run_id) or {}
+            print(f"{run_id}  {record.get('status')}  stages: {', '.join(record.get('stages', {}))}  {record.get('inputs')}")
+        return
+    crew = _build_crew(checkpoints=store)
+    if args.resume:
+        print(f"News Curator: {crew.kickoff(run_id=args.run_id)}")
+        return
+    report = crew.replay(args.run_id, args.stages.split(",") if args.stages else None)
+    for stage, result in report.items():
+        status = "same output" if result["matches"] else "CHANGED"
+        print(f"{stage}: {status}; recorded {result['recorded_seconds']}s, replayed {result['replayed_seconds']}s")
+    if not all(result["matches"] for result in report.values()):
+        sys.exit(1)
+
+def test():
+    """
+    Test the gather + summarize crew execution and return the results.
+    """
+    try:
+        _build_crew().curation_crew.test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=SAMPLE_INPUTS)
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
 if __name__ == "__main__":
     # Set your OpenAI API key as an environment variable before running.
     # For example, create a .env file in your project root with:
@@ -0,0 +1,55 @@
+import os
+from typing import List
+
+from pydantic import BaseModel, Field
+
+# --- Typed hand-offs between tasks ---
+
+# Rough budget per article passed to the summarizer (~4 characters per token).
+ARTICLE_TOKEN_BUDGET = int(os.environ.get("NEWS_ARTICLE_TOKEN_BUDGET", "80"))
+CHARS_PER_TOKEN = 4
+
+
+class InterestProfile(BaseModel):
+    """What the interest profiler extracts from a user's query."""
+    topic: str = Field(..., description="Topic(s) to fetch news for; several topics joined with ' and '.")
+    summary_style: str = Field("general", description="Requested summary style, e.g. 'brief' or 'economic impact'.")
+
+
+class ArticleExcerpt(BaseModel):
+    """A truncated article: enough for the summarizer, without the full body."""
+    title: str
+    source: str = ""
+    published_at: str = ""
+    excerpt: str = ""
+
+
+class ArticleSummary(BaseModel):
+    id: int = Field(..., description="The 'id' of the article being summarized.")
+    summary: str = Field(..., description="One or two sentences on this article alone.")
+
+
+class ArticleSummaries(BaseModel):
+    """Per-article summaries, cached individually so a repeat digest only summarizes new articles."""
+    summaries: List[ArticleSummary]
+
+
+def excerpt(text: str, max_tokens: int = ARTICLE_TOKEN_BUDGET) -> str:
+    """Cut `text` to about `max_tokens` tokens, on a word boundary."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def to_excerpts(articles: List[dict], max_tokens: int = ARTICLE_TOKEN_BUDGET) -> List[dict]:
+    """Compact article dicts (title, source, truncated content) for LLM prompts."""
+    return [
+        ArticleExcerpt(
+            title=article.get("title", ""),
+            source=article.get("source", ""),
+            published_at=str(article.get("published_at") or ""),
+            excerpt=excerpt(article.get("content", ""), max_tokens),
+        ).model_dump()
+        for article in articles
+    ]
@@ -0,0 +1,304 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from news_curator_project.tools.news_store import split_topics
+
+# --- Preference files ---
+
+_NAME_RE = re.compile(r"^User name is (?P<value>.+?)\.?$", re.IGNORECASE)
+_INTEREST_RE = re.compile(r"^User is (?P<very>very |most |especially )?interested in (?P<value>.+?)\.?$", re.IGNORECASE)
+_STYLE_RE = re.compile(r"^User prefers (?P<value>.+?) summar(?:y|ies)\.?$", re.IGNORECASE)
+_SOURCE_RE = re.compile(r"^User prefers news from (?P<value>.+?)\.?$", re.IGNORECASE)
+
+
+def _new_profile() -> dict:
+    return {"user_id": None, "topics": [], "weights": {}, "sources": [], "summary_style": "general"}
+
+
+def _add_topics(profile: dict, topics: Iterable[str], weight: float) -> None:
+    for topic in topics:
+        if topic not in profile["weights"]:
+            profile["topics"].append(topic)
+        profile["weights"][topic] = profile["weights"].get(topic, 0.0) + weight
+
+
+def _parse_text_profiles(f) -> Iterator[dict]:
+    """
+    Blank-line separated blocks of sentences in the style of knowledge/user_preference.txt.
+    Each "User is interested in ..." adds 1 to its topics' weights ("very interested" adds 2);
+    "User prefers news from ..." lists preferred sources. Other sentences are ignored.
+    """
+    block: List[str] = []
+    index = 0
+    for line in list(f) + [""]:
+        line = line.strip()
+        if line:
+            block.append(line)
+            continue
+        if not block:
+            continue
+        profile = _new_profile()
+        for sentence in block:
+            match = _NAME_RE.match(sentence)
+            if match:
+                profile["user_id"] = match.group("value")
+            elif _INTEREST_RE.match(sentence):
+                match = _INTEREST_RE.match(sentence)
+                _add_topics(profile, split_topics(match.group("value")), 2.0 if match.group("very") else 1.0)
+            elif _SOURCE_RE.match(sentence):
+                profile["sources"].extend(split_topics(_SOURCE_RE.match(sentence).group("value")))
+            elif _STYLE_RE.match(sentence):
+                profile["summary_style"] = _STYLE_RE.match(sentence).group("value")
+        profile["user_id"] = profile["user_id"] or f"user-{index}"
+        index += 1
+        block = []
+        yield profile
+
+
+def load_profiles(path: str) -> Iterator[dict]:
+    """
+    Yield {'user_id', 'topics', 'weights', 'sources', 'summary_style'} records from a .jsonl file
+    (one object per line; 'topics' as a list, a combined string or a {topic: weight} object),
+    a compiled profile store (.bin) or a plain-text preference file.
+    """
+    if path.endswith(".bin"):
+        with ProfileStore(path) as store:
+            yield from store
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            index = 0
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                profile = _new_profile()
+                topics = record.get("topics") or record.get("topic") or []
+                if isinstance(topics, dict):
+                    for topic, weight in topics.items():
+                        _add_topics(profile, [topic], float(weight))
+                else:
+                    _add_topics(profile, split_topics(topics) if isinstance(topics, str) else topics, 1.0)
+                sources = record.get("sources") or []
+                # Records without an id get one by position, as in text preference files
+                user_id = str(record.get("user_id") or record.get("name") or "").strip()
+                profile.update(
+                    user_id=user_id or f"user-{index}",
+                    sources=split_topics(sources) if isinstance(sources, str) else list(sources),
+                    summary_style=record.get("summary_style") or "general",
+                )
+                index += 1
+                yield profile
+        else:
+            yield from _parse_text_profiles(f)
+
+
+# --- Compiled profile store ---
+# One file, memory-mapped read-only, so every worker process shares the same pages:
+#   header | hash table | string offsets | string bytes | records
+# The hash table is open-addressed (linear probing, at most half full) and maps the hash of a
+# normalized user id to its record, so a lookup touches one or two buckets and one record.
+# Topics, sources, styles and user ids are interned in the string table; a record holds their
+# ids plus one float32 weight per topic, topics sorted by weight.
+
+MAGIC = b"NPRF"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQQQQQQQ")  # magic, version, users, buckets, strings, 4 section offsets
+_BUCKET = struct.Struct("<QQ")  # user hash, record offset + 1 (0 = empty)
+_OFFSET = struct.Struct("<Q")
+_RECORD = struct.Struct("<IIHH")  # user id, style, topic count, source count
+_TOPIC = struct.Struct("<If")  # topic, weight
+_SOURCE = struct.Struct("<I")
+
+
+def user_key(user_id: str) -> str:
+    return " ".join((user_id or "").split()).casefold()
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def compile_profiles(paths: Iterable[str], output_path: str) -> dict:
+    """
+    Compile preference files into a profile store at `output_path`. A user defined in several
+    inputs keeps the last definition. The file is written next to the target and moved into
+    place, so processes reading the old store keep a consistent mapping until they reopen.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    profiles: Dict[str, bytes] = {}
+    for path in paths:
+        for profile in load_profiles(path):
+            weights = profile.get("weights") or {topic: 1.0 for topic in profile["topics"]}
+            top = max(weights.values(), default=1.0) or 1.0
+            topics = sorted(weights.items(), key=lambda item: -item[1])
+            sources = profile.get("sources") or []
+            record = bytearray(_RECORD.pack(intern(profile["user_id"]), intern(profile["summary_style"] or "general"),
+                                            len(topics), len(sources)))
+            for topic, weight in topics:
+                record += _TOPIC.pack(intern(topic), weight / top)
+            for source in sources:
+                record += _SOURCE.pack(intern(source))
+            profiles[user_key(profile["user_id"])] = bytes(record)
+
+    buckets = 1
+    while buckets < 2 * len(profiles):
+        buckets *= 2
+    table = bytearray(_BUCKET.size * buckets)
+    taken = bytearray(buckets)
+    records = bytearray()
+    for key, record in profiles.items():
+        h = _hash(key)
+        slot = h & (buckets - 1)
+        while taken[slot]:
+            slot = (slot + 1) & (buckets - 1)
+        taken[slot] = 1
+        _BUCKET.pack_into(table, slot * _BUCKET.size, h, len(records) + 1)
+        records += record
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = bytearray()
+    position = 0
+    for value in encoded:
+        offsets += _OFFSET.pack(position)
+        position += len(value)
+    offsets += _OFFSET.pack(position)
+
+    table_at = _HEADER.size
+    offsets_at = table_at + len(table)
+    strings_at = offsets_at + len(offsets)
+    records_at = strings_at + position
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(profiles), buckets, len(encoded),
+                             table_at, offsets_at, strings_at, records_at))
+        f.write(table)
+        f.write(offsets)
+        for value in encoded:
+            f.write(value)
+        f.write(records)
+    os.replace(tmp_path, output_path)
+    return {"users": len(profiles), "strings": len(encoded), "bytes": records_at + len(records)}
+
+
+class ProfileStore:
+    """Read-only view of a compiled profile store; `get(user_id)` is one hash probe, no parsing of the file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._users, self._buckets, self._strings,
+         self._table_at, self._offsets_at, self._strings_at, self._records_at) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} profile store.")
+
+    def __len__(self) -> int:
+        return self._users
+
+    def __enter__(self) -> "ProfileStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _string(self, index: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._map, self._offsets_at + index * _OFFSET.size)
+        return self._map[self._strings_at + start:self._strings_at + end].decode("utf-8")
+
+    def _record(self, offset: int) -> dict:
+        position = self._records_at + offset
+        user, style, n_topics, n_sources = _RECORD.unpack_from(self._map, position)
+        position += _RECORD.size
+        topics, weights = [], {}
+        for _ in range(n_topics):
+            topic, weight = _TOPIC.unpack_from(self._map, position)
+            position += _TOPIC.size
+            topics.append(self._string(topic))
+            weights[topics[-1]] = round(weight, 4)
+        sources = [self._string(_SOURCE.unpack_from(self._map, position + i * _SOURCE.size)[0]) for i in range(n_sources)]
+        return {"user_id": self._string(user), "topics": topics, "weights": weights, "sources": sources,
+                "summary_style": self._string(style)}
+
+    def get(self, user_id: str) -> Optional[dict]:
+        """The user's profile, or None if they aren't in the store."""
+        if not self._users or not user_id:
+            return None
+        key = user_key(user_id)
+        h = _hash(key)
+        slot = h & (self._buckets - 1)
+        while True:
+            stored_hash, offset = _BUCKET.unpack_from(self._map, self._table_at + slot * _BUCKET.size)
+            if not offset:
+                return None
+            if stored_hash == h:
+                profile = self._record(offset - 1)
+                if user_key(profile["user_id"]) == key:
+                    return profile
+            slot = (slot + 1) & (self._buckets - 1)
+
+    def __iter__(self) -> Iterator[dict]:
+        for slot in range(self._buckets):
+            offset = _BUCKET.unpack_from(self._map, self._table_at + slot * _BUCKET.size)[1]
+            if offset:
+                yield self._record(offset - 1)
+
+
+# --- Applying a stored profile ---
+
+def personalize(intent: Optional[dict], profile: Optional[dict], max_topics: int = 3) -> Optional[dict]:
+    """
+    Combine what the query asked for with the user's stored profile: topics named in the query
+    win, otherwise the user's top `max_topics` interests are used; a stored summary style
+    applies unless the query asked for one. None if neither says what to fetch.
+    """
+    if profile is None or not profile["topics"]:
+        return intent
+    style = profile["summary_style"] or "general"
+    if intent is None:
+        return {"topic": " and ".join(profile["topics"][:max_topics]), "summary_style": style}
+    if intent["summary_style"] == "general":
+        return dict(intent, summary_style=style)
+    return intent
+
+
+def prefer_sources(articles: List[dict], sources: List[str]) -> List[dict]:
+    """Move articles from the user's preferred sources to the front, otherwise keeping the ranking."""
+    if not sources:
+        return articles
+    preferred = {user_key(source) for source in sources}
+    return sorted(articles, key=lambda article: user_key(article.get("source", "")) not in preferred)
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> Optional[ProfileStore]:
+    """The store at NEWS_PROFILE_STORE, opened once per process; None when unset or not compiled yet."""
+    global _store
+    path = os.environ.get("NEWS_PROFILE_STORE")
+    if not path:
+        return None
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if (_store is None or _store.path != path) and os.path.exists(path):
+                _store = ProfileStore(path)
+    return _store if _store is not None and _store.path == path else None
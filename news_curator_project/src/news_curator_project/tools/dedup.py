@@ -0,0 +1,131 @@
+import hashlib
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# --- Near-duplicate detection ---
+# Syndicated stories show up many times with small edits (a different headline, a trailing
+# byline). Each article gets a one-permutation MinHash signature over word 3-gram shingles
+# (every shingle hash lands in one of NUM_HASHES bins, each bin keeps its minimum), which
+# costs a single pass instead of one pass per hash function. Locality-sensitive banding finds
+# candidate near-duplicates in O(1) per article, and a candidate joins an existing story
+# cluster when the estimated Jaccard similarity reaches the threshold.
+
+NUM_HASHES = 16
+BANDS = 8  # 8 bands x 2 rows: pairs above ~0.5 Jaccard almost always share a band
+DEFAULT_SIMILARITY = 0.5
+PUBLISHED_FIELDS = ("published_at", "publishedAt", "published", "date")
+
+# Shingles use Python's built-in hash, which is fast but salted per process, so
+# signatures are only comparable within one process and are never persisted.
+_EMPTY = 1 << 62  # marks a bin no shingle fell into
+
+
+def shingles(tokens: List[str]) -> set:
+    """Hashes of the word 3-grams of `tokens` (single words for very short texts)."""
+    if len(tokens) < 3:
+        return {hash(token) for token in tokens}
+    return {hash(gram) for gram in zip(tokens, tokens[1:], tokens[2:])}
+
+
+def minhash(hashes: set) -> Tuple[int, ...]:
+    if not hashes:
+        return ()
+    bins = [_EMPTY] * NUM_HASHES
+    for h in hashes:
+        slot, value = h % NUM_HASHES, h // NUM_HASHES
+        if value < bins[slot]:
+            bins[slot] = value
+    return tuple(bins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures (bins empty in both are ignored)."""
+    if not a or not b:
+        return 0.0
+    used = equal = 0
+    for x, y in zip(a, b):
+        if x != _EMPTY or y != _EMPTY:
+            used += 1
+            equal += x == y
+    return equal / used if used else 0.0
+
+
+def fingerprint(text: str) -> bytes:
+    """Exact-duplicate key: a digest of the whitespace- and case-normalized text."""
+    return hashlib.blake2b(" ".join(text.lower().split()).encode("utf-8"), digest_size=16).digest()
+
+
+def published_timestamp(article: dict, default: Optional[float] = None) -> float:
+    """Publication time as epoch seconds from an ISO 8601 string or a number; `default` (now) if missing."""
+    for field in PUBLISHED_FIELDS:
+        value = article.get(field)
+        if value in (None, ""):
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            value = str(value).strip()
+            if value.endswith("Z"):
+                value = value[:-1] + "+00:00"
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return time.time() if default is None else default
+
+
+class NearDuplicateIndex:
+    """
+    LSH index from MinHash band to the articles with that band. Only one article per story
+    cluster needs to be indexed. Signatures are kept in one flat array and bands are keyed by
+    their hash (a collision only costs an extra similarity check), to stay compact at millions
+    of articles.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_SIMILARITY, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_HASHES // bands
+        self._buckets: Dict[int, List[int]] = {}
+        self._offsets: Dict[int, int] = {}
+        self._signatures = array("q")
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        # Bands with no shingle in them (common for short texts) would put every such text in one bucket
+        rows, empty = self.rows, (_EMPTY,) * self.rows
+        bands = (signature[band * rows:(band + 1) * rows] for band in range(self.bands))
+        return [hash((band, rows_)) for band, rows_ in enumerate(bands) if rows_ != empty]
+
+    def _signature(self, doc_id: int) -> Tuple[int, ...]:
+        offset = self._offsets[doc_id]
+        return tuple(self._signatures[offset:offset + NUM_HASHES])
+
+    def match_or_add(self, doc_id: int, signature: Tuple[int, ...]) -> Optional[int]:
+        """
+        The id of an indexed article that `signature` near-duplicates; if there is none,
+        index `doc_id` as the first article of a new story and return None.
+        """
+        if not signature:
+            return None
+        keys = self._band_keys(signature)
+        buckets = self._buckets
+        checked = set()
+        for key in keys:
+            for other in buckets.get(key, ()):
+                if other not in checked:
+                    checked.add(other)
+                    if similarity(signature, self._signature(other)) >= self.threshold:
+                        return other
+        self._offsets[doc_id] = len(self._signatures)
+        self._signatures.extend(signature)
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [doc_id]
+            else:
+                bucket.append(doc_id)
+        return None
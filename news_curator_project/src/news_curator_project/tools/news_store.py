@@ -0,0 +1,504 @@
+import asyncio
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_left
+from heapq import merge
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from news_curator_project.tools.dedup import (
+    DEFAULT_SIMILARITY, NearDuplicateIndex, fingerprint, minhash, published_timestamp, shingles
+)
+
+# --- Built-in demo corpus ---
+# Used when no on-disk corpus is configured via NEWS_CORPUS_PATH.
+DEFAULT_ARTICLES = {
+    "technology": [
+        {"title": "New AI Breakthrough in Robotics", "content": "Researchers at TechLab announce a significant advancement in AI-driven robotic navigation, promising more autonomous systems.", "source": "Tech Daily"},
+        {"title": "Quantum Computing Market Update", "content": "The market for quantum computing solutions is expected to grow by 25% this year, driven by investments in national research programs.", "source": "Quantum Insights"},
+        {"title": "Cybersecurity Threats on the Rise", "content": "A recent report indicates a sharp increase in sophisticated phishing attacks targeting remote workers.", "source": "Security Weekly"}
+    ],
+    "finance": [
+        {"title": "Global Stock Markets Show Resilience", "content": "Despite inflationary pressures, major global stock indices have shown unexpected resilience in the last quarter.", "source": "Financial Times"},
+        {"title": "Interest Rate Hikes Expected Soon", "content": "Central banks are signaling further interest rate increases to combat persistent inflation, impacting borrowing costs.", "source": "Bloomberg"},
+        {"title": "Cryptocurrency Volatility Continues", "content": "Bitcoin and Ethereum experience further price swings as regulatory uncertainty impacts investor confidence.", "source": "CoinDesk"}
+    ],
+    "health": [
+        {"title": "New Cancer Drug Shows Promising Results", "content": "Clinical trials for a novel cancer therapy have yielded positive early results, offering new hope for patients.", "source": "Health Journal"},
+        {"title": "Mental Health Awareness Campaign Launches", "content": "A nationwide campaign aims to destigmatize mental health issues and provide resources for support.", "source": "Public Health News"},
+        {"title": "Vaccine Development Progress Update", "content": "Scientists are making steady progress on new vaccines for emerging infectious diseases.", "source": "Medical Gazette"}
+    ]
+}
+
+DEFAULT_TOP_K = 5
+# Relevance is halved for every this many hours of age; 0 ranks on relevance alone.
+RECENCY_HALF_LIFE_HOURS = float(os.environ.get("NEWS_RECENCY_HALF_LIFE_HOURS", "24"))
+
+# Field weights: a match on the article's topic counts more than a title hit,
+# which counts more than a hit somewhere in the body.
+FIELD_BOOSTS = {"topic": 3.0, "title": 2.0, "content": 1.0}
+# Postings a pruned search reads per term before its first stopping check (grown 4x per round),
+# and the share of the corpus it may read before scoring the whole corpus is cheaper
+PRUNE_DEPTH = 64
+PRUNE_MAX_SHARE = 1 / 128
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with "
+    "about latest news headlines highlights summary update updates".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and single characters removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+class ArticleStore:
+    """
+    In-memory article corpus with a TF-IDF index over title, content and topic tokens.
+
+    The article-by-term matrix is stored column by column: each token maps to a pair of
+    NumPy arrays (article ids, term-frequency weights). Scoring a query or an interest
+    profile is a sparse matrix-vector product, one vectorized scatter-add per query term
+    into a dense score vector, and `search_many` scores a batch of profiles as one
+    matrix-matrix product. idf depends on the corpus size and is applied at query time.
+
+    Most searches don't score the whole corpus: each term's postings are also ordered by impact
+    (log tf plus recency, computed once per term and snapshot) and a search reads them from the
+    top, scoring only the articles seen, until the k-th best story provably outranks any article
+    not read yet (the threshold algorithm). Only when that would take too many postings does it
+    fall back to the full matrix product.
+
+    Articles can be ingested at any time: exact duplicates are dropped, near-duplicates
+    (syndicated copies) join the story cluster of the article they resemble, and only the
+    columns of tokens that changed are extended. A search returns one article per cluster,
+    its most recently published member, with relevance decayed by age (`half_life_hours`).
+    """
+
+    def __init__(self, articles: Optional[Iterable[dict]] = None,
+                 similarity: float = DEFAULT_SIMILARITY, half_life_hours: float = RECENCY_HALF_LIFE_HOURS):
+        self.half_life_hours = half_life_hours
+        self._articles: List[dict] = []
+        self._pending: Dict[str, tuple] = {}  # token -> (article ids, raw weights) added since the last search
+        self._fingerprints: Dict[bytes, int] = {}
+        self._near_duplicates = NearDuplicateIndex(similarity)
+        self._cluster = array("q")  # article id -> id of the cluster's first article
+        self._latest = array("q")  # cluster id -> most recently published member (-1 if not a cluster id)
+        self._published = array("d")
+        # Searches read one immutable snapshot: (postings, sorted vocabulary, cluster per
+        # article, publication time of each article's newest cluster member, impact order per term).
+        self._index = ({}, [], np.zeros(0, np.int64), np.zeros(0), {})
+        self._lock = threading.Lock()
+        if articles:
+            self.add_many(articles)
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    # --- Loading ---
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, List[dict]], **kwargs) -> "ArticleStore":
+        """Build a store from a {topic: [article, ...]} mapping."""
+        return cls(
+            (dict(article, topic=article.get("topic", topic)) for topic, articles in mapping.items() for article in articles),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_jsonl(cls, path, **kwargs) -> "ArticleStore":
+        """Build a store from a JSONL file with one article object per line."""
+        def _records():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        return cls(_records(), **kwargs)
+
+    @classmethod
+    def from_sqlite(cls, path, table: str = "articles", **kwargs) -> "ArticleStore":
+        """Build a store from a SQLite table with title, content, source and topic columns."""
+        conn = sqlite3.connect(str(path))
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+        finally:
+            conn.close()
+        return cls((dict(row) for row in rows), **kwargs)
+
+    # --- Indexing ---
+
+    def add(self, article: dict) -> int:
+        """Index a single article and return its id in the store (the existing id for an exact duplicate)."""
+        with self._lock:
+            return self._add(article)[0]
+
+    def add_many(self, articles: Iterable[dict]) -> int:
+        """Index articles and return how many were new (exact duplicates are not counted)."""
+        return self.ingest(articles)["added"]
+
+    def ingest(self, articles: Iterable[dict]) -> Dict[str, int]:
+        """
+        Stream articles into the store. Returns counts of 'added' articles (of which
+        'near_duplicates' joined an existing story cluster) and skipped exact 'duplicates'.
+        """
+        stats = {"added": 0, "near_duplicates": 0, "duplicates": 0}
+        with self._lock:
+            for article in articles:
+                status = self._add(article)[1]
+                if status == "duplicate":
+                    stats["duplicates"] += 1
+                else:
+                    stats["added"] += 1
+                    if status == "near_duplicate":
+                        stats["near_duplicates"] += 1
+        return stats
+
+    def _add(self, article: dict) -> tuple:
+        title, content = str(article.get("title") or ""), str(article.get("content") or "")
+        key = fingerprint(f"{title} {content}")
+        if key in self._fingerprints:
+            return self._fingerprints[key], "duplicate"
+
+        doc_id = len(self._articles)
+        self._articles.append(article)
+        self._fingerprints[key] = doc_id
+        published = published_timestamp(article)
+        self._published.append(published)
+
+        field_tokens = {field: tokenize(str(article.get(field) or "")) for field in FIELD_BOOSTS}
+        # Syndicated copies often get a new headline, so stories are compared on their body text
+        signature = minhash(shingles(field_tokens["content"] or field_tokens["title"]))
+        match = self._near_duplicates.match_or_add(doc_id, signature)
+        if match is None:
+            cluster = doc_id
+            self._latest.append(doc_id)
+        else:
+            cluster = self._cluster[match]
+            self._latest.append(-1)
+            if published >= self._published[self._latest[cluster]]:
+                self._latest[cluster] = doc_id
+        self._cluster.append(cluster)
+
+        weights: Dict[str, float] = {}
+        for field, boost in FIELD_BOOSTS.items():
+            for token in field_tokens[field]:
+                weights[token] = weights.get(token, 0.0) + boost
+        pending = self._pending
+        for token, weight in weights.items():
+            column = pending.get(token)
+            if column is None:
+                pending[token] = ([doc_id], [weight])
+            else:
+                column[0].append(doc_id)
+                column[1].append(weight)
+        return doc_id, ("added" if cluster == doc_id else "near_duplicate")
+
+    def _finalize(self) -> tuple:
+        """Fold pending articles into a new index snapshot and return the current snapshot."""
+        if not self._pending and len(self._index[2]) == len(self._articles):
+            return self._index
+        with self._lock:
+            postings, vocab, _, _, _ = self._index
+            if self._pending:
+                postings = dict(postings)
+                new_tokens = []
+                for token, (doc_ids, weights) in self._pending.items():
+                    doc_ids = np.array(doc_ids, dtype=np.int64)
+                    tf = (1.0 + np.log(np.array(weights, dtype=np.float32))).astype(np.float32)
+                    current = postings.get(token)
+                    if current is None:
+                        new_tokens.append(token)
+                        postings[token] = (doc_ids, tf)
+                    else:
+                        postings[token] = (np.concatenate((current[0], doc_ids)), np.concatenate((current[1], tf)))
+                if new_tokens:
+                    vocab = list(merge(vocab, sorted(new_tokens)))
+                self._pending = {}
+            cluster = np.array(self._cluster, dtype=np.int64)
+            story_published = np.array(self._published)[np.array(self._latest, dtype=np.int64)[cluster]]
+            self._index = (postings, vocab, cluster, story_published, {})
+            return self._index
+
+    @staticmethod
+    def _expand(token: str, postings: dict, vocab: List[str], limit: int = 8) -> List[tuple]:
+        """Exact match, otherwise up to `limit` vocabulary terms the token is a prefix of."""
+        if token in postings:
+            return [(token, 1.0)]
+        expansions = []
+        i = bisect_left(vocab, token)
+        while i < len(vocab) and len(expansions) < limit and vocab[i].startswith(token):
+            expansions.append((vocab[i], 0.8))
+            i += 1
+        return expansions
+
+    # --- Querying ---
+
+    def query_weights(self, query: str) -> Dict[str, float]:
+        """The query as a sparse term -> weight vector, with prefix expansion for unknown tokens."""
+        postings, vocab, _, _, _ = self._finalize()
+        weights: Dict[str, float] = {}
+        for token in tokenize(query):
+            for term, weight in self._expand(token, postings, vocab):
+                weights[term] = weights.get(term, 0.0) + weight
+        return weights
+
+    def profile_weights(self, topics: Iterable[str]) -> Dict[str, float]:
+        """An interest profile (e.g. the topics parsed from knowledge/user_preference.txt) as one term vector."""
+        weights: Dict[str, float] = {}
+        for topic in topics:
+            for term, weight in self.query_weights(topic).items():
+                weights[term] = max(weights.get(term, 0.0), weight)
+        return weights
+
+    def search(self, query: str, top_k: int = DEFAULT_TOP_K) -> List[dict]:
+        """Return up to `top_k` articles ranked by relevance to `query`, one per story cluster."""
+        return self.search_weighted(self.query_weights(query), top_k)
+
+    def search_weighted(self, weights: Dict[str, float], top_k: int = DEFAULT_TOP_K) -> List[dict]:
+        """Rank against a term -> weight vector (e.g. a stored interest profile)."""
+        return self.search_many([weights], top_k)[0]
+
+    def search_many(self, queries: List[Union[str, Dict[str, float]]], top_k: int = DEFAULT_TOP_K) -> List[List[dict]]:
+        """
+        Rank for many queries or profiles at once. Each is first tried as a pruned search; the
+        ones that need the whole corpus scored go through the profiles-by-terms matrix times the
+        terms-by-articles matrix, in row chunks that keep the score matrix around 64 MB.
+        """
+        rows = [self.query_weights(q) if isinstance(q, str) else q for q in queries]
+        postings, _, cluster, story_published, impacts = self._finalize()
+        total = len(cluster)
+        terms = sorted({term for row in rows for term in row if term in postings})
+        if not rows or not terms or not total:
+            return [[] for _ in rows]
+        sizes = np.array([len(postings[term][0]) for term in terms])
+        idf = np.log(1.0 + total / sizes).astype(np.float32)
+        profile_matrix = np.array([[row.get(term, 0.0) for term in terms] for row in rows], dtype=np.float32) * idf
+
+        # Decaying by age is adding a recency term to log(score); the current time would only
+        # shift every article's key by the same amount, so it drops out (and old stories never
+        # underflow to a score of zero).
+        rate = math.log(2) / (3600 * self.half_life_hours) if self.half_life_hours > 0 else 0.0
+        results = [self._top_stories_pruned(weights, terms, postings, cluster, story_published, impacts, rate, top_k)
+                   for weights in profile_matrix]
+        dense = [i for i, result in enumerate(results) if result is None]
+        if not dense:
+            return results
+
+        recency = story_published * rate if rate else None
+        chunk = max(1, (1 << 24) // total)
+        for start in range(0, len(dense), chunk):
+            block = profile_matrix[dense[start:start + chunk]]
+            scores = np.zeros((len(block), total), dtype=np.float32)
+            for j, term in enumerate(terms):
+                column = block[:, j]
+                if column.any():
+                    doc_ids, tf = postings[term]
+                    scores[:, doc_ids] += np.outer(column, tf)
+            for i, row_scores in zip(dense[start:start + chunk], scores):
+                results[i] = self._top_stories(row_scores, np.flatnonzero(row_scores), cluster, recency, top_k)
+        return results
+
+    @staticmethod
+    def _impact_order(term: str, postings: dict, story_published: np.ndarray, impacts: dict, rate: float) -> np.ndarray:
+        """Positions in `term`'s postings by decreasing log(tf) + recency; sorted once per term and snapshot."""
+        order = impacts.get(term)
+        if order is None:
+            doc_ids, tf = postings[term]
+            impact = np.log(tf) + story_published[doc_ids] * rate if rate else np.log(tf)
+            order = impacts[term] = np.argsort(-impact, kind="stable").astype(np.int32)
+        return order
+
+    def _top_stories_pruned(self, weights: np.ndarray, terms: List[str], postings: dict, cluster: np.ndarray,
+                            story_published: np.ndarray, impacts: dict, rate: float, top_k: int) -> Optional[List[dict]]:
+        """
+        The best `top_k` stories for one row of term weights (idf applied) by the threshold
+        algorithm: read each term's top postings by impact, score the articles seen exactly, and
+        stop once the k-th best story's key is at least the most an unread article could reach
+        (the sum over terms of weight x the impact at the read depth). None when proving that
+        would mean reading more than PRUNE_MAX_SHARE of the corpus; the caller scores everything instead.
+        """
+        used = [(postings[terms[j]], weights[j], terms[j]) for j in np.flatnonzero(weights)]
+        if not used:
+            return []
+        depth = max(PRUNE_DEPTH, top_k * 8)
+        while True:
+            if sum(min(len(doc_ids), depth) for (doc_ids, _), _, _ in used) > PRUNE_MAX_SHARE * len(cluster):
+                return None
+            seen, bounds = [], []
+            for (doc_ids, tf), weight, term in used:
+                if len(doc_ids) <= depth:
+                    seen.append(doc_ids)  # read in full: no unread article has this term
+                    continue
+                order = self._impact_order(term, postings, story_published, impacts, rate)[:depth]
+                seen.append(doc_ids[order])
+                last = order[-1]
+                bounds.append(math.log(weight * tf[last]) + story_published[doc_ids[last]] * rate)
+            candidates = np.unique(np.concatenate(seen)) if len(seen) > 1 else np.sort(seen[0])
+            scores = np.zeros(len(candidates), dtype=np.float32)
+            for (doc_ids, tf), weight, _ in used:
+                positions = np.minimum(np.searchsorted(doc_ids, candidates), len(doc_ids) - 1)
+                scores += np.where(doc_ids[positions] == candidates, weight * tf[positions], 0)
+            keys = np.log(scores) + story_published[candidates] * rate if rate else np.log(scores)
+            ranked = np.argsort(-keys, kind="stable")
+            clusters = cluster[candidates[ranked]]
+            _, first = np.unique(clusters, return_index=True)
+            first.sort()
+            if not bounds or (len(first) >= top_k and keys[ranked[first[top_k - 1]]] >= np.logaddexp.reduce(bounds)):
+                return [self._articles[self._latest[story]] for story in clusters[first[:top_k]].tolist()]
+            depth *= 4
+
+    def _top_stories(self, scores: np.ndarray, matched: np.ndarray, cluster: np.ndarray,
+                     recency: Optional[np.ndarray], top_k: int) -> List[dict]:
+        """The best `top_k` clusters among the `matched` articles, each represented by its newest member."""
+        keys = np.log(scores[matched])
+        if recency is not None:
+            keys = keys + recency[matched]  # float64: recency terms are ~1e4, too large for float32 resolution
+        candidates = min(len(matched), top_k * 4)
+        while True:
+            best = np.argpartition(-keys, candidates - 1)[:candidates] if candidates else np.zeros(0, np.int64)
+            best = best[np.argsort(-keys[best], kind="stable")]
+            stories = list(dict.fromkeys(cluster[matched[best]].tolist()))
+            if len(stories) >= top_k or candidates >= len(matched):
+                break
+            candidates = min(len(matched), candidates * 4)  # many near-duplicates near the top; look further
+        return [self._articles[self._latest[story]] for story in stories[:top_k]]
+
+    def topics(self) -> List[str]:
+        return sorted({a["topic"] for a in self._articles if a.get("topic")})
+
+
+# --- Shared store ---
+# The store is loaded once per process and shared by every NewsAPITool instance.
+_store: Optional[ArticleStore] = None
+_store_lock = threading.Lock()
+
+
+def load_article_store(path: Optional[str] = None) -> ArticleStore:
+    """Load a store from a .jsonl or .db/.sqlite file, or the built-in corpus when no path is given."""
+    if not path:
+        return ArticleStore.from_mapping(DEFAULT_ARTICLES)
+    suffix = Path(path).suffix.lower()
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return ArticleStore.from_sqlite(path)
+    return ArticleStore.from_jsonl(path)
+
+
+def follow_jsonl(path: str, store: ArticleStore, poll_seconds: float = 5.0) -> threading.Thread:
+    """
+    Ingest lines appended to a JSONL corpus file into `store` as they arrive, from a daemon
+    thread. Reading starts at the current end of the file (the store is assumed to hold
+    what's already there); a partial last line is retried on the next poll.
+    """
+    def worker():
+        with open(path, "r", encoding="utf-8") as f:
+            f.seek(0, os.SEEK_END)
+            pending = ""
+            while True:
+                chunk = f.read()
+                if not chunk:
+                    time.sleep(poll_seconds)
+                    continue
+                lines = (pending + chunk).split("\n")
+                pending = lines.pop()
+                store.ingest(json.loads(line) for line in lines if line.strip())
+
+    thread = threading.Thread(target=worker, name="news-ingest", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_article_store() -> ArticleStore:
+    """
+    The process-wide store, loaded from NEWS_CORPUS_PATH. With NEWS_CORPUS_FOLLOW=1 and a
+    .jsonl corpus, articles appended to the file later are ingested as they arrive.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = os.environ.get("NEWS_CORPUS_PATH")
+                _store = load_article_store(path)
+                if path and path.endswith(".jsonl") and os.environ.get("NEWS_CORPUS_FOLLOW") == "1":
+                    follow_jsonl(path, _store)
+    return _store
+
+
+def set_article_store(store: ArticleStore) -> None:
+    """Plug in a different store (e.g. a pre-built corpus or a test fixture)."""
+    global _store
+    _store = store
+
+
+# --- Multi-topic fetching ---
+# "tech and finance and health highlights" is split into separate topic lookups that run
+# concurrently, so latency is bounded by the slowest single fetch (which matters once the
+# store is backed by a remote API or database rather than the in-memory index).
+# "&" only separates topics when it stands alone, so "R&D" and "AT&T" stay whole
+_TOPIC_SPLIT_RE = re.compile(r"\s*(?:,|;|(?<=\s)&(?=\s)|/|\+|\band\b|\bplus\b)\s*", re.IGNORECASE)
+_fetch_pool: Optional[ThreadPoolExecutor] = None
+
+
+def split_topics(topic: str) -> List[str]:
+    """Split a combined interest into its individual topics, keeping their order and dropping repeats."""
+    topics = []
+    for part in _TOPIC_SPLIT_RE.split(topic or ""):
+        part = part.strip()
+        if part and part.lower() not in (t.lower() for t in topics):
+            topics.append(part)
+    return topics
+
+
+def merge_results(results: List[List[dict]], top_k: Optional[int] = None) -> List[dict]:
+    """Round-robin merge of per-topic result lists, dropping articles already seen under another topic."""
+    merged, seen = [], set()
+    for rank in range(max((len(r) for r in results), default=0)):
+        for articles in results:
+            if rank < len(articles):
+                article = articles[rank]
+                key = (article.get("title"), article.get("source"))
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(article)
+    return merged[:top_k] if top_k else merged
+
+
+def _get_fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _store_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("NEWS_FETCH_WORKERS", "8")), thread_name_prefix="news-fetch"
+                )
+    return _fetch_pool
+
+
+def fetch_topics(topics: List[str], top_k: int = DEFAULT_TOP_K, store: Optional[ArticleStore] = None) -> List[dict]:
+    """Fetch the top-k articles for each topic concurrently and merge them."""
+    store = store or get_article_store()
+    if len(topics) <= 1:
+        return store.search(topics[0], top_k=top_k) if topics else []
+    results = list(_get_fetch_pool().map(lambda t: store.search(t, top_k=top_k), topics))
+    return merge_results(results)
+
+
+async def afetch_topics(topics: List[str], top_k: int = DEFAULT_TOP_K, store: Optional[ArticleStore] = None) -> List[dict]:
+    """asyncio version of fetch_topics for callers already running an event loop."""
+    store = store or get_article_store()
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_get_fetch_pool(), store.search, t, top_k) for t in topics)
+    )
+    return merge_results(list(results))
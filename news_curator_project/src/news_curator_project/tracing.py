@@ -0,0 +1,286 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# --- Robust event module import (crewai moved it between releases) ---
+try:
+    from crewai import events as _crewai_events
+except ImportError:
+    from crewai.utilities import events as _crewai_events
+
+from news_curator_project.streaming import _task_label
+
+# --- Run tracing ---
+# Every kickoff is recorded as a trace: a root span for the run plus child spans for each
+# pipeline stage, crewai task, agent execution, LLM call and tool call, with token usage and
+# cache hits as attributes. Finished traces are written as JSON lines, one OpenTelemetry-style
+# span per line, to NEWS_TRACE_PATH ('-' for stderr). Like streaming, crewai events are routed
+# to the trace of the thread that emitted them.
+
+TRACE_PATH_ENV = "NEWS_TRACE_PATH"
+VERBOSE_ENV = "NEWS_VERBOSE"
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")
+
+
+def verbose_enabled(default: bool = True) -> bool:
+    """Whether agents and crews should print their console logs (NEWS_VERBOSE=0 turns them off)."""
+    value = os.environ.get(VERBOSE_ENV)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+class Span:
+    def __init__(self, trace_id: str, name: str, parent_id: Optional[str], attributes: dict, start: float = None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return round(((self.end or time.time()) - self.start) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": int(self.start * 1e9),
+            "end_time_unix_nano": int((self.end or time.time()) * 1e9),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+        }
+
+
+class RunTrace:
+    """Spans recorded during one kickoff. New spans are children of the innermost open span."""
+
+    def __init__(self, name: str, **attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.spans: List[Span] = []
+        self._open: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, **attributes)
+
+    def start_span(self, name: str, start: float = None, **attributes) -> Span:
+        with self._lock:
+            parent = self._open[-1].span_id if self._open else None
+            span = Span(self.trace_id, name, parent, attributes, start)
+            self.spans.append(span)
+            self._open.append(span)
+        return span
+
+    def end_span(self, span: Span, end: float = None, **attributes) -> None:
+        with self._lock:
+            span.attributes.update(attributes)
+            span.end = time.time() if end is None else end
+            if span in self._open:
+                self._open.remove(span)
+
+    def end_named(self, name: str, end: float = None, **attributes) -> None:
+        """End the innermost open span called `name` (for spans started and ended by separate events)."""
+        with self._lock:
+            span = next((s for s in reversed(self._open) if s.name == name), None)
+        if span is not None:
+            self.end_span(span, end, **attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.attributes["error"] = str(e)
+            raise
+        finally:
+            self.end_span(span)
+
+    def set(self, **attributes) -> None:
+        """Set attributes on the run's root span."""
+        self.root.attributes.update(attributes)
+
+    def add_usage(self, output) -> None:
+        """Add the token usage crewai reports on a kickoff result to the run's totals."""
+        usage = getattr(output, "token_usage", None)
+        if usage is None:
+            return
+        for field in USAGE_FIELDS:
+            value = getattr(usage, field, None)
+            if value is not None:
+                self.root.attributes[field] = self.root.attributes.get(field, 0) + value
+
+    def finish(self) -> None:
+        with self._lock:
+            still_open = list(self._open)
+        for span in reversed(still_open):
+            self.end_span(span)
+
+    def summary(self) -> dict:
+        """Totals for the run: wall time, LLM and tool calls, tokens, and time per task and agent."""
+        tools = [s for s in self.spans if s.name.startswith("tool:")]
+        summary = {
+            "wall_ms": self.root.duration_ms,
+            "llm_calls": sum(1 for s in self.spans if s.name == "llm"),
+            "tool_calls": len(tools),
+            "tool_ms": round(sum(s.duration_ms for s in tools), 3),
+        }
+        for field in USAGE_FIELDS[:2] + ("cache_hit",):
+            if field in self.root.attributes:
+                summary[field] = self.root.attributes[field]
+        for prefix in ("task", "agent"):
+            durations: Dict[str, float] = {}
+            for s in self.spans:
+                if s.name.startswith(prefix + ":"):
+                    label = s.name[len(prefix) + 1:]
+                    durations[label] = round(durations.get(label, 0) + s.duration_ms, 3)
+            if durations:
+                summary[prefix + "s"] = durations
+        return summary
+
+    def records(self) -> List[dict]:
+        return [span.to_dict() for span in self.spans]
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        parts = [f"wall={summary['wall_ms']:.1f}ms", f"llm_calls={summary['llm_calls']}",
+                 f"tool_calls={summary['tool_calls']} ({summary['tool_ms']:.1f}ms)"]
+        if "prompt_tokens" in summary:
+            parts.append(f"tokens={summary['prompt_tokens']}+{summary.get('completion_tokens', 0)}")
+        return ", ".join(parts)
+
+
+class JsonLinesExporter:
+    """Appends each finished trace's spans to `path` as JSON lines ('-' writes to stderr)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: RunTrace) -> None:
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in trace.records())
+        with self._lock:
+            if self.path == "-":
+                sys.stderr.write(lines)
+                sys.stderr.flush()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+
+
+def default_exporter() -> Optional[JsonLinesExporter]:
+    path = os.environ.get(TRACE_PATH_ENV)
+    return JsonLinesExporter(path) if path else None
+
+
+# --- Per-thread active traces ---
+_active: Dict[int, RunTrace] = {}
+_handlers_lock = threading.Lock()
+_handlers_registered = False
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _active.get(threading.get_ident())
+
+
+def _event_time(event) -> Optional[float]:
+    stamp = getattr(event, "timestamp", None)
+    return stamp.timestamp() if isinstance(stamp, datetime) else None
+
+
+def _on(event_name: str, handler) -> None:
+    # Not every crewai release has every event type
+    event_type = getattr(_crewai_events, event_name, None)
+    if event_type is not None:
+        _crewai_events.crewai_event_bus.on(event_type)(handler)
+
+
+def _register_handlers() -> None:
+    global _handlers_registered
+    with _handlers_lock:
+        if _handlers_registered:
+            return
+
+        def spans(prefix: str, label, start_event: str, end_events: tuple, **attributes):
+            def on_start(source, event):
+                trace = current_trace()
+                if trace is not None:
+                    extra = {key: getter(event) for key, getter in attributes.items()}
+                    trace.start_span(f"{prefix}{label(source, event)}", start=_event_time(event), **extra)
+
+            def on_end(source, event):
+                trace = current_trace()
+                if trace is not None:
+                    error = getattr(event, "error", None)
+                    extra = {"error": str(error)} if error else {}
+                    trace.end_named(f"{prefix}{label(source, event)}", end=_event_time(event), **extra)
+
+            _on(start_event, on_start)
+            for end_event in end_events:
+                _on(end_event, on_end)
+
+        spans("task:", lambda source, event: _task_label(getattr(event, "task", None) or source),
+              "TaskStartedEvent", ("TaskCompletedEvent", "TaskFailedEvent"))
+        spans("agent:", lambda source, event: getattr(getattr(event, "agent", None) or source, "role", "agent"),
+              "AgentExecutionStartedEvent", ("AgentExecutionCompletedEvent", "AgentExecutionErrorEvent"))
+        spans("", lambda source, event: "llm",
+              "LLMCallStartedEvent", ("LLMCallCompletedEvent", "LLMCallFailedEvent"),
+              model=lambda event: getattr(event, "model", None))
+        _handlers_registered = True
+
+
+@contextmanager
+def trace_run(name: str, exporter: Optional[JsonLinesExporter] = None, **attributes):
+    """Record everything that happens on this thread inside the block as one trace."""
+    _register_handlers()
+    trace = RunTrace(name, **attributes)
+    ident = threading.get_ident()
+    previous = _active.get(ident)
+    _active[ident] = trace
+    try:
+        yield trace
+    except Exception as e:
+        trace.set(error=str(e))
+        raise
+    finally:
+        if previous is None:
+            _active.pop(ident, None)
+        else:
+            _active[ident] = previous
+        trace.finish()
+        if exporter is not None:
+            exporter.export(trace)
+
+
+@contextmanager
+def traced(name: str, **attributes):
+    """A child span of this thread's active trace; does nothing outside a traced run."""
+    trace = current_trace()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attributes) as span:
+        yield span
+
+
+@contextmanager
+def timed_stage(timer, name: str):
+    """Time a pipeline stage on a StageTimer and record it as a 'stage:<name>' span."""
+    with timer.stage(name), traced(f"stage:{name}"):
+        yield
+
+
+def record_usage(output) -> None:
+    trace = current_trace()
+    if trace is not None:
+        trace.add_usage(output)
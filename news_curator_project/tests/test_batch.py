@@ -0,0 +1,66 @@
+import json
+
+from news_curator_project.batch import BatchDigestRunner
+from news_curator_project.tools import news_store
+from news_curator_project.tools.news_store import ArticleStore
+
+
+def test_batch_searches_with_the_topic_as_written(tmp_path, monkeypatch):
+    store = ArticleStore([
+        {"title": "AI agents book flights", "content": "Autonomous agents now plan trips.", "source": "A", "topic": "AI"},
+        {"title": "Chip exports rise", "content": "Technology shipments grew.", "source": "B", "topic": "technology"},
+    ])
+    monkeypatch.setattr(news_store, "_store", store)
+    profiles = tmp_path / "profiles.jsonl"
+    profiles.write_text("\n".join(json.dumps(p) for p in [
+        {"user_id": "u1", "topics": ["AI Agents"], "summary_style": "brief"},
+        {"user_id": "u2", "topics": ["ai agents"], "summary_style": "brief"},
+    ]))
+    calls = []
+
+    def summarize(topic, summary_style, articles):
+        calls.append((topic, [a["title"] for a in articles]))
+        return "summary"
+
+    stats = BatchDigestRunner(summarize, workers=1).run(str(profiles), str(tmp_path / "out.jsonl"))
+    assert stats["pairs"] == 1
+    assert calls == [("AI Agents", [a["title"] for a in store.search("AI Agents")])]
+
+
+def test_a_failing_pair_is_reported_and_retried_without_stopping_the_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(news_store, "_store", ArticleStore([
+        {"title": "Chip exports rise", "content": "Technology shipments grew.", "source": "B", "topic": "technology"},
+        {"title": "Rates hold", "content": "Finance markets were calm.", "source": "C", "topic": "finance"},
+    ]))
+    profiles = tmp_path / "profiles.jsonl"
+    profiles.write_text("\n".join(json.dumps(p) for p in [
+        {"user_id": "u1", "topics": ["technology", "finance"], "summary_style": "brief"},
+        {"user_id": "u2", "topics": ["technology"], "summary_style": "brief"},
+    ]))
+    output, checkpoint = tmp_path / "out.jsonl", str(tmp_path / "out.jsonl.checkpoint")
+
+    def summarize(topic, summary_style, articles):
+        if topic == "finance":
+            raise RuntimeError("provider down")
+        return f"{topic} summary"
+
+    stats = BatchDigestRunner(summarize, workers=2, checkpoint_path=checkpoint).run(str(profiles), str(output))
+    assert (stats["summarized_pairs"], stats["failed_pairs"]) == (1, 1)
+    lines = {line["user_id"]: line for line in map(json.loads, output.read_text().splitlines())}
+    assert [d["summary"] for d in lines["u2"]["digests"]] == ["technology summary"]
+    assert "errors" not in lines["u2"]
+    assert [d["topic"] for d in lines["u1"]["digests"]] == ["technology"]
+    assert lines["u1"]["errors"][0]["error"] == "RuntimeError: provider down"
+
+    calls = []
+
+    def retry(topic, summary_style, articles):
+        calls.append(topic)
+        return f"{topic} summary"
+
+    stats = BatchDigestRunner(retry, workers=2, checkpoint_path=checkpoint).run(str(profiles), str(output))
+    assert calls == ["finance"]
+    assert (stats["skipped_users"], stats["resumed_pairs"], stats["failed_pairs"]) == (1, 1, 0)
+    retried = json.loads(output.read_text().splitlines()[-1])
+    assert retried["user_id"] == "u1" and "errors" not in retried
+    assert [d["summary"] for d in retried["digests"]] == ["technology summary", "finance summary"]
@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from news_curator_project import checkpoints
+from news_curator_project.checkpoints import CheckpointStore, default_checkpoint_store
+
+
+def _fail():
+    raise TimeoutError("summarizer timed out")
+
+
+def test_resume_reuses_recorded_stages(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run = store.start("news", {"user_input": "tech news"})
+    assert run.stage("fetch", {"topic": "tech"}, lambda: ["a", "b"]) == ["a", "b"]
+    with pytest.raises(TimeoutError):
+        run.stage("summarize", {"articles": ["a", "b"]}, _fail)
+    assert store.load(run.run_id)["failed_stage"] == "summarize"
+
+    resumed = store.start("news", {"user_input": None}, run.run_id, resume_only=True)
+    calls = []
+    assert resumed.inputs == {"user_input": "tech news"}
+    assert resumed.stage("fetch", {"topic": "tech"}, lambda: calls.append("fetch")) == ["a", "b"]
+    assert resumed.stage("summarize", {"articles": ["a", "b"]}, lambda: "digest") == "digest"
+    resumed.finish("digest")
+    assert calls == []
+    assert store.load(run.run_id)["status"] == "done"
+
+
+def test_resuming_an_unknown_run_writes_nothing(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    with pytest.raises(KeyError):
+        store.start("news", {"user_input": None}, "20250101-000000-deadbeef", resume_only=True)
+    assert store.runs() == []
+
+
+def test_replay_reports_changed_stages_without_recording(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run = store.start("news", {"user_input": "tech news"})
+    run.stage("profile", {"user_input": "tech news"}, lambda: {"topic": "tech"})
+    run.stage("fetch", {"topic": "tech"}, lambda: ["a"])
+    run.finish("digest")
+
+    replay = store.replay(run.run_id, ["fetch"])
+    assert replay.stage("profile", {"user_input": "tech news"}, _fail) == {"topic": "tech"}
+    assert replay.stage("fetch", {"topic": "tech"}, lambda: ["b"]) == ["b"]
+    assert replay.report()["fetch"]["matches"] is False
+    assert store.load(run.run_id)["stages"]["fetch"]["output"] == ["a"]
+    with pytest.raises(KeyError):
+        store.replay("missing")
+
+
+def test_prune_keeps_newest_runs(tmp_path):
+    store = CheckpointStore(str(tmp_path), keep=2)
+    run_ids = []
+    for i in range(4):
+        run_ids.append(store.start("news", {"user_input": str(i)}).run_id)
+        os.utime(tmp_path / f"{run_ids[-1]}.json", (time.time() + i, time.time() + i))
+    store.prune()
+    assert store.runs() == run_ids[:1:-1]
+
+
+class _InlineThread:
+    def __init__(self, target, **kwargs):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+def test_starting_runs_prunes_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoints.threading, "Thread", _InlineThread)
+    store = CheckpointStore(str(tmp_path), keep=1)
+    for i in range(3):
+        store.start("news", {"user_input": str(i)})
+    assert len(store.runs()) == 3  # only the first start pruned, when there was nothing to delete
+    monkeypatch.setattr(checkpoints, "PRUNE_INTERVAL_SECONDS", 0.0)
+    store.start("news", {"user_input": "3"})
+    assert len(store.runs()) == 1
+
+
+def test_checkpoints_are_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEWS_CHECKPOINT_DIR", str(tmp_path / "runs"))
+    monkeypatch.delenv("NEWS_CHECKPOINTS", raising=False)
+    assert default_checkpoint_store() is None
+    monkeypatch.setenv("NEWS_CHECKPOINTS", "1")
+    assert default_checkpoint_store().directory == str(tmp_path / "runs")
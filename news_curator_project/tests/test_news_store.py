@@ -0,0 +1,70 @@
+import random
+
+from news_curator_project.tools import news_store
+from news_curator_project.tools.news_store import ArticleStore, split_topics
+
+
+def test_split_topics_on_separators():
+    assert split_topics("tech and finance, health") == ["tech", "finance", "health"]
+    assert split_topics("tech & finance / science + sports") == ["tech", "finance", "science", "sports"]
+
+
+def test_split_topics_drops_repeats():
+    assert split_topics("Tech and tech and finance") == ["Tech", "finance"]
+
+
+def test_split_topics_keeps_ampersand_inside_words():
+    assert split_topics("R&D") == ["R&D"]
+    assert split_topics("AT&T news") == ["AT&T news"]
+    assert split_topics("R&D & AT&T") == ["R&D", "AT&T"]
+
+
+def _corpus(n: int, seed: int = 3):
+    """Zipf-distributed words with distinct publication times; every 10th article is a syndicated copy."""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(300)]
+    weights = [1 / (i + 1) for i in range(300)]
+    articles = []
+    for i in range(n):
+        published = 1.7e9 + rng.random() * 30 * 86400
+        if i % 10 == 9:
+            original = articles[rng.randrange(len(articles))]
+            articles.append(dict(original, title=f"Copy {i}", content=original["content"] + " via wire",
+                                 published_at=published))
+            continue
+        articles.append({"title": " ".join(rng.choices(words, weights, k=6)),
+                         "content": " ".join(rng.choices(words, weights, k=40)),
+                         "source": f"Source {i % 13}", "topic": f"t{i % 7}", "published_at": published})
+    return articles
+
+
+def test_search_returns_one_article_per_story():
+    store = ArticleStore(_corpus(500))
+    titles = [article["title"] for article in store.search("w0 w1", top_k=20)]
+    assert len(titles) == 20
+    clusters = [store._cluster[store._articles.index(article)] for article in store.search("w0 w1", top_k=20)]
+    assert len(set(clusters)) == len(clusters)
+
+
+def test_pruned_search_matches_full_scoring(monkeypatch):
+    store = ArticleStore(_corpus(3000))
+    queries = ["w0", "w7", "w0 w1", "w3 w40 w200", "t3", "t3 w2", "w1 w2 w3 w4"]
+    # Let every query take the pruned path, then none
+    monkeypatch.setattr(news_store, "PRUNE_MAX_SHARE", 1.0)
+    pruned = [store.search(query, top_k=10) for query in queries]
+    monkeypatch.setattr(ArticleStore, "_top_stories_pruned", lambda self, *args: None)
+    full = [store.search(query, top_k=10) for query in queries]
+    assert pruned == full
+
+
+def test_pruned_search_sees_new_articles():
+    store = ArticleStore(_corpus(3000))
+    store.search("w0")
+    store.add({"title": "w0 w0 w0", "content": "w0 " * 30, "source": "Late", "topic": "t0", "published_at": 1.8e9})
+    assert store.search("w0", top_k=1)[0]["source"] == "Late"
+
+
+def test_fetch_topics_merges_per_topic_results():
+    store = ArticleStore(_corpus(500))
+    per_topic = [store.search(topic) for topic in ("w0", "w1", "w2")]
+    assert news_store.fetch_topics(["w0", "w1", "w2"], store=store) == news_store.merge_results(per_topic)
@@ -0,0 +1,49 @@
+import json
+
+from news_curator_project.profiles import ProfileStore, compile_profiles, load_profiles
+
+
+def _write_jsonl(path, records):
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    return str(path)
+
+
+def test_jsonl_records_without_an_id_are_numbered(tmp_path):
+    path = _write_jsonl(tmp_path / "users.jsonl", [
+        {"user_id": "u1", "topics": "tech and finance"},
+        {"topics": ["health"]},
+        {"name": "  ", "topics": {"sports": 2}},
+    ])
+    assert [p["user_id"] for p in load_profiles(path)] == ["u1", "user-1", "user-2"]
+
+
+def test_text_preferences(tmp_path):
+    path = tmp_path / "prefs.txt"
+    path.write_text(
+        "User name is John Doe.\nUser is very interested in AI Agents.\nUser is interested in finance & markets.\n"
+        "User prefers news from Reuters.\nUser prefers brief summaries.\n\n"
+        "User is interested in health.\n"
+    )
+    john, anonymous = load_profiles(str(path))
+    assert john == {"user_id": "John Doe", "topics": ["AI Agents", "finance", "markets"],
+                    "weights": {"AI Agents": 2.0, "finance": 1.0, "markets": 1.0},
+                    "sources": ["Reuters"], "summary_style": "brief"}
+    assert anonymous["user_id"] == "user-1"
+
+
+def test_compiled_store_round_trip(tmp_path):
+    source = _write_jsonl(tmp_path / "users.jsonl", [
+        {"user_id": f"User {i}", "topics": {"tech": 1, f"topic {i}": 4}, "sources": ["Wire"], "summary_style": "brief"}
+        for i in range(200)
+    ] + [{"user_id": "User 7", "topics": ["science"]}])
+    stats = compile_profiles([source], str(tmp_path / "profiles.bin"))
+    assert stats["users"] == 200
+    with ProfileStore(str(tmp_path / "profiles.bin")) as store:
+        assert len(store) == 200
+        assert store.get(" user  3 ") == {"user_id": "User 3", "topics": ["topic 3", "tech"],
+                                          "weights": {"topic 3": 1.0, "tech": 0.25},
+                                          "sources": ["Wire"], "summary_style": "brief"}
+        assert store.get("User 7")["topics"] == ["science"]  # the last definition wins
+        assert store.get("nobody") is None
+        assert sorted(p["user_id"] for p in store) == sorted(f"User {i}" for i in range(200))
+    assert len(list(load_profiles(str(tmp_path / "profiles.bin")))) == 200
@@ -0,0 +1,27 @@
+import threading
+import time
+
+from news_curator_project.streaming import emit_stage, stream_kickoff
+
+
+def test_stream_yields_stages_then_result():
+    def kickoff():
+        emit_stage("Fetching articles")
+        return "Digest"
+
+    assert list(stream_kickoff(kickoff)) == [("stage", "Fetching articles"), ("result", "Digest")]
+
+
+def test_closing_the_stream_waits_for_the_kickoff():
+    finished = threading.Event()
+
+    def kickoff():
+        emit_stage("Started")
+        time.sleep(0.2)
+        finished.set()
+        return "Digest"
+
+    events = stream_kickoff(kickoff)
+    assert next(events) == ("stage", "Started")
+    events.close()  # what a client disconnect does to a streaming handler
+    assert finished.is_set()